@@ -8,7 +8,7 @@ Created on Mon Nov  1 16:36:27 2021
 
 import cvxpy as cp
 import numpy as np
-from ..Base_Assets import Asset_STEVFNs
+from ..Base_Assets import Asset_STEVFNs, Storage_Asset_STEVFNs, weighted_sum
 from ..Base_Assets import Multi_Asset
 from ...Network import Edge_STEVFNs
 
@@ -27,7 +27,7 @@ class Charging_Asset(Asset_STEVFNs):
         sizing_constant = params["charging_sizing_constant"]
         usage_constant_1 = params["charging_usage_constant"]
         
-        return cp.maximum(sizing_constant * cp.max(flows),  usage_constant_1 * cp.sum(flows))
+        return cp.maximum(sizing_constant * cp.max(flows),  usage_constant_1 * weighted_sum(flows, params))
         
     
     @staticmethod
@@ -59,7 +59,9 @@ class Charging_Asset(Asset_STEVFNs):
     
     def build_edges(self):
         super().build_edges()
-        self.build_edge_2()
+        #with fixed capacities the maximum size is already respected by the capacity#
+        if self.network.fixed_capacities == False:
+            self.build_edge_2()
         return
     
     def build_edge_2(self):
@@ -125,7 +127,7 @@ class Discharging_Asset(Asset_STEVFNs):
         sizing_constant = params["discharging_sizing_constant"]
         usage_constant_1 = params["discharging_usage_constant"]
         
-        return cp.maximum(sizing_constant * cp.max(flows),  usage_constant_1 * cp.sum(flows))
+        return cp.maximum(sizing_constant * cp.max(flows),  usage_constant_1 * weighted_sum(flows, params))
     
     @staticmethod
     def conversion_fun(flows, params):
@@ -158,7 +160,9 @@ class Discharging_Asset(Asset_STEVFNs):
     # For max capacity
     def build_edges(self):
         super().build_edges()
-        self.build_edge_2()
+        #with fixed capacities the maximum size is already respected by the capacity#
+        if self.network.fixed_capacities == False:
+            self.build_edge_2()
         return
     # For max capacity
     def build_edge_2(self):
@@ -211,7 +215,7 @@ class Discharging_Asset(Asset_STEVFNs):
         self._update_sizing_constant()
         return
 
-class Storage_Asset(Asset_STEVFNs):
+class Storage_Asset(Storage_Asset_STEVFNs):
     """Class for battery storage"""
     asset_name = "Storage"
     source_node_type = "BESS"
@@ -220,13 +224,13 @@ class Storage_Asset(Asset_STEVFNs):
     def cost_fun(flows, params):
         sizing_constant = params["storage_sizing_constant"]
         usage_constant_1 = params["storage_usage_constant"]
-        minimum_size = params["minimum_size"]
+        minimum_size_cost = params["minimum_size_cost"]#sizing_constant * minimum_size#
         
         # Without setting a minimum size:
         # return cp.maximum(sizing_constant * cp.max(flows),  usage_constant_1 * cp.sum(flows))
         
         # Setting a minimum size for the assets:
-        return cp.maximum(sizing_constant * cp.maximum(cp.max(flows), minimum_size),  usage_constant_1 * cp.sum(flows))
+        return cp.maximum(sizing_constant * cp.max(flows), minimum_size_cost,  usage_constant_1 * weighted_sum(flows, params))
     
     @staticmethod
     def conversion_fun(flows, params):
@@ -238,17 +242,10 @@ class Storage_Asset(Asset_STEVFNs):
         self.cost_fun_params = {"storage_sizing_constant": cp.Parameter(nonneg=True),
                           "storage_usage_constant": cp.Parameter(nonneg=True),
                           "minimum_size": cp.Parameter(nonneg=True)}
+        self.derived_cost_fun_params = {"minimum_size_cost": cp.Parameter(nonneg=True)}
         self.conversion_fun_params = {"storage_conversion_factor": cp.Parameter(nonneg=True)}
         return
     
-    def define_structure(self, asset_structure):
-        super().define_structure(asset_structure)
-        self.target_node_location = self.source_node_location
-        self.target_node_times[-1] = self.source_node_times[0]
-        self.target_node_times[:-1] = self.source_node_times[1:]
-        self.flows = cp.Variable(self.number_of_edges, nonneg = True)
-        return
-    
     def _load_parameters_df(self, parameters_df):
         self.parameters_df = parameters_df
         return
@@ -260,6 +257,11 @@ class Storage_Asset(Asset_STEVFNs):
         self.cost_fun_params["storage_sizing_constant"].value = self.cost_fun_params["storage_sizing_constant"].value * NPV_factor
         return
     
+    def _update_minimum_size_cost(self):
+        self.derived_cost_fun_params["minimum_size_cost"].value = (self.cost_fun_params["storage_sizing_constant"].value * 
+                                                                   self.cost_fun_params["minimum_size"].value)
+        return
+    
     def _update_usage_constant(self):
         simulation_factor = 8760/self.network.system_structure_properties["simulated_timesteps"]
         N = np.ceil(self.network.system_parameters_df.loc["project_life", "value"]/8760)
@@ -274,6 +276,7 @@ class Storage_Asset(Asset_STEVFNs):
         #Set Usage Parameters Based on NPV#
         self._update_usage_constant()
         self._update_sizing_constant()
+        self._update_minimum_size_cost()
         return
 
 class BESS_Existing_Asset(Multi_Asset):
@@ -8,11 +8,43 @@ Created on Wed Nov  3 12:33:27 2021
 
 import cvxpy as cp
 import numpy as np
-import pandas as pd
 import os
-from ..Network import Edge_STEVFNs
+from ..Network import Block_Edge_STEVFNs, identity_conversion_fun
+from .Parameters_Repository import get_parameters_repository
+from .Profile_Store import load_profile, get_profile, get_profile_hours
 import matplotlib.pyplot as plt
 
+####### Define Functions #######
+
+def zero_cost_fun(flows, params):
+    return cp.Constant(0)
+
+#with time aggregation params["timestep_weights"] holds the weights of the simulated time steps#
+#flows with several time series one after the other, e.g. both directions of a transport, reuse the weights#
+
+def _get_timestep_weights(flows, params):
+    timestep_weights = params.get("timestep_weights")
+    if timestep_weights is None:
+        return None
+    return np.resize(timestep_weights, flows.shape)
+
+def weighted_flows(flows, params):
+    timestep_weights = _get_timestep_weights(flows, params)
+    if timestep_weights is None:
+        return flows
+    return cp.multiply(timestep_weights, flows)
+
+def weighted_sum(flows, params):
+    return cp.sum(weighted_flows(flows, params))
+
+def weighted_sum_squares(flows, params):
+    #sum_squares keeps the DPP compilation of the quadratic costs fast, unlike sum(power(flows,2))#
+    timestep_weights = _get_timestep_weights(flows, params)
+    if timestep_weights is None:
+        return cp.sum_squares(flows)
+    return cp.sum_squares(cp.multiply(np.sqrt(timestep_weights), flows))
+
+
 ####### Define Classes #######
 
 class Asset_STEVFNs:
@@ -20,38 +52,78 @@ class Asset_STEVFNs:
     asset_name = "Asset_STEVFNs"
     source_node_type = "NULL"
     target_node_type = "NULL"
-    cost_fun = staticmethod(lambda flows, params: cp.Constant(0))
-    conversion_fun = staticmethod(lambda flow, params: flow)
+    profile_column = None#column of the profile csv file, None for files with one unnamed column#
+    cost_fun = staticmethod(zero_cost_fun)
+    conversion_fun = staticmethod(identity_conversion_fun)
     def __init__(self):
         self.cost_fun_params = dict()
         self.conversion_fun_params = dict()
+        self.derived_cost_fun_params = dict()#parameters whose values are computed from other parameters in update#
+        self.constraints = []#constraints of the asset other than node balances#
+        self.capacity = None#capacity parameter of the asset when the network has fixed capacities#
         return
     
     def build_cost(self):
-        self.cost = self.cost_fun(self.flows, self.cost_fun_params)
+        #derived parameters replace products of parameters, which would make the problem non-DPP#
+        cost_fun_params = self._add_timestep_weights(dict(self.cost_fun_params, **self.derived_cost_fun_params))
+        self.cost = self.cost_fun(*self._add_capacity(self.get_sized_flows(), cost_fun_params))
         return
     
-    
-    def build_edge(self, edge_number):
-        source_node_time = self.source_node_times[edge_number]
-        target_node_time = self.target_node_times[edge_number]
-        new_edge = Edge_STEVFNs()
+    def is_sized(self):
+        #assets with costs whose flows are decisions have a size#
+        return isinstance(self.flows, cp.Variable) and type(self).cost_fun is not zero_cost_fun
+    
+    def get_sized_flows(self):
+        """Returns the flows whose maximum is the size of the asset"""
+        return self.flows
+    
+    def _add_capacity(self, flows, params):
+        #with fixed capacities the capacity is appended to the flows with weight 0, so that the maximum#
+        #of the flows is the capacity and sizing costs are constant, while usage costs are unchanged#
+        if self.network.fixed_capacities == False or not self.is_sized():
+            return flows, params
+        self.capacity = cp.Parameter(nonneg=True)
+        #a variable equal to the capacity, as sizing constants times the capacity parameter would not be DPP#
+        self.capacity_flow = cp.Variable(1, nonneg = True)
+        if flows.size == 1:
+            return flows, params
+        timestep_weights = params.get("timestep_weights")
+        if timestep_weights is None:
+            timestep_weights = np.ones(flows.size)
+        timestep_weights = np.append(np.resize(timestep_weights, flows.size), 0)
+        return cp.hstack([flows, self.capacity_flow]), dict(params, timestep_weights = timestep_weights)
+    
+    def _add_timestep_weights(self, params):
+        #time step weights are constants, so weighted costs stay DPP#
+        if self.network.timestep_weights is None:
+            return params
+        return dict(params, timestep_weights = self.network.timestep_weights)
+    
+    
+    def build_block_edge(self, flow, source_node_location, source_node_type, source_node_times, 
+                         target_node_location, target_node_type, target_node_times, 
+                         conversion_fun = False, conversion_fun_params = False):
+        #Builds one block edge, entry i of flow goes from source node time i to target node time i#
+        new_edge = Block_Edge_STEVFNs()
         self.edges += [new_edge]
-        if self.source_node_type != "NULL":
-            new_edge.attach_source_node(self.network.extract_node(
-                self.source_node_location, self.source_node_type, source_node_time))
-        if self.target_node_type != "NULL":
-            new_edge.attach_target_node(self.network.extract_node(
-                self.target_node_location, self.target_node_type, target_node_time))
-        new_edge.flow = self.flows[edge_number]
-        new_edge.conversion_fun = self.conversion_fun
-        new_edge.conversion_fun_params = self.conversion_fun_params
-        return
+        if source_node_type != "NULL":
+            new_edge.attach_source_nodes(self.network.extract_nodes(
+                source_node_location, source_node_type, source_node_times))
+        if target_node_type != "NULL":
+            new_edge.attach_target_nodes(self.network.extract_nodes(
+                target_node_location, target_node_type, target_node_times))
+        new_edge.flow = flow
+        if conversion_fun != False:
+            new_edge.conversion_fun = conversion_fun
+        if conversion_fun_params != False:
+            new_edge.conversion_fun_params = conversion_fun_params
+        return new_edge
     
     def build_edges(self):
         self.edges = []
-        for counter1 in range(self.number_of_edges):
-            self.build_edge(counter1)
+        self.build_block_edge(self.flows, self.source_node_location, self.source_node_type, self.source_node_times, 
+                              self.target_node_location, self.target_node_type, self.target_node_times, 
+                              self.conversion_fun, self.conversion_fun_params)
         return
     
     def get_plot_data(self):
@@ -60,6 +132,29 @@ class Asset_STEVFNs:
     def build(self):
         self.build_edges()
         self.build_cost()
+        self.build_constraints()
+        return
+    
+    def build_constraints(self):
+        self.constraints = []
+        if self.capacity is not None:
+            sized_flows = self.get_sized_flows()
+            self.constraints += [self.capacity_flow == self.capacity]
+            if sized_flows.size == 1:
+                self.constraints += [sized_flows == self.capacity_flow]
+            else:
+                self.constraints += [sized_flows <= self.capacity_flow]
+        return
+    
+    def get_capacity(self):
+        """Returns the size of the asset after a solve, None for assets without a size"""
+        if not self.is_sized():
+            return None
+        return self.component_size()
+    
+    def set_capacity(self, capacity):
+        if self.capacity is not None and capacity is not None:
+            self.capacity.value = capacity
         return
     
     def define_structure(self, asset_structure):
@@ -79,10 +174,26 @@ class Asset_STEVFNs:
     def _load_parameters_df(self, asset_type):
         self.parameters_folder = os.path.join(self.network.base_folder, "Code", "Assets", 
                                            self.asset_name)
-        parameters_filename = os.path.join(self.parameters_folder, "parameters.csv")
-        self.parameters_df = pd.read_csv(parameters_filename).iloc[asset_type]
+        self.parameters_df = get_parameters_repository(os.path.dirname(self.parameters_folder), 
+                                                       self.asset_name).get_parameters(self.asset_name, asset_type)
         return
     
+    def get_profile_filename(self):
+        """Returns the filename of the profile of the asset, None for assets without a profile"""
+        return None
+    
+    def get_full_profile(self):
+        return load_profile(self.get_profile_filename(), self.profile_column)
+    
+    def get_simulated_profile(self):
+        """Returns the profile at the simulated time steps, taken from the representative
+        periods with time aggregation or sampled with set_size and set_number otherwise"""
+        if self.network.time_aggregation is not None:
+            return get_profile_hours(self.get_profile_filename(), self.network.time_aggregation.hours,
+                                     self.profile_column)[:self.number_of_edges]
+        return get_profile(self.get_profile_filename(), self.parameters_df["set_size"], 
+                           self.parameters_df["set_number"], self.number_of_edges, self.profile_column)
+    
     def _update_parameters(self):
         for parameter_name, parameter in self.cost_fun_params.items():
             parameter.value = self.parameters_df[parameter_name]
@@ -133,11 +244,149 @@ class Asset_STEVFNs:
         asset_identity = self.asset_name
         return {asset_identity: asset_size}
 
+class Storage_Asset_STEVFNs(Asset_STEVFNs):
+    """Base Class of storage assets, whose flows carry the stored quantity from one time step
+    to the next, cyclically within the simulated horizon.
+    
+    With time aggregation that links storage, flows are the stored quantity relative to
+    the start of the representative period and period_storage is the stored quantity at
+    the start of every period of the full profiles, in chronological order. The stored
+    quantity of a period is period_storage plus the flows of its representative period
+    and each period carries the flow at its last time step over to the next period. The
+    last period wraps around to the first, or, without cyclic storage, the first period
+    starts at initial_storage. Losses within a period are neglected in the bounds on the
+    stored quantity."""
+    asset_name = "Storage_Asset_STEVFNs"
+    
+    def define_structure(self, asset_structure):
+        super().define_structure(asset_structure)
+        self.target_node_location = self.source_node_location
+        #storage carries over to the next time step, cyclically within the simulated horizon#
+        self.target_node_times = self.network.shift_node_times(self.source_node_times, 1)
+        time_aggregation = self.network.time_aggregation
+        self.linked_storage = time_aggregation is not None and time_aggregation.links_storage
+        if self.linked_storage == False:
+            self.flows = cp.Variable(self.number_of_edges, nonneg = True)
+            return
+        #stored quantity relative to the start of the period, negative when the period discharges#
+        self.flows = cp.Variable(self.number_of_edges)
+        self.period_storage = cp.Variable(len(time_aggregation.period_assignments), nonneg = True)
+        self.period_maximum = cp.Variable(time_aggregation.number_of_periods)
+        self.period_minimum = cp.Variable(time_aggregation.number_of_periods)
+        self.storage_linking_params = {"period_conversion_factor": cp.Parameter(nonneg=True),
+                                       "initial_storage": cp.Parameter(nonneg=True)}
+        #the maximum of storage_levels is the largest stored quantity and their weighted sum the#
+        #total stored quantity over the full profiles, so cost_fun applies unchanged#
+        self.storage_levels = cp.hstack([self.flows, self.period_storage, 
+                                         self.period_storage + self.period_maximum[time_aggregation.period_assignments]])
+        return
+    
+    def _get_period_steps(self):
+        #representative period of every time step and the last time step of every representative period#
+        period_length = self.network.time_aggregation.period_length
+        step_periods = np.arange(self.number_of_edges) // period_length
+        last_steps = np.arange(self.network.time_aggregation.number_of_periods) * period_length + period_length - 1
+        return step_periods, last_steps
+    
+    def build_edges(self):
+        if self.linked_storage == False:
+            super().build_edges()
+            return
+        self.edges = []
+        #the flows at the last time steps of the periods leave the network through period_storage#
+        carried_steps = np.flatnonzero((np.arange(self.number_of_edges) + 1) % 
+                                       self.network.time_aggregation.period_length != 0)
+        self.build_block_edge(self.flows, self.source_node_location, self.source_node_type, self.source_node_times, 
+                              self.target_node_location, "NULL", [])
+        self.build_block_edge(self.flows[carried_steps], self.source_node_location, "NULL", [], 
+                              self.target_node_location, self.target_node_type, self.target_node_times[carried_steps], 
+                              self.conversion_fun, self.conversion_fun_params)
+        return
+    
+    def get_sized_flows(self):
+        if self.linked_storage == False:
+            return self.flows
+        return self.storage_levels
+    
+    def build_cost(self):
+        if self.linked_storage == False:
+            super().build_cost()
+            return
+        time_aggregation = self.network.time_aggregation
+        number_of_full_periods = len(time_aggregation.period_assignments)
+        period_storage_weight = (time_aggregation.period_length * time_aggregation.number_of_periods / 
+                                 number_of_full_periods)
+        timestep_weights = np.concatenate([self.network.timestep_weights, 
+                                           np.full(number_of_full_periods, period_storage_weight), 
+                                           np.zeros(number_of_full_periods)])
+        cost_fun_params = dict(self.cost_fun_params, **self.derived_cost_fun_params)
+        cost_fun_params["timestep_weights"] = timestep_weights
+        self.cost = self.cost_fun(*self._add_capacity(self.storage_levels, cost_fun_params))
+        return
+    
+    def build_constraints(self):
+        super().build_constraints()
+        if self.linked_storage == False:
+            return
+        period_assignments = self.network.time_aggregation.period_assignments
+        step_periods, last_steps = self._get_period_steps()
+        carried_flows = self.conversion_fun(self.flows[last_steps[period_assignments]], self.conversion_fun_params)
+        period_conversion_factor = self.storage_linking_params["period_conversion_factor"]
+        self.constraints += [self.flows <= self.period_maximum[step_periods],
+                             self.flows >= self.period_minimum[step_periods],
+                             self.period_storage + self.period_minimum[period_assignments] >= 0]
+        if self.network.time_aggregation.cyclic_storage == True:
+            next_periods = np.roll(np.arange(len(period_assignments)), -1)
+            self.constraints += [self.period_storage[next_periods] == 
+                                 period_conversion_factor * self.period_storage + carried_flows]
+            return
+        self.constraints += [self.period_storage[0] == self.storage_linking_params["initial_storage"]]
+        if len(period_assignments) > 1:
+            self.constraints += [self.period_storage[1:] == 
+                                 period_conversion_factor * self.period_storage[:-1] + carried_flows[:-1]]
+        return
+    
+    def _get_conversion_factor(self):
+        #conversion of one unit stored over one time step#
+        return float(self.conversion_fun(np.ones(1), self.conversion_fun_params).value[0])
+    
+    def _update_parameters(self):
+        super()._update_parameters()
+        if self.linked_storage == True:
+            self.storage_linking_params["period_conversion_factor"].value = (
+                self._get_conversion_factor()**self.network.time_aggregation.period_length)
+            if self.storage_linking_params["initial_storage"].value is None:
+                self.storage_linking_params["initial_storage"].value = 0
+        return
+    
+    def get_carried_storage(self, time_step = -1):
+        """Returns the stored quantity carried over from time_step to the next time step"""
+        return max(self._get_conversion_factor() * self.get_storage_levels()[time_step], 0)
+    
+    def get_storage_levels(self):
+        """Returns the stored quantity at every time step, over the full profiles with linked storage"""
+        if self.linked_storage == False:
+            return self.flows.value
+        time_aggregation = self.network.time_aggregation
+        period_length = time_aggregation.period_length
+        period_flows = self.flows.value.reshape(time_aggregation.number_of_periods, period_length)
+        period_losses = self._get_conversion_factor()**np.arange(period_length)
+        storage_levels = (period_flows[time_aggregation.period_assignments] + 
+                          self.period_storage.value[:, np.newaxis] * period_losses)
+        return storage_levels.reshape(-1)
+    
+    def size(self):
+        return self.component_size()
+    
+    def component_size(self):
+        # Returns size of component (i.e. asset) #
+        return self.get_storage_levels().max()
+
             
 class Multi_Asset(Asset_STEVFNs):
     """Class that contains multiple assets"""
     asset_name = "Multi_Asset"
-    cost_fun = staticmethod(lambda costs_dictionary, cost_fun_params: cp.Constant(0))
+    cost_fun = staticmethod(zero_cost_fun)
     assets_class_dictionary = dict()#dictionary that contains assetclasses
     def __init__(self):
         super().__init__()
@@ -154,6 +403,13 @@ class Multi_Asset(Asset_STEVFNs):
     def build(self):
         self._build_assets()
         self.build_cost()
+        self.build_constraints()
+        return
+    
+    def build_constraints(self):
+        self.constraints = []
+        for asset_name, asset in self.assets_dictionary.items():
+            self.constraints += asset.constraints
         return
     
     def build_cost(self):
@@ -189,6 +445,20 @@ class Multi_Asset(Asset_STEVFNs):
             asset.update(asset_type)
         return
     
+    def is_sized(self):
+        return False
+    
+    def get_capacity(self):
+        capacity_dictionary = dict()
+        for asset_name, asset in self.assets_dictionary.items():
+            capacity_dictionary[asset_name] = asset.get_capacity()
+        return capacity_dictionary
+    
+    def set_capacity(self, capacity):
+        for asset_name, asset in self.assets_dictionary.items():
+            asset.set_capacity(capacity[asset_name])
+        return
+    
     def get_plot_data(self):
         flow_dictionary = dict()
         for asset_name, asset in self.assets_dictionary.items():
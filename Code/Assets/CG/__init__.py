@@ -8,8 +8,7 @@ Created on Wed Nov  3 13:25:54 2021
 
 import numpy as np
 import cvxpy as cp
-from ..Base_Assets import Asset_STEVFNs
-from ...Network import Edge_STEVFNs
+from ..Base_Assets import Asset_STEVFNs, weighted_sum, weighted_sum_squares
 
 
 
@@ -23,8 +22,8 @@ class CG_Asset(Asset_STEVFNs):
         sizing_constant = params["sizing_constant"]
         usage_constant_1 = params["usage_constant_1"]
         usage_constant_2 = params["usage_constant_2"]
-        return (sizing_constant * cp.max(flows) + usage_constant_1 * cp.sum(flows) 
-                + usage_constant_2 * cp.sum(cp.power(flows,2)))
+        return (sizing_constant * cp.max(flows) + usage_constant_1 * weighted_sum(flows, params) 
+                + usage_constant_2 * weighted_sum_squares(flows, params))
     
     def __init__(self):
         super().__init__()
@@ -42,13 +41,10 @@ class CG_Asset(Asset_STEVFNs):
         self.flows = cp.Variable(self.number_of_edges, nonneg = True)
         return
         
-    def build_edge(self, edge_number):
-        node_time = self.node_times[edge_number]
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        new_edge.attach_target_node(self.network.extract_node(
-            self.node_location, self.node_type, node_time))
-        new_edge.flow = self.flows[edge_number]
+    def build_edges(self):
+        self.edges = []
+        self.build_block_edge(self.flows, "NULL", "NULL", self.node_times, 
+                              self.node_location, self.node_type, self.node_times)
         return
     
     def _update_sizing_constant(self):
@@ -48,5 +48,5 @@ class CO2_Budget_Asset(Asset_STEVFNs):
     
     def component_size(self):
         # Returns size of component (i.e. asset) #
-        return (self.edges[0].target_node.net_output_flows + self.conversion_fun_params["maximum_budget"]).value
+        return (self.edges[0].target_nodes[0].net_output_flows + self.conversion_fun_params["maximum_budget"]).value
     
\ No newline at end of file
@@ -8,10 +8,8 @@ Created on Wed Nov  3 13:25:54 2021
 
 import numpy as np
 import cvxpy as cp
-import pandas as pd
 import os
 from ..Base_Assets import Asset_STEVFNs
-from ...Network import Edge_STEVFNs
 from ..Base_Assets import Multi_Asset
 
 
@@ -36,22 +34,13 @@ class EL_Demand_Component(Asset_STEVFNs):
             "demand_profile": cp.Parameter( self.number_of_edges, nonneg = True)}
         return
     
-    def build_edge(self, edge_number):
-        source_node_time = self.source_node_times[edge_number]
-        target_node_time = self.target_node_times[edge_number]
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        if self.source_node_type != "NULL":
-            new_edge.attach_source_node(self.network.extract_node(
-                self.source_node_location, self.source_node_type, source_node_time))
-        if self.target_node_type != "NULL":
-            new_edge.attach_target_node(self.network.extract_node(
-                self.target_node_location, self.target_node_type, target_node_time))
-        new_edge.flow = self.flows[edge_number]
-        new_edge.conversion_fun = self.conversion_fun
-        new_edge.conversion_fun_params = {
-            "demand": self.conversion_fun_params["demand_profile"][edge_number]}
-        new_edge.target_node.curtailment = False
+    def build_edges(self):
+        self.edges = []
+        new_edge = self.build_block_edge(self.flows, self.source_node_location, self.source_node_type, self.source_node_times, 
+                                         self.target_node_location, self.target_node_type, self.target_node_times, 
+                                         self.conversion_fun, {"demand": self.conversion_fun_params["demand_profile"]})
+        for target_node in new_edge.target_nodes:
+            target_node.curtailment = False
         return
 
 class Net_EL_Demand_Component(Asset_STEVFNs):
@@ -122,6 +111,7 @@ class Total_Unmet_EL_Demand_Component(Asset_STEVFNs):
 class EL_Demand_UM_Asset(Multi_Asset):
     """Class of Electricity Demand Asset"""
     asset_name = "EL_Demand_UM"
+    profile_column = "Demand"
     
     def __init__(self):
         super().__init__()
@@ -143,24 +133,12 @@ class EL_Demand_UM_Asset(Multi_Asset):
         self._update_parameters()
         return
     
-    def _update_parameters(self):
+    def get_profile_filename(self):
         profile_filename = self.parameters_df["profile_filename"] + r".csv"
-        profile_filename = os.path.join(self.parameters_folder, "profiles", profile_filename)
-        profile_df = pd.read_csv(profile_filename)
-        full_profile = np.array(profile_df["Demand"])
-        set_size = self.parameters_df["set_size"]
-        set_number = self.parameters_df["set_number"]
-        n_sets = int(np.ceil(self.number_of_edges/set_size))
-        gap = int(len(full_profile) / (n_sets * set_size)) * set_size
-        offset = set_size * set_number
-        new_profile = np.zeros(n_sets * set_size)
-        for counter1 in range(n_sets):
-            old_loc_0 = offset + gap*counter1
-            old_loc_1 = old_loc_0 + set_size
-            new_loc_0 = set_size * counter1
-            new_loc_1 = new_loc_0 + set_size
-            new_profile[new_loc_0 : new_loc_1] = full_profile[old_loc_0 : old_loc_1]
-        demand_profile = new_profile[:self.number_of_edges]
+        return os.path.join(self.parameters_folder, "profiles", profile_filename)
+    
+    def _update_parameters(self):
+        demand_profile = self.get_simulated_profile()
         total_unmet_demand = demand_profile.sum() * self.parameters_df["unmet_fraction"]
         self.assets_dictionary["EL_Demand"].conversion_fun_params["demand_profile"].value = demand_profile
         self.assets_dictionary["Total_Unmet_EL_Demand"].conversion_fun_params["total_unmet_demand"].value = total_unmet_demand
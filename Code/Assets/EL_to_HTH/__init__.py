@@ -7,7 +7,7 @@ Created on Mon Nov  1 16:36:27 2021
 """
 
 import cvxpy as cp
-from ..Base_Assets import Asset_STEVFNs
+from ..Base_Assets import Asset_STEVFNs, weighted_sum
 import numpy as np
 
 
@@ -21,7 +21,7 @@ class EL_to_HTH_Asset(Asset_STEVFNs):
     def cost_fun(flows, params):
         sizing_constant = params["sizing_constant"]
         usage_constant_1 = params["usage_constant_1"]
-        return sizing_constant * cp.max(flows) + usage_constant_1 * cp.sum(flows)
+        return sizing_constant * cp.max(flows) + usage_constant_1 * weighted_sum(flows, params)
     
     @staticmethod
     def conversion_fun(flows, params):
@@ -7,11 +7,11 @@ Created on Mon Nov  1 16:36:27 2021
 """
 
 import cvxpy as cp
-from ..Base_Assets import Asset_STEVFNs
+from ..Base_Assets import Storage_Asset_STEVFNs, weighted_sum
 import numpy as np
 
 
-class NH3_Storage_Asset(Asset_STEVFNs):
+class NH3_Storage_Asset(Storage_Asset_STEVFNs):
     """Class of NH3 storage asset"""
     asset_name = "NH3_Storage"
     source_node_type = "NH3"
@@ -21,7 +21,7 @@ class NH3_Storage_Asset(Asset_STEVFNs):
     def cost_fun(flows, params):
         sizing_constant = params["sizing_constant"]
         usage_constant_1 = params["usage_constant_1"]
-        return sizing_constant * cp.max(flows) + usage_constant_1 * cp.sum(flows)
+        return sizing_constant * cp.max(flows) + usage_constant_1 * weighted_sum(flows, params)
         # return sizing_constant * cp.max(flows)
     
     @staticmethod
@@ -36,14 +36,6 @@ class NH3_Storage_Asset(Asset_STEVFNs):
         self.conversion_fun_params = {"conversion_factor": cp.Parameter(nonneg=True)}
         return
     
-    def define_structure(self, asset_structure):
-        super().define_structure(asset_structure)
-        self.target_node_location = self.source_node_location
-        self.flows = cp.Variable(self.number_of_edges, nonneg = True)
-        self.target_node_times[-1] = self.source_node_times[0]
-        self.target_node_times[:-1] = self.source_node_times[1:]
-        return
-    
     def _update_sizing_constant(self):
         N = np.ceil(self.network.system_parameters_df.loc["project_life", "value"]/self.parameters_df["lifespan"])
         r = (1 + self.network.system_parameters_df.loc["discount_rate", "value"])**(-self.parameters_df["lifespan"]/8760)
@@ -7,9 +7,8 @@ Created on Mon Nov  1 16:36:27 2021
 """
 
 import cvxpy as cp
-from ..Base_Assets import Asset_STEVFNs
+from ..Base_Assets import Asset_STEVFNs, weighted_sum
 import numpy as np
-from ...Network import Edge_STEVFNs
 
 
 class NH3_Transport_Asset(Asset_STEVFNs):
@@ -22,7 +21,7 @@ class NH3_Transport_Asset(Asset_STEVFNs):
     def cost_fun(flows, params):
         sizing_constant = params["sizing_constant"]
         usage_constant = params["usage_constant"]
-        return sizing_constant * cp.max(flows) + usage_constant * cp.sum(flows)
+        return sizing_constant * cp.max(flows) + usage_constant * weighted_sum(flows, params)
         # return usage_constant * cp.sum(flows)
     
     @staticmethod
@@ -52,29 +51,21 @@ class NH3_Transport_Asset(Asset_STEVFNs):
     
     def define_structure(self, asset_structure):
         super().define_structure(asset_structure)
-        self.target_node_times = self.target_node_times + asset_structure["Transport_Time"]
-        self.target_node_times = self.target_node_times % asset_structure["End_Time"]
+        self.target_node_times = self.network.shift_node_times(self.target_node_times, asset_structure["Transport_Time"])
         self.flows = cp.Variable(self.number_of_edges*2, nonneg = True)
         return
     
-    def build_edge_opposite(self, edge_number):
-        source_node_time = self.source_node_times[edge_number]
-        target_node_time = self.target_node_times[edge_number]
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        new_edge.attach_source_node(self.network.extract_node(
-            self.target_node_location, self.target_node_type, source_node_time))
-        new_edge.attach_target_node(self.network.extract_node(
-            self.source_node_location, self.source_node_type, target_node_time))
-        new_edge.flow = self.flows[self.number_of_edges + edge_number]
-        new_edge.conversion_fun = self.conversion_fun
-        new_edge.conversion_fun_params = self.conversion_fun_params
-        return
-    
     def build_edges(self):
-        super().build_edges()
-        for counter1 in range(self.number_of_edges):
-            self.build_edge_opposite(counter1)
+        self.edges = []
+        self.build_block_edge(self.flows[:self.number_of_edges], 
+                              self.source_node_location, self.source_node_type, self.source_node_times, 
+                              self.target_node_location, self.target_node_type, self.target_node_times, 
+                              self.conversion_fun, self.conversion_fun_params)
+        #opposite direction#
+        self.build_block_edge(self.flows[self.number_of_edges:], 
+                              self.target_node_location, self.target_node_type, self.source_node_times, 
+                              self.source_node_location, self.source_node_type, self.target_node_times, 
+                              self.conversion_fun, self.conversion_fun_params)
         return
     
     def _update_sizing_constant(self):
@@ -8,8 +8,7 @@ Created on Wed Nov  3 13:25:54 2021
 
 import numpy as np
 import cvxpy as cp
-from ..Base_Assets import Asset_STEVFNs
-from ...Network import Edge_STEVFNs
+from ..Base_Assets import Asset_STEVFNs, weighted_flows, weighted_sum, weighted_sum_squares
 
 
 
@@ -29,13 +28,13 @@ class PP_NGS_SCGT_CO2_Asset(Asset_STEVFNs):
         sizing_constant = params["sizing_constant"]
         usage_constant_1 = params["usage_constant_1"]
         usage_constant_2 = params["usage_constant_2"]
-        return (sizing_constant * cp.max(flows) + usage_constant_1 * cp.sum(flows) 
-                + usage_constant_2 * cp.sum(cp.power(flows,2)))
+        return (sizing_constant * cp.max(flows) + usage_constant_1 * weighted_sum(flows, params) 
+                + usage_constant_2 * weighted_sum_squares(flows, params))
     
     @staticmethod
     def conversion_fun_2(flows, params):
         CO2_emissions_factor = params["CO2_emissions_factor"]
-        return -CO2_emissions_factor * flows
+        return -CO2_emissions_factor * weighted_flows(flows, params)
     
     def __init__(self):
         super().__init__()
@@ -61,29 +60,15 @@ class PP_NGS_SCGT_CO2_Asset(Asset_STEVFNs):
         
     def build_edges(self):
         super().build_edges()
-        for counter1 in range(self.number_of_edges):
-            self.build_edge_2(counter1)
+        self.build_edge_2()
         return
     
-    def build_edge_2(self, edge_number):
-        source_node_type = self.source_node_type
-        source_node_location = self.source_node_location
-        source_node_time = self.source_node_times[edge_number]
-        target_node_type = self.target_node_type_2
-        target_node_location = self.target_node_location_2
-        target_node_time = self.target_node_time_2
-        
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        if source_node_type != "NULL":
-            new_edge.attach_source_node(self.network.extract_node(
-                source_node_location, source_node_type, source_node_time))
-        if target_node_type != "NULL":
-            new_edge.attach_target_node(self.network.extract_node(
-                target_node_location, target_node_type, target_node_time))
-        new_edge.flow = self.flows[edge_number]
-        new_edge.conversion_fun = self.conversion_fun_2
-        new_edge.conversion_fun_params = self.conversion_fun_params_2
+    def build_edge_2(self):
+        #every flow entry emits into the single CO2_Budget node#
+        target_node_times = np.full(self.number_of_edges, self.target_node_time_2)
+        self.build_block_edge(self.flows, self.source_node_location, self.source_node_type, self.source_node_times, 
+                              self.target_node_location_2, self.target_node_type_2, target_node_times, 
+                              self.conversion_fun_2, self._add_timestep_weights(self.conversion_fun_params_2))
         return
     
     def _update_sizing_constant(self):
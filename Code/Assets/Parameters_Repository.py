@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:02:47 2026
+
+In-memory repository of the asset parameters.csv files. Every parameters.csv is
+read once per process and read again only when the file changes. Rows are served
+by asset_type, the row number used in Asset_Parameters.csv.
+
+Parameters can be overridden in memory with set_parameter, so that iterative
+workflows can change parameters between runs without rewriting the csv files.
+Assets read their parameters from the repository of the assets folder of their
+network's base_folder, parameters_repository for the default base_folder and for
+assets whose parameters.csv is not in the assets folder of the base_folder.
+"""
+
+### Import Packages ###
+
+import os
+import pandas as pd
+
+class Parameters_Repository_STEVFNs:
+    """Cache of the parameters.csv of every asset in assets_folder, with overrides"""
+    def __init__(self, assets_folder = None):
+        if assets_folder is None:
+            assets_folder = os.path.dirname(__file__)
+        self.assets_folder = assets_folder
+        self.parameters_dfs = dict()#asset_name: (size, mtime_ns, parameters_df)#
+        self.overrides = dict()#asset_name: {(asset_type, parameter_name): value}#
+        return
+
+    def get_parameters_filename(self, asset_name):
+        return os.path.join(self.assets_folder, asset_name, "parameters.csv")
+
+    def _load_parameters_df(self, asset_name):
+        parameters_filename = self.get_parameters_filename(asset_name)
+        parameters_stat = os.stat(parameters_filename)
+        cached = self.parameters_dfs.get(asset_name)
+        if (cached is not None and cached[0] == parameters_stat.st_size and
+            cached[1] == parameters_stat.st_mtime_ns):
+            return cached[2]
+        parameters_df = pd.read_csv(parameters_filename)
+        self.parameters_dfs[asset_name] = (parameters_stat.st_size, parameters_stat.st_mtime_ns, parameters_df)
+        return parameters_df
+
+    def get_parameters_df(self, asset_name):
+        """Returns a copy of the parameters of asset_name with the overrides applied"""
+        parameters_df = self._load_parameters_df(asset_name).copy()
+        for (asset_type, parameter_name), value in self.overrides.get(asset_name, dict()).items():
+            if parameters_df[parameter_name].dtype != object:
+                parameters_df[parameter_name] = parameters_df[parameter_name].astype(object)
+            parameters_df.iat[asset_type, parameters_df.columns.get_loc(parameter_name)] = value
+        return parameters_df
+
+    def get_parameters(self, asset_name, asset_type):
+        """Returns the parameters of asset_name in row asset_type, with the overrides applied"""
+        parameters = self._load_parameters_df(asset_name).iloc[asset_type]
+        asset_overrides = {parameter_name: value for (override_asset_type, parameter_name), value
+                           in self.overrides.get(asset_name, dict()).items() if override_asset_type == asset_type}
+        if len(asset_overrides) == 0:
+            return parameters
+        parameters = parameters.astype(object)
+        for parameter_name, value in asset_overrides.items():
+            parameters[parameter_name] = value
+        return parameters
+
+    def set_parameter(self, asset_name, asset_type, parameter_name, value):
+        """Overrides parameter_name of asset_name in row asset_type in memory"""
+        if parameter_name not in self._load_parameters_df(asset_name).columns:
+            raise KeyError(parameter_name + " is not a parameter of " + asset_name)
+        self.overrides.setdefault(asset_name, dict())[(int(asset_type), parameter_name)] = value
+        return
+
+    def clear_overrides(self, asset_name = None):
+        if asset_name is None:
+            self.overrides = dict()
+        else:
+            self.overrides.pop(asset_name, None)
+        return
+
+    def invalidate(self, asset_name = None):
+        """Drops cached parameters, so that they are read again on next use"""
+        if asset_name is None:
+            self.parameters_dfs = dict()
+        else:
+            self.parameters_dfs.pop(asset_name, None)
+        return
+
+    def save(self, asset_name, parameters_filename = None):
+        """Writes the parameters of asset_name with the overrides applied to parameters_filename,
+        by default the parameters.csv of the asset"""
+        if parameters_filename is None:
+            parameters_filename = self.get_parameters_filename(asset_name)
+        self.get_parameters_df(asset_name).to_csv(parameters_filename, index = False)
+        return
+
+
+#repository shared by all assets in this process#
+parameters_repository = Parameters_Repository_STEVFNs()
+#repositories of other assets folders, e.g. of networks with another base_folder#
+_parameters_repositories = {os.path.realpath(parameters_repository.assets_folder): parameters_repository}
+
+
+def get_parameters_repository(assets_folder, asset_name = None):
+    """Returns the repository of assets_folder, parameters_repository for the assets of this package.
+    With asset_name, parameters_repository is also returned when assets_folder has no parameters.csv
+    of asset_name, e.g. for base folders of synthetic case studies that only hold profiles"""
+    assets_folder = os.path.realpath(assets_folder)
+    if asset_name is not None and not os.path.exists(os.path.join(assets_folder, asset_name, "parameters.csv")):
+        return parameters_repository
+    if assets_folder not in _parameters_repositories:
+        _parameters_repositories[assets_folder] = Parameters_Repository_STEVFNs(assets_folder)
+    return _parameters_repositories[assets_folder]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:21:05 2026
+
+Binary store of the profiles under Code/Assets/*/profiles. convert() packs all
+profile csv files into one flat float64 .npy file and an index of the name, start
+and length of every profile. load_profile() reads a profile as a slice of the
+memory-mapped store and falls back to parsing the csv file if the profile is not
+in the store or the csv file has changed since the conversion. Once the store is
+built the csv files are only needed to rebuild it.
+
+Run python -m Code.Assets.Profile_Store from the base folder to (re)build the store.
+
+get_profile() returns a profile sampled to the time steps of an asset and
+get_profile_hours() a profile at given hours, e.g. of representative periods. Sampled
+profiles are kept in a process-wide LRU cache, so that assets and scenarios that
+use the same profile, set_size, set_number and number of time steps share one
+array. Profiles are cached by the size and modification time of their csv file too,
+so a profile edited during a session is read again. The arrays in the cache are read-only.
+"""
+
+### Import Packages ###
+
+import os
+import glob
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+def sample_profile(full_profile, set_size, set_number, number_of_edges):
+    """Takes n_sets sets of set_size time steps from full_profile, starting at set
+    set_number and spread evenly over full_profile, and returns the first
+    number_of_edges time steps. set_number can be an array of set numbers, then
+    one sampled profile per set number is returned as the rows of a 2d array"""
+    set_size = int(set_size)
+    n_sets = int(np.ceil(number_of_edges/set_size))
+    #gap is a whole number of sets, so the sets are rows of full_profile reshaped to sets#
+    sets_gap = int(len(full_profile) / (n_sets * set_size))
+    full_sets = np.asarray(full_profile)[:(len(full_profile) // set_size) * set_size].reshape(-1, set_size)
+    set_numbers = np.asarray(set_number, dtype = np.int64)
+    last_sets = set_numbers + sets_gap * (n_sets - 1)
+    if np.any(set_numbers < 0) or np.any(last_sets >= len(full_sets)):
+        raise ValueError("set_number " + str(set_number) + " with set_size " + str(set_size) + 
+                         " and " + str(n_sets) + " sets is outside the profile of length " + str(len(full_profile)))
+    if set_numbers.ndim == 0 and sets_gap > 0:
+        #strided view, no copy when the sets are contiguous#
+        new_profile = full_sets[int(set_numbers) : int(last_sets) + 1 : sets_gap].reshape(-1)
+        return new_profile[:number_of_edges]
+    set_indices = set_numbers[..., np.newaxis] + sets_gap * np.arange(n_sets)
+    new_profile = full_sets[set_indices].reshape(set_numbers.shape + (n_sets * set_size,))
+    return new_profile[..., :number_of_edges]
+
+
+class Profile_Store_STEVFNs:
+    """Memory-mapped store of all profiles in assets_folder"""
+    def __init__(self, assets_folder = None):
+        if assets_folder is None:
+            assets_folder = os.path.dirname(__file__)
+        self.assets_folder = assets_folder
+        self.store_folder = os.path.join(assets_folder, "Profile_Store")
+        self.data_filename = os.path.join(self.store_folder, "profiles.npy")
+        self.index_filename = os.path.join(self.store_folder, "index.csv")
+        self._data = None
+        self._index = None
+        return
+
+    @staticmethod
+    def read_profile_csv(profile_filename, column = None):
+        """Parses a profile csv file, column is None for files with one unnamed column"""
+        if column is None:
+            return np.loadtxt(profile_filename, encoding = "utf-8-sig")
+        profile_df = pd.read_csv(profile_filename)
+        return np.array(profile_df[column], dtype = np.float64)
+
+    @staticmethod
+    def get_column(profile_filename):
+        #profiles with a header store their values in the Demand column#
+        with open(profile_filename, "r", encoding = "utf-8-sig") as profile_file:
+            first_value = profile_file.readline().split(",")[0]
+        try:
+            float(first_value)
+        except ValueError:
+            return "Demand"
+        return None
+
+    def get_key(self, profile_filename):
+        return os.path.relpath(os.path.abspath(profile_filename), self.assets_folder).replace(os.sep, "/")
+
+    def get_profile_filenames(self):
+        profile_filenames = glob.glob(os.path.join(self.assets_folder, "*", "profiles", "**", "*.csv"),
+                                      recursive = True)
+        return sorted(profile_filenames)
+
+    def convert(self):
+        """Packs every profile csv file under the assets folder into the store"""
+        profiles_list = []
+        index_list = []
+        start = 0
+        for profile_filename in self.get_profile_filenames():
+            column = self.get_column(profile_filename)
+            profile = self.read_profile_csv(profile_filename, column)
+            profile_stat = os.stat(profile_filename)
+            index_list.append({"key": self.get_key(profile_filename),
+                               "column": column if column is not None else "",
+                               "start": start,
+                               "length": len(profile),
+                               "size": profile_stat.st_size,
+                               "mtime_ns": profile_stat.st_mtime_ns})
+            profiles_list.append(profile)
+            start += len(profile)
+        if not os.path.exists(self.store_folder):
+            os.makedirs(self.store_folder)
+        #write to temporary files and replace, so that readers never see a partial store#
+        data = np.concatenate(profiles_list) if len(profiles_list) > 0 else np.zeros(0)
+        temporary_data_filename = self.data_filename + r"." + str(os.getpid()) + r".tmp"
+        with open(temporary_data_filename, "wb") as data_file:
+            np.save(data_file, data)
+        temporary_index_filename = self.index_filename + r"." + str(os.getpid()) + r".tmp"
+        pd.DataFrame(index_list, columns = ["key", "column", "start", "length", "size", "mtime_ns"]).to_csv(
+            temporary_index_filename, index = False)
+        os.replace(temporary_data_filename, self.data_filename)
+        os.replace(temporary_index_filename, self.index_filename)
+        self._data = None
+        self._index = None
+        return
+
+    def _open(self):
+        if self._index is not None:
+            return
+        if not (os.path.exists(self.data_filename) and os.path.exists(self.index_filename)):
+            self._index = dict()
+            return
+        index_df = pd.read_csv(self.index_filename, keep_default_na = False)
+        self._index = {row["key"]: (int(row["start"]), int(row["length"]), int(row["size"]), int(row["mtime_ns"]))
+                       for row in index_df.to_dict("records")}
+        self._data = np.load(self.data_filename, mmap_mode = "r")
+        return
+
+    def load_profile(self, profile_filename, column = None):
+        """Returns the profile of profile_filename as a numpy array"""
+        self._open()
+        index_entry = self._index.get(self.get_key(profile_filename))
+        if index_entry is not None:
+            start, length, size, mtime_ns = index_entry
+            #the store is used as is when the csv file has been removed#
+            if not os.path.exists(profile_filename):
+                return np.array(self._data[start : start + length])
+            profile_stat = os.stat(profile_filename)
+            if profile_stat.st_size == size and profile_stat.st_mtime_ns == mtime_ns:
+                return np.array(self._data[start : start + length])
+        return self.read_profile_csv(profile_filename, column)
+
+
+class Profile_Cache_STEVFNs:
+    """LRU cache of sampled profiles, holding at most max_bytes of profile data"""
+    def __init__(self, profile_store, max_bytes = 256 * 2**20):
+        self.profile_store = profile_store
+        self.max_bytes = max_bytes
+        self.profiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        return
+
+    @staticmethod
+    def get_file_key(profile_filename, column):
+        #the size and modification time of the csv file, so that edited profiles are read again#
+        profile_filename = os.path.abspath(profile_filename)
+        if not os.path.exists(profile_filename):
+            return (profile_filename, column, None, None)
+        profile_stat = os.stat(profile_filename)
+        return (profile_filename, column, profile_stat.st_size, profile_stat.st_mtime_ns)
+
+    def get_profile(self, profile_filename, set_size, set_number, number_of_edges, column = None):
+        """Returns the read-only sampled profile of profile_filename, a 2d array
+        with one row per set number if set_number is an array"""
+        if np.ndim(set_number) == 0:
+            set_number_key = int(set_number)
+        else:
+            set_number_key = tuple(int(x) for x in set_number)
+        key = (self.get_file_key(profile_filename, column), int(set_size), set_number_key, int(number_of_edges))
+        profile = self.profiles.get(key)
+        if profile is not None:
+            self.hits += 1
+            self.profiles.move_to_end(key)
+            return profile
+        self.misses += 1
+        full_profile = self.profile_store.load_profile(profile_filename, column)
+        profile = sample_profile(full_profile, set_size, set_number, number_of_edges)
+        if profile.base is not None:
+            #a view would keep the whole full_profile in the cache#
+            profile = profile.copy()
+        profile.flags.writeable = False
+        self.add_profile(key, profile)
+        return profile
+
+    def get_profile_hours(self, profile_filename, hours, column = None):
+        """Returns the read-only profile of profile_filename at hours"""
+        hours = np.asarray(hours, dtype = np.int64)
+        key = (self.get_file_key(profile_filename, column), hashlib.sha256(hours.tobytes()).hexdigest())
+        profile = self.profiles.get(key)
+        if profile is not None:
+            self.hits += 1
+            self.profiles.move_to_end(key)
+            return profile
+        self.misses += 1
+        profile = self.profile_store.load_profile(profile_filename, column)[hours]
+        profile.flags.writeable = False
+        self.add_profile(key, profile)
+        return profile
+
+    def add_profile(self, key, profile):
+        if profile.nbytes > self.max_bytes:
+            return
+        self.profiles[key] = profile
+        self.nbytes += profile.nbytes
+        #evict least recently used profiles#
+        while self.nbytes > self.max_bytes:
+            old_key, old_profile = self.profiles.popitem(last = False)
+            self.nbytes -= old_profile.nbytes
+        return
+
+    def cache_info(self):
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "profiles": len(self.profiles),
+                "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes}
+
+    def clear(self):
+        self.profiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        return
+
+
+#store and cache shared by all assets in this process#
+profile_store = Profile_Store_STEVFNs()
+profile_cache = Profile_Cache_STEVFNs(profile_store)
+
+def load_profile(profile_filename, column = None):
+    return profile_store.load_profile(profile_filename, column)
+
+def get_profile(profile_filename, set_size, set_number, number_of_edges, column = None):
+    return profile_cache.get_profile(profile_filename, set_size, set_number, number_of_edges, column)
+
+def get_profile_hours(profile_filename, hours, column = None):
+    return profile_cache.get_profile_hours(profile_filename, hours, column)
+
+
+if __name__ == "__main__":
+    profile_store.convert()
@@ -53,19 +53,12 @@ class RE_PV_Existing_Asset(Asset_STEVFNs):
         return
     
     def build_edges(self):
-        super().build_edges()
+        self.edges = []
+        self.build_block_edge(self.flows * self.gen_profile, "NULL", "NULL", self.target_node_times, 
+                              self.target_node_location, self.target_node_type, self.target_node_times)
         self.build_edge_2()
         return
     
-    def build_edge(self, edge_number):
-        target_node_time = self.target_node_times[edge_number]
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        new_edge.attach_target_node(self.network.extract_node(
-            self.target_node_location, self.target_node_type, target_node_time))
-        new_edge.flow = self.flows * self.gen_profile[edge_number]
-        return
-    
     def build_edge_2(self):
         source_node_type = "NULL"
         source_node_location = self.source_node_location_2
@@ -108,6 +101,10 @@ class RE_PV_Existing_Asset(Asset_STEVFNs):
     
     def _load_RE_profile(self):
         """This function reads file and updates self.gen_profile """
+        self.gen_profile.value = self.get_simulated_profile()
+        return
+    
+    def get_profile_filename(self):
         lat_lon_df = self.network.lat_lon_df.iloc[self.target_node_location]
         lat = lat_lon_df["lat"]
         lat = np.int64(np.round((lat) / 0.5)) * 0.5
@@ -123,21 +120,7 @@ class RE_PV_Existing_Asset(Asset_STEVFNs):
         profile_folder = os.path.join(self.parameters_folder, "profiles", RE_TYPE, r"lat"+LAT)
         profile_filename = RE_TYPE + r"_lat" + LAT + r"_lon" + LON + r".csv"
         profile_filename = os.path.join(profile_folder, profile_filename)
-        full_profile = np.loadtxt(profile_filename)
-        set_size = self.parameters_df["set_size"]
-        set_number = self.parameters_df["set_number"]
-        n_sets = int(np.ceil(self.number_of_edges/set_size))
-        gap = int(len(full_profile) / (n_sets * set_size)) * set_size
-        offset = set_size * set_number
-        new_profile = np.zeros(int(n_sets * set_size))
-        for counter1 in range(n_sets):
-            old_loc_0 = int(offset + gap*counter1)
-            old_loc_1 = int(old_loc_0 + set_size)
-            new_loc_0 = int(set_size * counter1)
-            new_loc_1 = int(new_loc_0 + set_size)
-            new_profile[new_loc_0 : new_loc_1] = full_profile[old_loc_0 : old_loc_1]
-        self.gen_profile.value = new_profile[:self.number_of_edges]
-        return
+        return profile_filename
     
     def get_asset_sizes(self):
         # Returns the size of the asset as a dict #
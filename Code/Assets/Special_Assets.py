@@ -30,13 +30,10 @@ class _Conventional_Generator(Asset_STEVFNs):
                                  value = np.zeros(self.number_of_edges))
         return
         
-    def build_edge(self, edge_number):
-        node_time = self.node_times[edge_number]
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        new_edge.attach_target_node(self.network.extract_node(
-            self.node_location, self.node_type, node_time))
-        new_edge.flow = self.flows[edge_number]
+    def build_edges(self):
+        self.edges = []
+        self.build_block_edge(self.flows, "NULL", "NULL", self.node_times, 
+                              self.node_location, self.node_type, self.node_times)
         return
     
     def satisfy_net_load(self):
@@ -64,13 +61,10 @@ class _Demand_Asset(Asset_STEVFNs):
         self.cost = cp.Constant(0)
         return
         
-    def build_edge(self, edge_number):
-        node_time = self.node_times[edge_number]
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        new_edge.attach_source_node(self.network.extract_node(
-            self.node_location, self.node_type, node_time))
-        new_edge.flow = self.flows[edge_number]
+    def build_edges(self):
+        self.edges = []
+        self.build_block_edge(self.flows, self.node_location, self.node_type, self.node_times, 
+                              "NULL", "NULL", self.node_times)
         return
 
     
@@ -100,20 +94,6 @@ class _Transport_Asset(Asset_STEVFNs):
                                  value = np.zeros(self.number_of_edges))
         return
 
-    def build_edge(self, edge_number):
-        source_node_time = self.source_node_times[edge_number]
-        target_node_time = self.target_node_times[edge_number]
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        new_edge.attach_source_node(self.network.extract_node(
-            self.source_node_location, self.source_node_type, source_node_time))
-        new_edge.attach_target_node(self.network.extract_node(
-            self.target_node_location, self.target_node_type, target_node_time))
-        new_edge.flow = self.flows[edge_number]
-        new_edge.conversion_fun = self.conversion_fun
-        new_edge.conversion_fun_params = self.conversion_fun_params
-        return
-
 
 class _RE_Asset(Asset_STEVFNs):
     """Class of Renewable Energy Sources """
@@ -132,13 +112,10 @@ class _RE_Asset(Asset_STEVFNs):
         self.flows = cp.Variable(nonneg = True)#size of RE asset
         return
     
-    def build_edge(self, edge_number):
-        node_time = self.node_times[edge_number]
-        new_edge = Edge_STEVFNs()
-        self.edges += [new_edge]
-        new_edge.attach_target_node(self.network.extract_node(
-            self.node_location, self.node_type, node_time))
-        new_edge.flow = self.flows * self.gen_profile[edge_number]
+    def build_edges(self):
+        self.edges = []
+        self.build_block_edge(self.flows * self.gen_profile, "NULL", "NULL", self.node_times, 
+                              self.node_location, self.node_type, self.node_times)
         return
     
     def get_plot_data(self):
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:41:08 2026
+
+Benchmarks of build, update, solve and results export on synthetic case studies of
+Synthetic_Network_STEVFNs, for scaling studies over the number of locations, number
+of time steps and asset mix. Every case is run in a fresh forked process, where
+available, so that the peak memory of a case does not include the earlier cases.
+The peak memory is the peak resident set size of the process at the end of every
+phase, so it includes the phases before. The solve time includes the compilation of
+the problem by cvxpy, solver_time is the time reported by the solver.
+
+Every case appends one JSON record to the results file, with the code version, the
+versions of cvxpy and python, the case, the size of the problem and the times and
+peak memory of every phase, to track regressions across releases. The records
+calibrate the memory model of Size_Estimator_STEVFNs.
+
+Run python -m Code.Benchmark.Benchmark from the base folder, e.g.
+python -m Code.Benchmark.Benchmark --locations 1 2 4 --timesteps 168 720 --solver CLARABEL
+"""
+
+### Import Packages ###
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+import tempfile
+import multiprocessing
+import cvxpy as cp
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from .Synthetic_Network import Synthetic_Network_STEVFNs
+from ..Network.Network import Network_STEVFNs
+from ..Network.Build_Cache import Build_Cache_STEVFNs
+from ..Network.Profiler import Profiler_STEVFNs
+from ..Results import Results
+from ..Results.Results_Extractor import Results_Extractor_STEVFNs
+
+
+def get_peak_memory():
+    """Returns the peak resident set size of the process in MB, None where it is not available"""
+    if resource is None:
+        return None
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #ru_maxrss is in bytes on macOS and in kB elsewhere#
+    if sys.platform == "darwin":
+        return peak_memory / 2**20
+    return peak_memory / 2**10
+
+
+def get_problem_size(my_network):
+    return {"number_of_assets": len(my_network.assets),
+            "number_of_variables": int(sum(variable.size for variable in my_network.problem.variables())),
+            "number_of_parameters": int(sum(parameter.size for parameter in my_network.problem.parameters())),
+            "number_of_constraints": int(sum(constraint.size for constraint in my_network.problem.constraints))}
+
+
+def run_case(number_of_locations, number_of_timesteps, asset_mix = None, transport_mix = None, asset_types = None,
+             benchmark_folder = None, solver = cp.CLARABEL, **solver_options):
+    """Generates the synthetic case study, times its build, update, solve and results export
+    and returns the record of the case"""
+    synthetic_network = Synthetic_Network_STEVFNs(number_of_locations, number_of_timesteps, asset_mix = asset_mix,
+                                                  transport_mix = transport_mix, asset_types = asset_types)
+    if benchmark_folder is None:
+        benchmark_folder = tempfile.mkdtemp(prefix = "STEVFNs_Benchmark_")
+    case_study_folder = os.path.join(benchmark_folder, "N" + str(number_of_locations) + "_T" +
+                                     str(number_of_timesteps))
+    synthetic_network.write(case_study_folder)
+    network_structure_df = synthetic_network.get_network_structure_df()
+    location_parameters_df = synthetic_network.get_location_parameters_df()
+    asset_parameters_df = synthetic_network.get_asset_parameters_df()
+    system_parameters_df = synthetic_network.get_system_parameters_df()
+    record = {"date": datetime.datetime.now().isoformat(timespec = "seconds"),
+              "code_version": Build_Cache_STEVFNs(benchmark_folder).code_version,
+              "cvxpy_version": cp.__version__,
+              "python_version": platform.python_version(),
+              "machine": platform.machine(),
+              "number_of_locations": number_of_locations,
+              "number_of_timesteps": number_of_timesteps,
+              "asset_mix": synthetic_network.asset_mix,
+              "transport_mix": synthetic_network.transport_mix,
+              "solver": solver,
+              "start_peak_memory_MB": get_peak_memory()}
+
+    start_time = time.time()
+    my_network = Network_STEVFNs()
+    my_network.base_folder = case_study_folder
+    my_network.build(network_structure_df)
+    record["build_time"] = time.time() - start_time
+    record["build_peak_memory_MB"] = get_peak_memory()
+    record.update(get_problem_size(my_network))
+
+    start_time = time.time()
+    my_network.update(location_parameters_df, asset_parameters_df, system_parameters_df)
+    record["update_time"] = time.time() - start_time
+    record["update_peak_memory_MB"] = get_peak_memory()
+
+    start_time = time.time()
+    my_network.solve_problem(solver = solver, **solver_options)
+    record["solve_time"] = time.time() - start_time
+    record["solve_peak_memory_MB"] = get_peak_memory()
+    record["solver_time"] = my_network.solver_stats.solve_time if my_network.solver_stats is not None else None
+    record["status"] = my_network.problem.status
+    record["value"] = my_network.problem.value
+    record["number_of_nonzeros"] = Profiler_STEVFNs(trace_allocations = False).count_network(my_network,
+                                                                                             solver)["nonzeros"]
+
+    start_time = time.time()
+    record["results_time"] = None
+    if my_network.problem.value is not None and my_network.problem.value != float("inf"):
+        extractor = Results_Extractor_STEVFNs(my_network)
+        Results.get_total_data(my_network, location_parameters_df, asset_parameters_df, extractor = extractor)
+        Results.export_collab_flows(my_network, location_parameters_df, extractor = extractor)
+        record["results_time"] = time.time() - start_time
+    record["results_peak_memory_MB"] = get_peak_memory()
+    return record
+
+
+def _run_worker_case(case):
+    return run_case(**case)
+
+
+def run_benchmarks(cases, results_filename = None, **options):
+    """Runs every case of cases, dicts of the arguments of run_case, with the options and
+    appends their records to the JSON lines file results_filename. Returns the list of records"""
+    records = []
+    for case in cases:
+        case = dict(options, **case)
+        try:
+            if "fork" in multiprocessing.get_all_start_methods():
+                with multiprocessing.get_context("fork").Pool(1) as pool:
+                    record = pool.apply(_run_worker_case, (case,))
+            else:
+                record = run_case(**case)
+        except Exception as case_error:
+            #cases that fail, e.g. out of memory, are recorded with their error#
+            record = {key: value for key, value in case.items() if key != "benchmark_folder"}
+            record["error"] = repr(case_error)
+        records += [record]
+        if results_filename is not None:
+            with open(results_filename, "a") as results_file:
+                results_file.write(json.dumps(record) + "\n")
+    return records
+
+
+def get_cases(locations_list, timesteps_list, asset_mix = None, transport_mix = None):
+    return [{"number_of_locations": number_of_locations,
+             "number_of_timesteps": number_of_timesteps,
+             "asset_mix": asset_mix,
+             "transport_mix": transport_mix}
+            for number_of_locations in locations_list for number_of_timesteps in timesteps_list]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Benchmarks STEVFNs on synthetic case studies")
+    parser.add_argument("--locations", type = int, nargs = "+", default = [1, 2, 4])
+    parser.add_argument("--timesteps", type = int, nargs = "+", default = [168, 720])
+    parser.add_argument("--assets", nargs = "+", default = None, help = "asset classes at every location")
+    parser.add_argument("--transport", nargs = "+", default = None, help = "asset classes between locations")
+    parser.add_argument("--solver", default = cp.CLARABEL)
+    parser.add_argument("--folder", default = None, help = "folder of the synthetic case studies")
+    parser.add_argument("--output", default = "benchmarks.jsonl", help = "JSON lines file the records are appended to")
+    arguments = parser.parse_args()
+    cases = get_cases(arguments.locations, arguments.timesteps, arguments.assets, arguments.transport)
+    for record in run_benchmarks(cases, arguments.output, benchmark_folder = arguments.folder,
+                                 solver = arguments.solver):
+        if "error" in record:
+            print(record["number_of_locations"], record["number_of_timesteps"], record["error"])
+            continue
+        print(record["number_of_locations"], record["number_of_timesteps"], record["status"], record["value"],
+              "build", round(record["build_time"], 3), "update", round(record["update_time"], 3),
+              "solve", round(record["solve_time"], 3), "peak", record["results_peak_memory_MB"], "MB")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:14:36 2026
+
+Synthetic case studies for benchmarks. Synthetic_Network_STEVFNs generates the
+Network_Structure.csv, Location_Parameters.csv, Asset_Parameters.csv and
+System_Parameters.csv frames of a network with number_of_locations locations and
+number_of_timesteps hours. Every location has one asset of every class of asset_mix
+and consecutive locations are connected by one asset of every class of transport_mix.
+The asset classes are the classes of ASSET_DICT, with the parameters of Code/Assets.
+
+The profiles of the assets are synthetic full year profiles written by
+write_profiles() under a base folder, in the same layout as Code/Assets/*/profiles.
+The network reads them when its base_folder is set to that folder.
+"""
+
+### Import Packages ###
+
+import os
+import numpy as np
+import pandas as pd
+
+from ..Network.Network import Network_STEVFNs
+from ..Assets.Assets_Dictionary import ASSET_DICT
+
+DEFAULT_ASSET_MIX = ["RE_PV_Openfield_Lim", "RE_WIND_Onshore_Lim", "BESS", "PP_CO2", "EL_Demand"]
+DEFAULT_TRANSPORT_MIX = ["EL_Transport"]
+
+#hours of the full profiles, sample_profile spreads the simulated sets over the year#
+PROFILE_HOURS = 8760
+
+
+class Synthetic_Network_STEVFNs:
+    """Generates the input frames and profiles of a synthetic case study"""
+    def __init__(self, number_of_locations, number_of_timesteps, asset_mix = None, transport_mix = None,
+                 asset_types = None, co2_budget_type = 1, seed = 0):
+        if asset_mix is None:
+            asset_mix = DEFAULT_ASSET_MIX
+        if transport_mix is None:
+            transport_mix = DEFAULT_TRANSPORT_MIX
+        for asset_class in ["CO2_Budget"] + list(asset_mix) + list(transport_mix):
+            if asset_class not in ASSET_DICT:
+                raise ValueError("Asset class " + asset_class + " is not in ASSET_DICT")
+        self.number_of_locations = number_of_locations
+        self.number_of_timesteps = number_of_timesteps
+        self.asset_mix = list(asset_mix)
+        self.transport_mix = list(transport_mix)
+        #Asset_Type of every asset class, 0 for the classes that are not in asset_types#
+        self.asset_types = dict() if asset_types is None else dict(asset_types)
+        self.co2_budget_type = co2_budget_type
+        self.seed = seed
+        return
+
+    def get_network_structure_df(self):
+        structure_list = [{"Asset_Class": "CO2_Budget", "Location_1": 0, "Location_2": 0}]
+        for location in range(self.number_of_locations):
+            structure_list += [{"Asset_Class": asset_class, "Location_1": location, "Location_2": location}
+                               for asset_class in self.asset_mix]
+        for location in range(self.number_of_locations - 1):
+            structure_list += [{"Asset_Class": asset_class, "Location_1": location, "Location_2": location + 1}
+                               for asset_class in self.transport_mix]
+        network_structure_df = pd.DataFrame(structure_list)
+        network_structure_df.insert(0, "Asset_Number", np.arange(len(network_structure_df)))
+        network_structure_df["Start_Time"] = 0
+        network_structure_df["End_Time"] = self.number_of_timesteps
+        network_structure_df["Period"] = 1
+        network_structure_df["Transport_Time"] = 0
+        return network_structure_df
+
+    def get_location_parameters_df(self):
+        #locations on a grid of distinct lat, lon, so that every location has its own RE profiles#
+        locations = np.arange(self.number_of_locations)
+        return pd.DataFrame({"Location": locations,
+                             "lat": -60.0 + 5.0 * (locations % 25),
+                             "lon": -180.0 + 10.0 * (locations // 25),
+                             "location_name": ["L" + str(location) for location in locations]})
+
+    def get_asset_parameters_df(self):
+        asset_parameters_df = self.get_network_structure_df()[["Asset_Number", "Asset_Class", "Location_1",
+                                                               "Location_2"]].copy()
+        asset_parameters_df["Asset_Type"] = [self.asset_types.get(asset_class, 0)
+                                             for asset_class in asset_parameters_df["Asset_Class"]]
+        asset_parameters_df.loc[0, "Asset_Type"] = self.co2_budget_type
+        return asset_parameters_df
+
+    @staticmethod
+    def get_system_parameters_df():
+        return pd.DataFrame({"parameter": ["timestep", "discount_rate", "project_life"],
+                             "value": [1, 0.05, 262800],
+                             "unit": ["h", "unitless", "timestep"]})
+
+    def get_profile(self, asset, rng):
+        """Returns a synthetic full year profile for asset"""
+        hours = np.arange(PROFILE_HOURS)
+        daily_phase = 2 * np.pi * (hours % 24) / 24
+        yearly_phase = 2 * np.pi * hours / PROFILE_HOURS
+        if asset.profile_column == "Demand":
+            #demand in GW, peaking in the evening and in winter#
+            profile = 20.0 * (1 + 0.2 * np.sin(daily_phase - np.pi / 2) + 0.1 * np.cos(yearly_phase))
+            return profile * rng.uniform(0.95, 1.05, PROFILE_HOURS)
+        if "WIND" in asset.asset_name.upper():
+            #capacity factor around 0.35 with noise, from 0 to 1#
+            profile = 0.35 + 0.1 * np.cos(yearly_phase) + 0.15 * rng.standard_normal(PROFILE_HOURS)
+            return np.clip(profile, 0, 1)
+        #PV, daylight between 6 and 18 h#
+        profile = np.clip(-np.cos(daily_phase), 0, None) * (0.8 + 0.1 * np.cos(yearly_phase))
+        return profile * rng.uniform(0.7, 1.0, PROFILE_HOURS)
+
+    def write_profiles(self, base_folder):
+        """Writes the synthetic profiles of all assets with profiles under base_folder and
+        returns the list of profile filenames"""
+        rng = np.random.default_rng(self.seed)
+        network = Network_STEVFNs()
+        network.base_folder = base_folder
+        network.generate_assets(self.get_network_structure_df())
+        network.update_locations(self.get_location_parameters_df())
+        asset_parameters_df = self.get_asset_parameters_df()
+        profile_filenames = []
+        for counter1 in range(len(asset_parameters_df)):
+            asset = network.assets[asset_parameters_df.iloc[counter1]["Asset_Number"]]
+            asset._load_parameters_df(asset_parameters_df.iloc[counter1]["Asset_Type"])
+            profile_filename = asset.get_profile_filename()
+            if profile_filename is None or profile_filename in profile_filenames:
+                continue
+            profile_folder = os.path.dirname(profile_filename)
+            if not os.path.exists(profile_folder):
+                os.makedirs(profile_folder)
+            profile = self.get_profile(asset, rng)
+            if asset.profile_column is None:
+                np.savetxt(profile_filename, profile)
+            else:
+                pd.DataFrame({asset.profile_column: profile, "Unit": "GW"}).to_csv(profile_filename, index=False)
+            profile_filenames += [profile_filename]
+        return profile_filenames
+
+    def write(self, case_study_folder):
+        """Writes the synthetic case study to case_study_folder, with the Network_Structure.csv and
+        one scenario_0 folder, and its profiles under case_study_folder. Returns the base folder
+        of the profiles, to set as base_folder of the networks that solve the case study"""
+        scenario_folder = os.path.join(case_study_folder, "scenario_0")
+        if not os.path.exists(scenario_folder):
+            os.makedirs(scenario_folder)
+        self.get_network_structure_df().to_csv(os.path.join(case_study_folder, "Network_Structure.csv"), index=False)
+        self.get_location_parameters_df().to_csv(os.path.join(scenario_folder, "Location_Parameters.csv"),
+                                                 index=False)
+        self.get_asset_parameters_df().to_csv(os.path.join(scenario_folder, "Asset_Parameters.csv"), index=False)
+        self.get_system_parameters_df().to_csv(os.path.join(scenario_folder, "System_Parameters.csv"), index=False)
+        self.write_profiles(case_study_folder)
+        return case_study_folder
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+On-disk cache of built networks. A built Network_STEVFNs (assets, nodes, edges,
+cvxpy problem and, when it has been compiled, the compiled problem data) is 
+pickled under a key made of the hash of the network structure and the hash of
+the code that builds it. load_or_build builds the network, as
+
+my_network = Network_STEVFNs()
+my_network.build(network_structure_df)
+
+only when it is not in the cache, e.g.
+
+build_cache = Build_Cache_STEVFNs(os.path.join(case_study_folder, "Build_Cache"))
+my_network = build_cache.load_or_build(network_structure_df, solver = cp.MOSEK)
+"""
+
+### Import Packages ###
+
+import os
+import glob
+import pickle
+import hashlib
+import cvxpy as cp
+from cvxpy.lin_ops import lin_utils
+from .Network import Network_STEVFNs
+
+class Build_Cache_STEVFNs:
+    """Pickles built networks in cache_folder, keyed by network structure and code version"""
+    def __init__(self, cache_folder):
+        self.cache_folder = cache_folder
+        self.code_folder = os.path.dirname(os.path.dirname(__file__))
+        self._code_version = None
+        return
+
+    @property
+    def code_version(self):
+        """Hash of the source files in Code and of the cvxpy version"""
+        if self._code_version is None:
+            code_hash = hashlib.sha256(cp.__version__.encode())
+            for filename in sorted(glob.glob(os.path.join(self.code_folder, "**", "*.py"), recursive = True)):
+                code_hash.update(os.path.relpath(filename, self.code_folder).encode())
+                with open(filename, "rb") as code_file:
+                    code_hash.update(code_file.read())
+            self._code_version = code_hash.hexdigest()
+        return self._code_version
+    
+    def get_key(self, network_structure_df, time_aggregation = None, epigraph_costs = False):
+        structure_hash = hashlib.sha256(network_structure_df.to_csv(index = False).encode())
+        structure_hash.update(self.code_version.encode())
+        if time_aggregation is not None:
+            structure_hash.update(time_aggregation.get_key().encode())
+        if epigraph_costs == True:
+            structure_hash.update(b"epigraph_costs")
+        return structure_hash.hexdigest()[:32]
+    
+    def get_filename(self, network_structure_df, time_aggregation = None, epigraph_costs = False):
+        return os.path.join(self.cache_folder, self.get_key(network_structure_df, time_aggregation, epigraph_costs) + 
+                            r".pkl")
+    
+    def save(self, network, network_structure_df, time_aggregation = None):
+        if not os.path.exists(self.cache_folder):
+            os.makedirs(self.cache_folder)
+        filename = self.get_filename(network_structure_df, time_aggregation, network.epigraph_costs)
+        temporary_filename = filename + r"." + str(os.getpid()) + r".tmp"
+        with open(temporary_filename, "wb") as cache_file:
+            #cvxpy ids of the pickled objects are below the current id counter#
+            pickle.dump((lin_utils.ID_COUNTER.count, network), cache_file, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_filename, filename)
+        return
+    
+    def load(self, network_structure_df, time_aggregation = None, epigraph_costs = False):
+        """Returns the cached network or None if there is no cached network"""
+        filename = self.get_filename(network_structure_df, time_aggregation, epigraph_costs)
+        if not os.path.exists(filename):
+            return None
+        with open(filename, "rb") as cache_file:
+            id_count, network = pickle.load(cache_file)
+        #new cvxpy objects must not reuse the ids of the loaded ones#
+        lin_utils.ID_COUNTER.count = max(lin_utils.ID_COUNTER.count, id_count)
+        network.base_folder = os.path.dirname(self.code_folder)
+        return network
+    
+    def load_or_build(self, network_structure_df, solver = cp.CLARABEL, time_aggregation = None, epigraph_costs = False):
+        """Loads the network from the cache or builds it and adds it to the cache.
+        With network.cache_compiled_problem the problem is compiled for solver before
+        it is cached, set solver to None to cache the network without compiling it.
+        Networks built with a time_aggregation or with epigraph_costs are cached under their own key,
+        with epigraph_costs the problem without quadratic costs is the one compiled"""
+        network = self.load(network_structure_df, time_aggregation, epigraph_costs)
+        if network is not None:
+            return network
+        network = Network_STEVFNs()
+        network.epigraph_costs = epigraph_costs
+        network.build(network_structure_df, time_aggregation = time_aggregation)
+        compiled_problem = network.linear_problem if epigraph_costs == True else network.problem
+        if network.cache_compiled_problem == True and solver is not None and compiled_problem.is_dcp(dpp = True):
+            compiled_problem.get_problem_data(solver)
+        self.save(network, network_structure_df, time_aggregation)
+        return network
+    
+    def clear(self):
+        for filename in glob.glob(os.path.join(self.cache_folder, r"*.pkl")):
+            os.remove(filename)
+        return
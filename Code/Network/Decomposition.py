@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:12:37 2026
+
+Decomposition of a built network into the connected components of its asset and
+node graph. Two assets are connected if they have edges to the same (location, type)
+group of nodes, as the node balances of a group are built together. Every component
+is solved as its own problem, one after the other or on a pool of forked worker
+processes, and the solutions are unpacked into the problem of the network, so that
+problem.value is the total cost and all flows hold their values as after a single solve.
+
+Groups of a single node, such as the CO2_Budget node at location 0, couple the
+components of all assets that emit into them through one scalar balance. These
+coupling nodes are reported in coupling_nodes_df and the components they couple are
+merged, so that the decomposed solve stays exact. As every case study has a CO2_Budget,
+the locations of Autarky case studies are then solved as one component.
+
+With coupling_shares, weights of the locations, e.g. their emissions in an earlier solve,
+the components are not merged at scalar coupling nodes. Every component has its own
+copy of the balance of the node, with its share of the inputs of the assets that only
+have edges to scalar nodes, such as the budget of the CO2_Budget asset. The share of a
+component is the sum of the weights of the locations of its assets over the sum of the
+weights of all components of the node. Every location of an Autarky case study is then
+solved as its own component, but the budget cannot move between locations, so the solution
+is feasible but its total cost is only optimal for the given shares and the status is
+optimal_inaccurate.
+
+Networks without transport, as Autarky case studies, are solved per connected component
+with, e.g.
+
+components_df = my_network.solve_components(solver = cp.MOSEK, workers = 2)
+components_df = my_network.solve_components(solver = cp.MOSEK, workers = 2, coupling_shares = {1: 0.4, 2: 0.6})
+"""
+
+### Import Packages ###
+
+import time
+import multiprocessing
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+from cvxpy import settings
+from cvxpy.reductions.solution import Solution
+
+#decomposition used by _solve_worker_component in worker processes, set before forking#
+_worker_decomposition = None
+_worker_options = dict()
+
+
+class Decomposition_STEVFNs:
+    """Connected components of a built network, each with its own problem"""
+    def __init__(self, network, coupling_shares = None):
+        self.network = network
+        self.coupling_shares = coupling_shares#weights of the locations at split scalar coupling nodes#
+        self.split_groups = []#scalar coupling groups whose components are not merged#
+        self.components = []#asset numbers of every component#
+        self.problems = []
+        self.coupling_nodes_df = None
+        self.components_df = None
+        self.build()
+        return
+
+    @property
+    def number_of_components(self):
+        return len(self.components)
+
+    @property
+    def is_decomposed(self):
+        return self.number_of_components > 1
+
+    @staticmethod
+    def _get_asset_components(asset):
+        #Multi_Assets have their edges in the assets of their assets_dictionary#
+        if hasattr(asset, "assets_dictionary"):
+            return list(asset.assets_dictionary.values())
+        return [asset]
+
+    def _get_group_assets(self):
+        #asset numbers with edges to every (location, type) group of nodes#
+        edge_assets = dict()
+        for counter1 in range(len(self.network.assets)):
+            for component in self._get_asset_components(self.network.assets[counter1]):
+                for edge in getattr(component, "edges", []):
+                    edge_assets[edge] = counter1
+        group_assets = dict()
+        group_sizes = dict()
+        self.edge_assets = edge_assets
+        for node_key, node in self.network.nodes_dict.items():
+            assets = group_assets.setdefault(node_key[:2], set())
+            group_sizes[node_key[:2]] = group_sizes.get(node_key[:2], 0) + 1
+            for edges in [node.input_edges, node.output_edges, node.input_block_edges, node.output_block_edges]:
+                assets.update(edge_assets[edge] for edge in edges if edge in edge_assets)
+        return group_assets, group_sizes
+
+    @staticmethod
+    def _find(parents, counter1):
+        while parents[counter1] != counter1:
+            parents[counter1] = parents[parents[counter1]]
+            counter1 = parents[counter1]
+        return counter1
+
+    def _union(self, parents, assets):
+        assets = sorted(assets)
+        for asset_number in assets[1:]:
+            root_1 = self._find(parents, assets[0])
+            root_2 = self._find(parents, asset_number)
+            parents[max(root_1, root_2)] = min(root_1, root_2)
+        return
+
+    def _get_components(self, parents):
+        #asset numbers of every component keyed by the smallest asset number of the component#
+        components = dict()
+        for counter1 in range(len(parents)):
+            components.setdefault(self._find(parents, counter1), []).append(counter1)
+        return components
+
+    def build_components(self):
+        group_assets, group_sizes = self._get_group_assets()
+        #groups of a single node are scalar balances, unless every group has a single time step#
+        scalar_groups = []
+        if self.network.system_structure_properties["simulated_timesteps"] > 1:
+            scalar_groups = [group_key for group_key, group_size in group_sizes.items() if group_size == 1]
+        parents = list(range(len(self.network.assets)))
+        for group_key, assets in group_assets.items():
+            if group_key not in scalar_groups:
+                self._union(parents, assets)
+        components = self._get_components(parents)
+        #assets with edges to scalar groups only, such as the CO2_Budget asset, do not count as coupled#
+        coupled_roots = set(self._find(parents, asset_number) for group_key, assets in group_assets.items()
+                            if group_key not in scalar_groups for asset_number in assets)
+        coupling_nodes = []
+        self.split_groups = []
+        #assets of every scalar group with edges to scalar groups only#
+        uncoupled_assets = dict()
+        for group_key in scalar_groups:
+            roots = sorted(set(self._find(parents, asset_number) for asset_number in group_assets[group_key]) &
+                           coupled_roots)
+            uncoupled_assets[group_key] = [asset_number for asset_number in group_assets[group_key]
+                                           if self._find(parents, asset_number) not in coupled_roots]
+            if len(roots) > 1:
+                split = self.coupling_shares is not None
+                if split:
+                    self.split_groups += [group_key]
+                coupling_nodes += [{"location": group_key[0],
+                                    "type": group_key[1],
+                                    "assets": sorted(group_assets[group_key]),
+                                    "components": [components[root] for root in roots],
+                                    "split": split}]
+        for group_key in scalar_groups:
+            if group_key in self.split_groups:
+                #assets with edges to scalar groups only go with the first component of the group#
+                coupled_assets = sorted(set(group_assets[group_key]) - set(uncoupled_assets[group_key]))
+                self._union(parents, uncoupled_assets[group_key] + coupled_assets[:1])
+            else:
+                self._union(parents, group_assets[group_key])
+        self.coupling_nodes_df = pd.DataFrame(coupling_nodes, columns = ["location", "type", "assets", "components",
+                                                                         "split"])
+        self.components = list(self._get_components(parents).values())
+        return
+
+    def _get_group_constraints(self):
+        #constraints of the node balances of every (location, type) group of nodes#
+        node_keys = {node: node_key for node_key, node in self.network.nodes_dict.items()}
+        group_constraints = dict()
+        for node_group in self.network.node_groups:
+            group_key = node_keys[node_group.nodes[0]][:2]
+            group_constraints.setdefault(group_key, []).extend(node_group.constraints)
+        for node_key, node in self.network.nodes_dict.items():
+            group_constraints.setdefault(node_key[:2], []).extend(node.constraints)
+        return group_constraints
+
+    def _get_node_asset_flows(self, node):
+        #net output flow of node of every asset with edges to it#
+        asset_flows = dict()
+        node_flows = ([(edge, edge.flow) for edge in node.output_edges] +
+                      [(edge, -edge.extract_flow()) for edge in node.input_edges] +
+                      [(edge, edge.select_flow(edge.flow, edge_indices))
+                       for edge, edge_indices in node.output_block_edges.items()] +
+                      [(edge, -edge.select_flow(edge.extract_flow(), edge_indices))
+                       for edge, edge_indices in node.input_block_edges.items()])
+        for edge, flow in node_flows:
+            asset_number = self.edge_assets[edge]
+            asset_flows[asset_number] = asset_flows[asset_number] + flow if asset_number in asset_flows else flow
+        return asset_flows
+
+    def _get_component_shares(self, components):
+        #share of every component of the weights of the locations of its assets#
+        weights = []
+        for component in components:
+            locations = set(self.network.system_structure_df["Location_1"].iloc[component])
+            weights += [sum(self.coupling_shares.get(location, 0) for location in locations)]
+        if sum(weights) <= 0:
+            raise ValueError("coupling_shares has no weight for the locations of the components")
+        return np.array(weights) / sum(weights)
+
+    def _get_split_constraints(self, group_key, asset_components):
+        #balance of the node of group_key for every component, with its share of the uncoupled assets#
+        node = [node for node_key, node in self.network.nodes_dict.items() if node_key[:2] == group_key][0]
+        asset_flows = self._get_node_asset_flows(node)
+        coupling_node = self.coupling_nodes_df[self.coupling_nodes_df["type"] == group_key[1]]
+        coupling_node = coupling_node[coupling_node["location"] == group_key[0]].iloc[0]
+        coupled_assets = set(asset_number for component in coupling_node["components"] for asset_number in component)
+        uncoupled_flows = cp.sum([flow for asset_number, flow in asset_flows.items() if asset_number not in coupled_assets])
+        shares = self._get_component_shares(coupling_node["components"])
+        split_constraints = dict()
+        for component, share in zip(coupling_node["components"], shares):
+            net_output_flows = share * uncoupled_flows + cp.sum([asset_flows[asset_number] for asset_number in component
+                                                                 if asset_number in asset_flows])
+            constraint = net_output_flows <= 0 if node.curtailment == True else net_output_flows == 0
+            split_constraints[asset_components[component[0]]] = [constraint]
+        return split_constraints
+
+    def _get_components_costs_and_constraints(self):
+        #node balances of a group go with the component of the first asset with edges to the group#
+        group_assets, group_sizes = self._get_group_assets()
+        group_constraints = self._get_group_constraints()
+        asset_components = dict()
+        for counter1 in range(self.number_of_components):
+            for asset_number in self.components[counter1]:
+                asset_components[asset_number] = counter1
+        components_constraints = [[] for component in self.components]
+        for group_key, constraints in group_constraints.items():
+            if len(constraints) == 0:
+                continue
+            if group_key in self.split_groups:
+                for counter1, split_constraints in self._get_split_constraints(group_key, asset_components).items():
+                    components_constraints[counter1] += split_constraints
+                continue
+            assets = group_assets[group_key]
+            components_constraints[asset_components[min(assets)]] += constraints
+        components_costs = []
+        for counter1 in range(self.number_of_components):
+            assets = [self.network.assets[asset_number] for asset_number in self.components[counter1]]
+            for asset in assets:
+                components_constraints[counter1] += asset.constraints
+            components_costs += [cp.sum([asset.cost for asset in assets])]
+        return components_costs, components_constraints
+
+    def build_problems(self):
+        components_costs, components_constraints = self._get_components_costs_and_constraints()
+        self.problems = [cp.Problem(cp.Minimize(cost), constraints)
+                         for cost, constraints in zip(components_costs, components_constraints)]
+        return
+
+    def build(self):
+        self.build_components()
+        self.build_problems()
+        return
+
+    def compile(self, solver = cp.CLARABEL, ignore_dpp = False, **solver_options):
+        """Compiles the problems of all components, so that forked workers reuse the compiled problems"""
+        for problem in self.problems:
+            problem.get_problem_data(solver, ignore_dpp = ignore_dpp, solver_opts = solver_options)
+        return
+
+    def solve_component(self, component_number, solver = cp.CLARABEL, ignore_dpp = False, **solver_options):
+        """Solves the problem of a component and returns its status, value, solve time and the
+        values of its variables and dual values of its constraints in the order of the problem"""
+        problem = self.problems[component_number]
+        solve_time = time.time()
+        problem.solve(solver = solver, ignore_dpp = ignore_dpp, **solver_options)
+        solved_time = time.time()
+        return {"status": problem.status,
+                "value": problem.value,
+                "solve_time": solved_time - solve_time,
+                "primal_values": [variable.value for variable in problem.variables()],
+                "dual_values": [constraint.dual_value for constraint in problem.constraints]}
+
+    def solve(self, solver = cp.CLARABEL, workers = 1, ignore_dpp = False, **solver_options):
+        """Solves the problems of all components on workers processes and unpacks their
+        solutions into the problem of the network. Returns components_df"""
+        global _worker_decomposition, _worker_options
+        options = dict(solver = solver, ignore_dpp = ignore_dpp, **solver_options)
+        workers = max(1, min(workers, self.number_of_components))
+        if workers == 1 or "fork" not in multiprocessing.get_all_start_methods():
+            components_results = [self.solve_component(counter1, **options)
+                                  for counter1 in range(self.number_of_components)]
+        else:
+            #forked workers share the compiled problems copy-on-write#
+            self.compile(**options)
+            _worker_decomposition = self
+            _worker_options = options
+            try:
+                with multiprocessing.get_context("fork").Pool(workers) as pool:
+                    components_results = pool.map(_solve_worker_component, range(self.number_of_components),
+                                                  chunksize = 1)
+            finally:
+                _worker_decomposition = None
+                _worker_options = dict()
+        self._unpack(components_results)
+        self.components_df = pd.DataFrame([{"component": counter1,
+                                            "assets": self.components[counter1],
+                                            "status": components_results[counter1]["status"],
+                                            "value": components_results[counter1]["value"],
+                                            "solve_time": components_results[counter1]["solve_time"]}
+                                           for counter1 in range(self.number_of_components)])
+        return self.components_df
+
+    def _unpack(self, components_results):
+        primal_vars = dict()
+        dual_vars = dict()
+        statuses = []
+        for problem, component_results in zip(self.problems, components_results):
+            statuses += [component_results["status"]]
+            for variable, value in zip(problem.variables(), component_results["primal_values"]):
+                primal_vars[variable.id] = value
+            for constraint, value in zip(problem.constraints, component_results["dual_values"]):
+                if value is not None:
+                    dual_vars[constraint.id] = value
+        #the network is only solved if every component is solved#
+        failed_statuses = [status for status in statuses if status not in settings.SOLUTION_PRESENT]
+        if len(failed_statuses) > 0:
+            status = failed_statuses[0]
+            if status not in settings.INF_OR_UNB:
+                raise cp.error.SolverError("A component of the network could not be solved, status " + str(status))
+            opt_val = np.inf if status in [settings.INFEASIBLE, settings.INFEASIBLE_INACCURATE] else -np.inf
+        else:
+            #with split coupling nodes the solution is only optimal for the shares of the coupling nodes#
+            status = settings.OPTIMAL_INACCURATE
+            if all(status == settings.OPTIMAL for status in statuses) and len(self.split_groups) == 0:
+                status = settings.OPTIMAL
+            opt_val = sum(component_results["value"] for component_results in components_results)
+        self.network.problem.unpack(Solution(status, opt_val, primal_vars, dual_vars, dict()))
+        return
+
+
+def _solve_worker_component(component_number):
+    return _worker_decomposition.solve_component(component_number, **_worker_options)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:21:06 2026
+
+Epigraph reformulation of the cost functions of the assets. Every max and maximum
+in a cost, such as the sizing costs sizing_constant * max(flows) and the costs
+maximum(sizing_cost, usage_cost) of storage, is replaced by a new variable that is
+bounded below by the arguments of the max. As costs are minimised and the max only
+appears with nonnegative coefficients, the new variable equals the max at the optimum.
+
+The quadratic terms of the costs, usage_constant_2 * sum_squares(flows), are kept
+separately, so that a network whose quadratic coefficients are all zero is solved
+as a pure LP.
+
+A network is built with the epigraph costs with, e.g.
+
+my_network = build_cache.load_or_build(network_structure_df, solver = cp.HIGHS, epigraph_costs = True)
+"""
+
+### Import Packages ###
+
+import numpy as np
+import cvxpy as cp
+from cvxpy.atoms.max import max as max_atom
+from cvxpy.atoms.elementwise.maximum import maximum
+from cvxpy.atoms.affine.add_expr import AddExpression
+from cvxpy.atoms.affine.binary_operators import multiply, MulExpression
+from cvxpy.atoms.affine.sum import Sum
+
+####### Define Functions #######
+
+def _get_epigraph(expression, constraints):
+    if expression.is_affine():
+        return expression
+    if isinstance(expression, AddExpression):
+        return AddExpression([_get_epigraph(arg, constraints) for arg in expression.args])
+    if isinstance(expression, (multiply, MulExpression)):
+        #only products of a nonnegative constant or parameter with a convex cost keep the max tight#
+        constant_args = [arg for arg in expression.args if len(arg.variables()) == 0]
+        if len(constant_args) != 1 or not constant_args[0].is_nonneg():
+            return expression
+        return type(expression)(*[arg if len(arg.variables()) == 0 else _get_epigraph(arg, constraints)
+                                  for arg in expression.args])
+    if isinstance(expression, Sum) and expression.axis is None:
+        return cp.sum(_get_epigraph(expression.args[0], constraints))
+    if isinstance(expression, max_atom) and expression.axis is None:
+        epigraph_variable = cp.Variable()
+        constraints += [_get_epigraph(expression.args[0], constraints) <= epigraph_variable]
+        return epigraph_variable
+    if isinstance(expression, maximum):
+        epigraph_variable = cp.Variable(expression.shape)
+        constraints += [_get_epigraph(arg, constraints) <= epigraph_variable for arg in expression.args]
+        return epigraph_variable
+    return expression
+
+def get_epigraph_cost(cost):
+    """Returns the cost with every max replaced by an epigraph variable and the constraints
+    that bound the epigraph variables"""
+    constraints = []
+    cost = _get_epigraph(cost, constraints)
+    return cost, constraints
+
+def split_quadratic_terms(cost):
+    """Returns the affine part of a cost and the list of its other terms, such as
+    usage_constant_2 * sum_squares(flows)"""
+    terms = cost.args if isinstance(cost, AddExpression) else [cost]
+    affine_terms = [term for term in terms if term.is_affine()]
+    quadratic_terms = [term for term in terms if not term.is_affine()]
+    if len(affine_terms) == 0:
+        return cp.Constant(0), quadratic_terms
+    return cp.sum(affine_terms), quadratic_terms
+
+def is_zero_term(term):
+    """Returns True if the term is zero for its parameter values, as usage_constant_2 * sum_squares(flows)
+    with usage_constant_2 = 0. Terms without parameters are not zero"""
+    parameters = term.parameters()
+    return len(parameters) > 0 and all(parameter.value is not None and np.all(parameter.value == 0)
+                                       for parameter in parameters)
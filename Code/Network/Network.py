@@ -9,9 +9,19 @@ Created on Thu Nov  4 10:19:15 2021
 ### Import Packages ###
 
 import os
+import warnings
+import numpy as np
 import pandas as pd
 import cvxpy as cp
-from . import Node_STEVFNs
+from cvxpy.reductions.solution import Solution
+from . import Node_STEVFNs, Node_Group_STEVFNs
+from .Decomposition import Decomposition_STEVFNs
+from .Spatial_Decomposition import Spatial_Decomposition_STEVFNs
+from .Sparse_Problem import Sparse_Problem_STEVFNs
+from .Epigraph_Costs import get_epigraph_cost, split_quadratic_terms, is_zero_term
+from .Solver_Chain import Solver_Chain_STEVFNs
+from .Profiler import null_profiler
+from .Size_Estimator import size_estimator
 from ..Assets.Assets_Dictionary import ASSET_DICT
 
 class Network_STEVFNs:
@@ -21,7 +31,8 @@ class Network_STEVFNs:
         self.assets = []
         self.costs = []
         self.constraints = []
-        self.nodes_df = pd.Series([], index = pd.MultiIndex.from_tuples([], names = ["location", "type", "time"]), dtype = "O")
+        self.nodes_dict = dict()#node registry keyed by (location, type, time)#
+        self._nodes_df = None
         self.base_folder = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
         self.system_parameters_df = pd.DataFrame({
             "parameter": ["timestep", "discount_rate", "project_life"],
@@ -30,20 +41,61 @@ class Network_STEVFNs:
         self.system_structure_properties = dict({
             "simulated_timesteps" : 0,})
         self.scenario_name = ""
+        self.vectorized_node_balances = True#builds node balances per (location, type) with a sparse incidence matrix#
+        self.cache_compiled_problem = True#compiles the DPP problem once and reuses it for every scenario#
+        self.time_aggregation = None#representative periods simulated instead of consecutive time steps#
+        self.fixed_capacities = False#assets are limited to capacities set with set_capacities, sizing costs are constant#
+        self.epigraph_costs = False#max in the costs are epigraph variables, zero quadratic costs are dropped at solve#
+        self.quadratic_costs = []#quadratic terms of the costs, with epigraph_costs#
+        self.linear_problem = None#problem without the quadratic costs, with epigraph_costs#
+        self.solver_stats = None#solver statistics of the last solve_problem#
+        self.solver_telemetry = []#attempts of solve_chain, one dict per solver tried#
+        self.node_groups = []
+        self.decomposition = None#connected components of the network, built by solve_components#
+        self.spatial_decomposition = None#subproblems of the locations of the network, built by solve_locations#
+        self.sparse_problem = None#sparse matrices of the problem, assembled by solve_sparse#
+        self.profiler = null_profiler#records the phases of build, update and solve when set to a Profiler_STEVFNs#
         return
     
+    @property
+    def nodes_df(self):
+        """Series of nodes indexed by (location, type, time), built from the node registry on demand"""
+        if self._nodes_df is None:
+            self._nodes_df = pd.Series(list(self.nodes_dict.values()), 
+                                       index = pd.MultiIndex.from_tuples(list(self.nodes_dict.keys()), 
+                                               names = ["location", "type", "time"]), dtype = "O")
+        return self._nodes_df
+    
+    @property
+    def timestep_weights(self):
+        """Weights of the simulated time steps with mean 1, None without time aggregation"""
+        if self.time_aggregation is None:
+            return None
+        return self.time_aggregation.relative_timestep_weights
+    
+    def shift_node_times(self, node_times, shift):
+        """Shifts node_times, the consecutive time steps of an asset, by shift time steps, cyclically
+        within the simulated horizon or, with time aggregation, within every representative period"""
+        node_times = np.asarray(node_times)
+        if self.time_aggregation is not None:
+            return self.time_aggregation.shift_times(node_times, shift)
+        #shifted by position, so that with a Period > 1 the shifted times are time steps of the asset#
+        return np.roll(node_times, -int(shift))
+    
     def generate_node(self, node_location, node_type, node_time):
         new_node = Node_STEVFNs()
-        node_df = pd.Series([new_node], 
-                            index = pd.MultiIndex.from_tuples([(node_location, node_type, node_time)], 
-                                    names = ["location", "type", "time"]))
-        self.nodes_df = pd.concat([self.nodes_df, node_df])
-        return
+        self.nodes_dict[(node_location, node_type, node_time)] = new_node
+        self._nodes_df = None
+        return new_node
     
     def extract_node(self, node_location, node_type, node_time):
-        if not((node_location, node_type, node_time) in self.nodes_df.index):
-            self.generate_node(node_location, node_type, node_time)
-        return self.nodes_df[node_location, node_type, node_time]
+        node = self.nodes_dict.get((node_location, node_type, node_time))
+        if node is None:
+            node = self.generate_node(node_location, node_type, node_time)
+        return node
+    
+    def extract_nodes(self, node_location, node_type, node_times):
+        return [self.extract_node(node_location, node_type, node_time) for node_time in node_times]
     
     def add_asset(self, asset):
         asset.network = self
@@ -53,57 +105,204 @@ class Network_STEVFNs:
     def build_assets(self):
         self.costs = []
         for counter1 in range(len(self.assets)):
-            self.assets[counter1].build()
+            with self.profiler.phase(self.assets[counter1].asset_name):
+                self.assets[counter1].build()
+                if self.epigraph_costs == True:
+                    self._build_epigraph_cost(self.assets[counter1])
             self.costs += [self.assets[counter1].cost]
         return
     
+    def _build_epigraph_cost(self, asset):
+        asset.cost, epigraph_constraints = get_epigraph_cost(asset.cost)
+        asset.constraints += epigraph_constraints
+        return
+    
     def build_system_structure_properties(self):
-        self.system_structure_properties["simulated_timesteps"] = (self.nodes_df.index.get_level_values("time").max() -
-                                                                   self.nodes_df.index.get_level_values("time").min() + 1)
+        node_times = [node_key[2] for node_key in self.nodes_dict.keys()]
+        self.system_structure_properties["simulated_timesteps"] = max(node_times) - min(node_times) + 1
         return
     
     def build_constraints(self):
-        self._build_nodes()
-        self._update_constraints()
+        if self.vectorized_node_balances == True:
+            with self.profiler.phase("_build_node_groups"):
+                self._build_node_groups()
+        else:
+            with self.profiler.phase("_build_nodes"):
+                self._build_nodes()
+        with self.profiler.phase("_update_constraints"):
+            self._update_constraints()
         return
     
     def _build_nodes(self):
-        for counter1 in range(self.nodes_df.size):
-            node = self.nodes_df.iloc[counter1]
+        self.node_groups = []
+        for node in self.nodes_dict.values():
             node.build_constraints()
         return
     
+    def _build_node_groups(self):
+        #Groups nodes by (location, type) and builds one vector balance per group#
+        nodes_by_group = dict()
+        for node_key, node in self.nodes_dict.items():
+            nodes_by_group.setdefault(node_key[:2], []).append(node)
+        self.node_groups = []
+        for nodes in nodes_by_group.values():
+            node_group = Node_Group_STEVFNs(nodes)
+            node_group.build_constraints()
+            self.node_groups += [node_group]
+        return
+    
     def _update_constraints(self):
         self.constraints = []
-        for counter1 in range(self.nodes_df.size):
-            node = self.nodes_df.iloc[counter1]
+        for node_group in self.node_groups:
+            self.constraints += node_group.constraints
+        for node in self.nodes_dict.values():
             self.constraints += node.constraints
+        for asset in self.assets:
+            self.constraints += asset.constraints
         return
     
     
     def build_cost(self):
         self.cost = cp.sum(self.costs)
+        self.quadratic_costs = []
+        if self.epigraph_costs == True:
+            linear_costs = []
+            for cost in self.costs:
+                linear_cost, quadratic_costs = split_quadratic_terms(cost)
+                linear_costs += [linear_cost]
+                self.quadratic_costs += quadratic_costs
+            self.linear_cost = cp.sum(linear_costs)
+        return
+    
+    def _build_linear_problem(self):
+        self.linear_problem = None
+        if self.epigraph_costs == True:
+            self.linear_problem = cp.Problem(cp.Minimize(self.linear_cost), self.constraints)
         return
     
     def build_problem(self):
-        self.build_assets()
+        with self.profiler.phase("build_assets"):
+            self.build_assets()
         self.build_system_structure_properties()
-        self.build_cost()
-        self.build_constraints()
+        with self.profiler.phase("build_cost"):
+            self.build_cost()
+        with self.profiler.phase("build_constraints"):
+            self.build_constraints()
         self.objective = cp.Minimize(self.cost)
         self.problem = cp.Problem(self.objective, self.constraints)
+        self._build_linear_problem()
+        self.decomposition = None
+        self.spatial_decomposition = None
+        with self.profiler.phase("check_dpp"):
+            is_dpp = self.problem.is_dcp(dpp = True)
+        if self.cache_compiled_problem == True and not is_dpp:
+            warnings.warn("Network problem is not DPP, it will be recompiled for every scenario")
         return
     
     def update_problem(self):
         self._update_constraints()
         self.problem = cp.Problem(self.objective, self.constraints)
+        self._build_linear_problem()
+        self.decomposition = None
+        self.spatial_decomposition = None
+        return
+    
+    def is_linear(self):
+        """Returns True if the network is solved as an LP, with epigraph_costs and all quadratic costs zero"""
+        return self.epigraph_costs == True and all(is_zero_term(cost) for cost in self.quadratic_costs)
+    
+    def _get_solved_problem(self):
+        #with epigraph_costs and zero quadratic costs the LP without them is solved#
+        if self.is_linear() and len(self.quadratic_costs) > 0:
+            return self.linear_problem
+        return self.problem
+    
+    def _unpack_solved_problem(self, solved_problem):
+        #the variables are shared, so the problem of the network only needs the status and value#
+        if solved_problem is self.problem:
+            return
+        primal_vars = {variable.id: variable.value for variable in self.problem.variables()}
+        dual_vars = {constraint.id: constraint.dual_value for constraint in self.problem.constraints
+                     if constraint.dual_value is not None}
+        self.problem.unpack(Solution(solved_problem.status, solved_problem.value, primal_vars, dual_vars, dict()))
         return
     
-    def solve_problem(self):
-        self.problem.solve(solver = cp.CLARABEL, max_iter=10000)
+    def solve_problem(self, solver = cp.CLARABEL, **solver_options):
+        #with cache_compiled_problem cvxpy keeps the compiled problem data on self.problem,#
+        #so solves after update() only substitute the new parameter values#
+        if solver == cp.CLARABEL:
+            solver_options.setdefault("max_iter", 10000)
+        ignore_dpp = self.cache_compiled_problem != True
+        solved_problem = self._get_solved_problem()
+        with self.profiler.phase("solve_problem", solver = solver):
+            solved_problem.solve(solver = solver, ignore_dpp = ignore_dpp, **solver_options)
+            #cvxpy and the solver report the times of the compilation and of the solver#
+            self.profiler.add_phase("compilation", solved_problem.compilation_time)
+            self.profiler.add_phase("solver", solved_problem.solver_stats.solve_time)
+        self.solver_stats = solved_problem.solver_stats
+        self._unpack_solved_problem(solved_problem)
+        if self.profiler.enabled == True:
+            self.profiler.count_network(self, solver)
         # self.problem.solve(solver = cp.ECOS, warm_start=True, max_iters=1000)
         return
     
+    def solve_chain(self, solver_configs = None):
+        """Solves the problem with the first solver of solver_configs that returns an accurate status,
+        see Solver_Chain_STEVFNs, by default MOSEK, CLARABEL and SCS. The attempts are added to
+        self.solver_telemetry and returned"""
+        return Solver_Chain_STEVFNs(solver_configs).solve(self)
+    
+    @property
+    def telemetry_df(self):
+        """DataFrame of the attempts of all solve_chain calls"""
+        return pd.DataFrame(self.solver_telemetry)
+    
+    def solve_sparse(self, solver = "CLARABEL", **solver_options):
+        """Solves the problem assembled directly as sparse matrices, without the compilation of cvxpy,
+        with "CLARABEL" or, for LPs, "HIGHS". The solution is set on self.problem as by solve_problem,
+        which can be used to verify the results"""
+        solved_problem = self._get_solved_problem()
+        self.sparse_problem = Sparse_Problem_STEVFNs(solved_problem)
+        with self.profiler.phase("solve_sparse", solver = solver):
+            with self.profiler.phase("assemble"):
+                self.sparse_problem.assemble()
+            with self.profiler.phase("solver"):
+                self.sparse_problem.solve(solver = solver, **solver_options)
+        self._unpack_solved_problem(solved_problem)
+        return
+    
+    def solve_components(self, solver = cp.CLARABEL, workers = 1, coupling_shares = None, **solver_options):
+        """Solves every connected component of the network as its own problem, on workers
+        processes, and sets the solution of self.problem. Components coupled through a scalar
+        node are solved together and reported in self.decomposition.coupling_nodes_df, or, with
+        coupling_shares, a dict of the weights of the locations, solved separately with their
+        share of the node, see Decomposition_STEVFNs.
+        Returns a DataFrame of the assets, status, value and solve time of every component"""
+        if self.decomposition is None or self.decomposition.coupling_shares != coupling_shares:
+            self.decomposition = Decomposition_STEVFNs(self, coupling_shares)
+        if solver == cp.CLARABEL:
+            solver_options.setdefault("max_iter", 10000)
+        ignore_dpp = self.cache_compiled_problem != True
+        return self.decomposition.solve(solver = solver, workers = workers, ignore_dpp = ignore_dpp, **solver_options)
+    
+    def solve_locations(self, solver = cp.CLARABEL, workers = 1, tolerance = 1e-3, max_iterations = 1000, rho = 1.0,
+                        **solver_options):
+        """Solves the subproblems of every location of the network on workers processes, coordinated
+        with ADMM through the transport flows and CO2 emissions they share, and sets the solution of
+        self.problem. tolerance is the relative tolerance of the ADMM residuals. Returns a DataFrame of
+        the assets, status, cost and solve time of every location, the ADMM iterations are in
+        self.spatial_decomposition.iterations_df. The status of self.problem is optimal_inaccurate
+        when the locations are coupled, the final residuals are in self.spatial_decomposition"""
+        if self.spatial_decomposition is None:
+            self.spatial_decomposition = Spatial_Decomposition_STEVFNs(self, rho)
+        self.spatial_decomposition.rho = rho
+        if solver == cp.CLARABEL:
+            solver_options.setdefault("max_iter", 10000)
+        ignore_dpp = self.cache_compiled_problem != True
+        return self.spatial_decomposition.solve(solver = solver, workers = workers, ignore_dpp = ignore_dpp,
+                                                tolerance = tolerance, max_iterations = max_iterations,
+                                                **solver_options)
+    
     def satisfy_net_loads(self):
         for counter1 in range(len(self.assets)):
             asset = self.assets[counter1]
@@ -118,32 +317,80 @@ class Network_STEVFNs:
         my_asset.define_structure(asset_structure)
         return
     
-    def build(self, network_structure_df):
+    def generate_assets(self, network_structure_df):
         #Set System Structure#
         self.system_structure_df = network_structure_df[["Asset_Number", "Asset_Class", "Location_1", "Location_2"]]
         #Generate Assets#
         for counter1 in range(len(network_structure_df)):
             self.generate_asset(network_structure_df.iloc[counter1])
-        #Build Problem#
-        self.build_problem()
         return
     
-    def update(self, location_parameters_df, asset_parameters_df, system_parameters_df):
-        #updates system parameters#
-        for counter1 in range(len(system_parameters_df)):
-            tdf = system_parameters_df.iloc[counter1]
-            self.system_parameters_df.loc[tdf["parameter"], "value"] = tdf["value"]
-            self.system_parameters_df.loc[tdf["parameter"], "unit"] = tdf["unit"]
+    @staticmethod
+    def estimate_size(network_structure_df, available_memory_MB = None, epigraph_costs = False):
+        """Returns the estimated nodes, variables, constraints, nonzeros and peak memory of build and solve
+        of the network of network_structure_df, without building it, see Size_Estimator_STEVFNs. Raises
+        MemoryError if the peak memory is more than available_memory_MB, by default the available memory"""
+        return size_estimator.check(network_structure_df, available_memory_MB, epigraph_costs)
+    
+    def build(self, network_structure_df, time_aggregation = None):
+        #with time aggregation the simulated time steps are those of the representative periods#
+        self.time_aggregation = time_aggregation
+        if time_aggregation is not None:
+            network_structure_df = time_aggregation.get_network_structure_df(network_structure_df)
+        with self.profiler.phase("build"):
+            with self.profiler.phase("generate_assets"):
+                self.generate_assets(network_structure_df)
+            #Build Problem#
+            with self.profiler.phase("build_problem"):
+                self.build_problem()
+        if self.profiler.enabled == True:
+            self.profiler.count_network(self)
+        return
+    
+    def update_locations(self, location_parameters_df):
         #Update Location lat,lon#
         for counter1 in range(len(location_parameters_df)):
             location = location_parameters_df.iloc[counter1]["Location"]
             self.lat_lon_df.loc[location, "lat"] = location_parameters_df.iloc[counter1]["lat"]
             self.lat_lon_df.loc[location, "lon"] = location_parameters_df.iloc[counter1]["lon"]
-        #update Assets#
+        return
+    
+    def get_full_profiles(self, location_parameters_df, asset_parameters_df):
+        """Returns a dict of the full profiles of all assets with profiles, keyed by filename.
+        The assets only need to be generated, the network does not need to be built"""
+        self.update_locations(location_parameters_df)
+        profiles_dict = dict()
         for counter1 in range(len(asset_parameters_df)):
-            asset_number = asset_parameters_df.iloc[counter1]["Asset_Number"]
-            asset_type = asset_parameters_df.iloc[counter1]["Asset_Type"]
-            self.assets[asset_number].update(asset_type)
+            asset = self.assets[asset_parameters_df.iloc[counter1]["Asset_Number"]]
+            asset._load_parameters_df(asset_parameters_df.iloc[counter1]["Asset_Type"])
+            profile_filename = asset.get_profile_filename()
+            if profile_filename is not None:
+                profiles_dict[profile_filename] = asset.get_full_profile()
+        return profiles_dict
+    
+    def get_capacities(self):
+        """Returns the sizes of the assets after a solve, for set_capacities of a network with fixed capacities"""
+        return [asset.get_capacity() for asset in self.assets]
+    
+    def set_capacities(self, capacities):
+        for counter1 in range(len(self.assets)):
+            self.assets[counter1].set_capacity(capacities[counter1])
+        return
+    
+    def update(self, location_parameters_df, asset_parameters_df, system_parameters_df):
+        with self.profiler.phase("update"):
+            #updates system parameters#
+            for counter1 in range(len(system_parameters_df)):
+                tdf = system_parameters_df.iloc[counter1]
+                self.system_parameters_df.loc[tdf["parameter"], "value"] = tdf["value"]
+                self.system_parameters_df.loc[tdf["parameter"], "unit"] = tdf["unit"]
+            self.update_locations(location_parameters_df)
+            #update Assets#
+            for counter1 in range(len(asset_parameters_df)):
+                asset_number = asset_parameters_df.iloc[counter1]["Asset_Number"]
+                asset_type = asset_parameters_df.iloc[counter1]["Asset_Type"]
+                with self.profiler.phase(self.assets[asset_number].asset_name):
+                    self.assets[asset_number].update(asset_type)
         return
     
 
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:26:51 2026
+
+Profiler of the phases of a network. A network records its phases when its profiler
+is a Profiler_STEVFNs, e.g. my_network.profiler = Profiler_STEVFNs() before build:
+build per asset, the node balances and constraints, update per asset, the compilation
+of cvxpy and the solver, and the phases added with my_network.profiler.phase(name),
+e.g. around the export of the results. Every phase records its wall time and, with
+trace_allocations, the memory allocated by python and numpy during the phase and its
+peak, traced with tracemalloc. The memory allocated by the solvers is not traced. Tracing
+slows down python code, with trace_allocations = False only the times are recorded.
+
+The profiler also counts the nodes, edges, variables, constraints and nonzeros of the
+problem. The report is exported with to_json(), to_chrome_trace(), in the trace event
+format of chrome://tracing, Perfetto and speedscope, and to_folded_stacks(), in the
+folded stacks format of flamegraph.pl.
+
+The phases of a case study are profiled with, e.g.
+
+my_network = Network_STEVFNs()
+my_network.profiler = Profiler_STEVFNs()
+my_network.build(network_structure_df)
+...
+with my_network.profiler.phase("results"):
+    results_df = Results.get_total_data(my_network, location_parameters_df, asset_parameters_df)
+my_network.profiler.get_summary_df() # phases sorted by self time
+my_network.profiler.to_folded_stacks(os.path.join(results_folder, "profile.folded"))
+"""
+
+### Import Packages ###
+
+import os
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+import scipy.sparse as sp
+
+
+def get_edges(asset):
+    """Returns the edges of asset and of the assets of multi assets"""
+    edges = list(getattr(asset, "edges", []))
+    for sub_asset in getattr(asset, "assets_dictionary", dict()).values():
+        edges += get_edges(sub_asset)
+    return edges
+
+
+class Profiler_STEVFNs:
+    """Records the wall time and memory allocations of nested phases"""
+    def __init__(self, trace_allocations = True, enabled = True):
+        self.trace_allocations = trace_allocations
+        self.enabled = enabled
+        self.records = []
+        self.counts = dict()
+        self._stack = []
+        self._start_time = time.perf_counter()
+        self._started_tracemalloc = False
+        return
+
+    def _start_tracing(self):
+        if self.trace_allocations == True and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return
+
+    def stop(self):
+        """Stops tracemalloc if it was started by the profiler"""
+        if self._started_tracemalloc == True:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return
+
+    def _get_traced_memory(self):
+        if self.trace_allocations == True and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()
+        return None, None
+
+    def _open_frame(self, name, attributes):
+        self._start_tracing()
+        current_memory, peak_memory = self._get_traced_memory()
+        if current_memory is not None:
+            #the peak is reset for the new phase, the open phases keep the peak so far#
+            for frame in self._stack:
+                frame["peak_memory"] = max(frame["peak_memory"], peak_memory)
+            tracemalloc.reset_peak()
+        frame = {"name": name,
+                 "path": ";".join([stack_frame["name"] for stack_frame in self._stack] + [name]),
+                 "depth": len(self._stack),
+                 "start": time.perf_counter() - self._start_time,
+                 "start_memory": current_memory,
+                 "peak_memory": current_memory,
+                 "children_time": 0,
+                 "children_end": 0,
+                 "attributes": attributes}
+        self._stack += [frame]
+        return frame
+
+    def _close_frame(self, frame):
+        current_memory, peak_memory = self._get_traced_memory()
+        duration = time.perf_counter() - self._start_time - frame["start"]
+        record = {"name": frame["name"],
+                  "path": frame["path"],
+                  "depth": frame["depth"],
+                  "start": frame["start"],
+                  "duration": duration,
+                  "self_time": max(duration - frame["children_time"], 0),
+                  "allocated_MB": None,
+                  "peak_allocated_MB": None}
+        if current_memory is not None and frame["start_memory"] is not None:
+            frame["peak_memory"] = max(frame["peak_memory"], peak_memory)
+            record["allocated_MB"] = (current_memory - frame["start_memory"]) / 2**20
+            record["peak_allocated_MB"] = (frame["peak_memory"] - frame["start_memory"]) / 2**20
+        record.update(frame["attributes"])
+        self._stack.pop()
+        self._add_child(frame["start"], duration)
+        for parent_frame in self._stack:
+            if frame["peak_memory"] is not None and parent_frame["peak_memory"] is not None:
+                parent_frame["peak_memory"] = max(parent_frame["peak_memory"], frame["peak_memory"])
+        self.records += [record]
+        return record
+
+    def _add_child(self, start, duration):
+        #the open phase keeps the time and the end of the phases nested in it#
+        if len(self._stack) > 0:
+            self._stack[-1]["children_time"] += duration
+            self._stack[-1]["children_end"] = max(self._stack[-1]["children_end"], start + duration)
+        return
+
+    @contextmanager
+    def phase(self, name, **attributes):
+        """Records the phase name while the with block runs, nested in the open phases"""
+        if self.enabled != True:
+            yield
+            return
+        frame = self._open_frame(name, attributes)
+        try:
+            yield
+        finally:
+            self._close_frame(frame)
+        return
+
+    def add_phase(self, name, duration, **attributes):
+        """Records a phase of the given duration, measured elsewhere, e.g. by the solver,
+        in the open phase after the phases already recorded in it"""
+        if self.enabled != True or duration is None:
+            return
+        start = 0
+        if len(self._stack) > 0:
+            start = max(self._stack[-1]["start"], self._stack[-1]["children_end"])
+        path = ";".join([stack_frame["name"] for stack_frame in self._stack] + [name])
+        record = {"name": name, "path": path, "depth": len(self._stack), "start": start, "duration": duration,
+                  "self_time": duration, "allocated_MB": None, "peak_allocated_MB": None}
+        record.update(attributes)
+        self._add_child(start, duration)
+        self.records += [record]
+        return
+
+    def count_network(self, network, solver = None):
+        """Counts the nodes, edges, variables and constraints of network and, with solver, the
+        nonzeros of the problem data of solver, which needs the problem to be compiled for solver"""
+        if self.enabled != True:
+            return self.counts
+        edges = [edge for asset in network.assets for edge in get_edges(asset)]
+        self.counts["assets"] = len(network.assets)
+        self.counts["nodes"] = len(network.nodes_dict)
+        self.counts["edges"] = int(sum(edge.flow.size for edge in edges))
+        self.counts["block_edges"] = len(edges)
+        problem = network.problem
+        self.counts["variables"] = int(sum(variable.size for variable in problem.variables()))
+        self.counts["parameters"] = int(sum(parameter.size for parameter in problem.parameters()))
+        self.counts["constraints"] = int(sum(constraint.size for constraint in problem.constraints))
+        if solver is not None and self.counts["variables"] == 0:
+            #cvxpy does not compile problems without variables#
+            self.counts["nonzeros"] = 0
+        elif solver is not None:
+            solved_problem = network._get_solved_problem()
+            problem_data = solved_problem.get_problem_data(solver, ignore_dpp = network.cache_compiled_problem != True)[0]
+            self.counts["nonzeros"] = int(sum(value.nnz for value in problem_data.values() if sp.issparse(value)))
+        return self.counts
+
+    def get_records_df(self):
+        """DataFrame of the phases, in the order they ended"""
+        return pd.DataFrame(self.records)
+
+    def get_summary_df(self):
+        """DataFrame of the calls, total time, self time and allocations of every phase path,
+        sorted by self time, e.g. BESS under build;build_problem;build_assets"""
+        records_df = self.get_records_df()
+        if len(records_df) == 0:
+            return pd.DataFrame(columns = ["path", "calls", "total_time", "self_time", "allocated_MB",
+                                           "peak_allocated_MB"])
+        summary_df = records_df.groupby("path").agg(calls = ("duration", "size"),
+                                                    total_time = ("duration", "sum"),
+                                                    self_time = ("self_time", "sum"),
+                                                    allocated_MB = ("allocated_MB", "sum"),
+                                                    peak_allocated_MB = ("peak_allocated_MB", "max"))
+        return summary_df.sort_values("self_time", ascending = False).reset_index()
+
+    def to_json(self, filename = None):
+        """Returns the report as a dict of the counts and phases, written to filename if given"""
+        report = {"counts": self.counts,
+                  "phases": self.records}
+        if filename is not None:
+            with open(filename, "w") as report_file:
+                json.dump(report, report_file, indent = 1, default = str)
+        return report
+
+    def to_chrome_trace(self, filename):
+        """Writes the phases in the trace event format, times in microseconds"""
+        trace_events = []
+        for record in sorted(self.records, key = lambda record: (record["start"], record["depth"])):
+            trace_events += [{"name": record["name"],
+                              "cat": "STEVFNs",
+                              "ph": "X",
+                              "ts": record["start"] * 1e6,
+                              "dur": record["duration"] * 1e6,
+                              "pid": os.getpid(),
+                              "tid": 0,
+                              "args": {key: value for key, value in record.items()
+                                       if key not in ["name", "start", "duration"]}}]
+        with open(filename, "w") as trace_file:
+            json.dump({"traceEvents": trace_events, "otherData": self.counts}, trace_file, default = str)
+        return
+
+    def to_folded_stacks(self, filename):
+        """Writes the self times of the phase paths in microseconds, one path per line"""
+        self_times = dict()
+        for record in self.records:
+            self_times[record["path"]] = self_times.get(record["path"], 0) + record["self_time"]
+        with open(filename, "w") as folded_file:
+            for path, self_time in self_times.items():
+                folded_file.write(path.replace(" ", "_") + " " + str(int(round(self_time * 1e6))) + "\n")
+        return
+
+
+#profiler of the networks that are not profiled, records nothing#
+null_profiler = Profiler_STEVFNs(trace_allocations = False, enabled = False)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:03:17 2026
+
+Estimates of the size and peak memory of a network from its Network_Structure.csv,
+without building it. Every asset adds variables, parameters, constraints, nonzeros of
+the compiled problem and variables of its cost that grow linearly with its number of
+time steps, from Start_Time,
+End_Time and Period, and nodes of its node types at its locations. Nodes shared by
+assets, e.g. the EL nodes of a location, have one balance constraint, so the node
+balances are counted once per location and node type.
+
+The coefficients of every asset class are calibrated by calibrate_assets(), which
+builds one synthetic network per asset class of ASSET_DICT at a few horizons and
+counts its problem, compiled for CLARABEL. The peak memory of build and solve is a
+linear function of the nonzeros, fitted by calibrate_memory() to the records of
+Code.Benchmark.Benchmark. The coefficients are saved in Size_Calibration.
+
+With quadratic costs cvxpy compiles the cost through a dense array of the variables
+of the cost by the parameters of the problem, so large networks with quadratic costs
+fail to compile once that array is larger than the memory of the machine, although
+its untouched pages do not add to the resident memory. Its size is estimated as
+dense_cost_coefficients_MB, it is 0 with epigraph_costs, where the LP without the
+quadratic costs is compiled.
+
+Run python -m Code.Network.Size_Estimator <Network_Structure.csv> from the base
+folder for the estimate of a case study, or with --calibrate <benchmarks.jsonl> to
+calibrate the estimator again.
+
+Before a network is built, e.g.
+
+print(Network_STEVFNs.estimate_size(network_structure_df))
+
+returns the estimate and raises MemoryError if the peak memory does not fit in the
+available memory.
+"""
+
+### Import Packages ###
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+from cvxpy.reductions.dcp2cone.dcp2cone import Dcp2Cone
+from cvxpy.atoms.quad_form import SymbolicQuadForm
+
+QUANTITIES = ["variables", "parameters", "constraints", "nonzeros", "cost_variables"]
+
+
+def get_memory():
+    """Returns the memory available for new processes and the total memory, with swap, in MB,
+    None where they are not known"""
+    try:
+        meminfo = dict()
+        with open("/proc/meminfo", "r") as meminfo_file:
+            for line in meminfo_file:
+                meminfo[line.split(":")[0]] = float(line.split()[1]) / 2**10
+        return meminfo.get("MemAvailable"), meminfo["MemTotal"] + meminfo.get("SwapTotal", 0)
+    except (OSError, KeyError):
+        pass
+    try:
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        return (os.sysconf("SC_AVPHYS_PAGES") * page_size / 2**20, os.sysconf("SC_PHYS_PAGES") * page_size / 2**20)
+    except (ValueError, OSError, AttributeError):
+        return None, None
+
+
+def _get_cost_variables(expression, cost_variables):
+    #every quadratic term is one variable of the cost, the variables in it are not#
+    if isinstance(expression, SymbolicQuadForm):
+        return 1
+    if isinstance(expression, cp.Variable):
+        cost_variables[expression.id] = expression.size
+        return 0
+    return sum(_get_cost_variables(arg, cost_variables) for arg in expression.args)
+
+
+def get_number_of_cost_variables(problem):
+    """Returns the number of variables of the cost of problem as compiled by cvxpy for quadratic
+    costs, the rows of its dense cost coefficients"""
+    canonical_problem = Dcp2Cone(quad_obj = True).apply(problem)[0]
+    cost_variables = dict()
+    number_of_quadratic_terms = _get_cost_variables(canonical_problem.objective.expr, cost_variables)
+    return int(sum(cost_variables.values())) + number_of_quadratic_terms
+
+
+def get_number_of_timesteps(asset_structure):
+    return len(range(int(asset_structure["Start_Time"]), int(asset_structure["End_Time"]),
+                     int(asset_structure["Period"])))
+
+
+class Size_Estimator_STEVFNs:
+    """Estimates the size and peak memory of networks from their network structure"""
+    def __init__(self, calibration_folder = None):
+        if calibration_folder is None:
+            calibration_folder = os.path.join(os.path.dirname(__file__), "Size_Calibration")
+        self.calibration_folder = calibration_folder
+        self.assets_filename = os.path.join(calibration_folder, "assets.csv")
+        self.nodes_filename = os.path.join(calibration_folder, "nodes.csv")
+        self.memory_filename = os.path.join(calibration_folder, "memory.csv")
+        self._assets_df = None
+        self._nodes_df = None
+        self._memory_df = None
+        return
+
+    def _load(self):
+        if self._assets_df is not None:
+            return
+        if not os.path.exists(self.assets_filename):
+            #not calibrated yet#
+            self._assets_df = pd.DataFrame(columns = ["Asset_Class"] + [quantity + suffix for quantity in QUANTITIES 
+                                                                        for suffix in ["_fixed", "_per_step"]] + 
+                                           ["quadratic_cost"])
+            self._assets_df = self._assets_df.set_index("Asset_Class")
+            self._nodes_df = pd.DataFrame(columns = ["Asset_Class", "location", "node_type", "fixed", "per_step"])
+            self._memory_df = pd.DataFrame({"phase": ["base", "build", "solve"], "fixed_MB": 0.0, 
+                                            "MB_per_nonzero": 0.0}).set_index("phase")
+            return
+        self._assets_df = pd.read_csv(self.assets_filename).set_index("Asset_Class")
+        self._nodes_df = pd.read_csv(self.nodes_filename)
+        self._memory_df = pd.read_csv(self.memory_filename).set_index("phase")
+        return
+
+    def save(self):
+        if not os.path.exists(self.calibration_folder):
+            os.makedirs(self.calibration_folder)
+        self._assets_df.reset_index().to_csv(self.assets_filename, index=False)
+        self._nodes_df.to_csv(self.nodes_filename, index=False)
+        self._memory_df.reset_index().to_csv(self.memory_filename, index=False)
+        return
+
+    def estimate(self, network_structure_df, epigraph_costs = False):
+        """Returns a dict of the estimated number of assets, nodes, variables, parameters, constraints,
+        nonzeros and variables of the costs, of the peak memory of build and solve and of the dense
+        cost coefficients of cvxpy in MB"""
+        self._load()
+        estimate = {"assets": len(network_structure_df),
+                    "timesteps": 0,
+                    "nodes": 0}
+        estimate.update({quantity: 0.0 for quantity in QUANTITIES})
+        quadratic_cost = False
+        node_counts = dict()
+        nodes_by_class = dict(list(self._nodes_df.groupby("Asset_Class")))
+        for counter1 in range(len(network_structure_df)):
+            asset_structure = network_structure_df.iloc[counter1]
+            asset_class = asset_structure["Asset_Class"]
+            if asset_class not in self._assets_df.index:
+                raise ValueError("Asset class " + asset_class + " is not calibrated, run calibrate_assets")
+            timesteps = get_number_of_timesteps(asset_structure)
+            estimate["timesteps"] = max(estimate["timesteps"], timesteps)
+            coefficients = self._assets_df.loc[asset_class]
+            quadratic_cost = quadratic_cost or coefficients["quadratic_cost"] == True
+            for quantity in QUANTITIES:
+                estimate[quantity] += coefficients[quantity + "_fixed"] + coefficients[quantity + "_per_step"] * timesteps
+            #the node balances of the asset are replaced by those of the nodes it shares with the others#
+            for node_row in nodes_by_class.get(asset_class, pd.DataFrame()).to_dict("records"):
+                number_of_nodes = node_row["fixed"] + node_row["per_step"] * timesteps
+                estimate["constraints"] -= number_of_nodes
+                node_key = (asset_structure[node_row["location"]], node_row["node_type"])
+                node_counts[node_key] = max(node_counts.get(node_key, 0), number_of_nodes)
+        estimate["nodes"] = int(round(sum(node_counts.values())))
+        estimate["constraints"] += estimate["nodes"]
+        for quantity in QUANTITIES:
+            estimate[quantity] = int(round(max(estimate[quantity], 0)))
+        base_memory = self._memory_df.loc["base", "fixed_MB"]
+        for phase in ["build", "solve"]:
+            estimate[phase + "_peak_memory_MB"] = float(base_memory + self._memory_df.loc[phase, "fixed_MB"] +
+                                                        self._memory_df.loc[phase, "MB_per_nonzero"] *
+                                                        estimate["nonzeros"])
+        estimate["dense_cost_coefficients_MB"] = 0.0
+        if quadratic_cost and epigraph_costs != True:
+            estimate["dense_cost_coefficients_MB"] = 8 * estimate["cost_variables"] * (estimate["parameters"] + 1) / 2**20
+        return estimate
+
+    def check(self, network_structure_df, available_memory_MB = None, epigraph_costs = False):
+        """Returns the estimate of network_structure_df and raises MemoryError if its peak memory is
+        more than available_memory_MB, by default the memory available on the machine, or its dense
+        cost coefficients more than the total memory of the machine"""
+        estimate = self.estimate(network_structure_df, epigraph_costs)
+        total_memory_MB = None
+        if available_memory_MB is None:
+            available_memory_MB, total_memory_MB = get_memory()
+        peak_memory = max(estimate["build_peak_memory_MB"], estimate["solve_peak_memory_MB"])
+        if available_memory_MB is not None and peak_memory > available_memory_MB:
+            raise MemoryError("The network needs about " + str(int(peak_memory)) + " MB, only " +
+                              str(int(available_memory_MB)) + " MB are available")
+        if total_memory_MB is None:
+            total_memory_MB = available_memory_MB
+        if total_memory_MB is not None and estimate["dense_cost_coefficients_MB"] > total_memory_MB:
+            raise MemoryError("cvxpy needs about " + str(int(estimate["dense_cost_coefficients_MB"])) + 
+                              " MB to compile the quadratic costs, more than the " + str(int(total_memory_MB)) + 
+                              " MB of the machine, build the network with epigraph_costs")
+        return estimate
+
+    @staticmethod
+    def _count_asset_class(asset_class, number_of_timesteps, folder, solver):
+        #counts a synthetic network of the CO2_Budget and one asset of asset_class, at two locations for transport#
+        from .Network import Network_STEVFNs
+        from .Profiler import Profiler_STEVFNs
+        from ..Benchmark.Synthetic_Network import Synthetic_Network_STEVFNs
+        transport = asset_class.endswith("Transport")
+        asset_mix = [] if transport or asset_class == "CO2_Budget" else [asset_class]
+        transport_mix = [asset_class] if transport else []
+        synthetic_network = Synthetic_Network_STEVFNs(2 if transport else 1, number_of_timesteps, asset_mix = asset_mix,
+                                                      transport_mix = transport_mix)
+        case_study_folder = os.path.join(folder, asset_class + r"_" + str(number_of_timesteps))
+        synthetic_network.write(case_study_folder)
+        network_structure_df = synthetic_network.get_network_structure_df()
+        network = Network_STEVFNs()
+        network.base_folder = case_study_folder
+        network.build(network_structure_df)
+        network.update(synthetic_network.get_location_parameters_df(), synthetic_network.get_asset_parameters_df(),
+                       synthetic_network.get_system_parameters_df())
+        counts = Profiler_STEVFNs(trace_allocations = False).count_network(network, solver)
+        counts["cost_variables"] = get_number_of_cost_variables(network.problem)
+        counts["quadratic_cost"] = int(network.cost.has_quadratic_term())
+        #nodes of every node type at the locations of the asset, Location_2 only for the other end of transport#
+        asset_structure = network_structure_df.iloc[-1]
+        for node_key in network.nodes_dict.keys():
+            location = "Location_1" if node_key[0] == asset_structure["Location_1"] else "Location_2"
+            counts[(location, node_key[1])] = counts.get((location, node_key[1]), 0) + 1
+        return counts
+
+    def calibrate_assets(self, asset_classes = None, timesteps = (24, 48), solver = cp.CLARABEL):
+        """Fits the coefficients of every asset class of asset_classes, by default all classes of
+        ASSET_DICT, to synthetic networks with timesteps time steps. Returns the classes that failed"""
+        from ..Assets.Assets_Dictionary import ASSET_DICT
+        self._load()
+        if asset_classes is None:
+            asset_classes = list(ASSET_DICT.keys())
+        folder = tempfile.mkdtemp(prefix = "STEVFNs_Size_Calibration_")
+        #the counts of the CO2_Budget of the synthetic networks are subtracted from the others#
+        budget_counts = [self._count_asset_class("CO2_Budget", number_of_timesteps, folder, solver)
+                         for number_of_timesteps in timesteps]
+        assets_list = []
+        nodes_list = []
+        failed_classes = []
+        for asset_class in asset_classes:
+            try:
+                counts = [self._count_asset_class(asset_class, number_of_timesteps, folder, solver)
+                          for number_of_timesteps in timesteps]
+            except Exception as calibration_error:
+                failed_classes += [(asset_class, str(calibration_error))]
+                continue
+            if asset_class != "CO2_Budget":
+                counts = [{key: count.get(key, 0) - budget_count.get(key, 0) for key in count.keys()}
+                          for count, budget_count in zip(counts, budget_counts)]
+            asset_row = {"Asset_Class": asset_class}
+            for quantity in QUANTITIES:
+                per_step, fixed = np.polyfit(timesteps, [count[quantity] for count in counts], 1)
+                asset_row[quantity + "_fixed"] = fixed
+                asset_row[quantity + "_per_step"] = per_step
+            asset_row["quadratic_cost"] = max(count["quadratic_cost"] for count in counts) > 0
+            assets_list += [asset_row]
+            for key in counts[0].keys():
+                if not isinstance(key, tuple) or counts[0][key] == 0:
+                    continue
+                per_step, fixed = np.polyfit(timesteps, [count[key] for count in counts], 1)
+                nodes_list += [{"Asset_Class": asset_class, "location": key[0], "node_type": key[1],
+                                "fixed": fixed, "per_step": per_step}]
+        assets_df = pd.DataFrame(assets_list).set_index("Asset_Class").round(6)
+        nodes_df = pd.DataFrame(nodes_list).round(6)
+        self._assets_df = pd.concat([self._assets_df.drop(assets_df.index, errors = "ignore"), assets_df])
+        self._nodes_df = pd.concat([self._nodes_df[~self._nodes_df["Asset_Class"].isin(assets_df.index)], nodes_df],
+                                   ignore_index = True)
+        return failed_classes
+
+    def calibrate_memory(self, benchmark_filename):
+        """Fits the peak memory of build and solve to the nonzeros of the records of benchmark_filename,
+        written by Code.Benchmark.Benchmark, above the memory of the process before the build"""
+        self._load()
+        with open(benchmark_filename, "r") as benchmark_file:
+            records = [json.loads(line) for line in benchmark_file if line.strip() != ""]
+        records_df = pd.DataFrame(records).dropna(subset = ["number_of_nonzeros", "start_peak_memory_MB",
+                                                           "solve_peak_memory_MB"])
+        if len(records_df) < 2:
+            raise ValueError("At least two benchmark records with nonzeros and peak memory are needed")
+        memory_list = [{"phase": "base", "fixed_MB": records_df["start_peak_memory_MB"].max(), "MB_per_nonzero": 0}]
+        for phase in ["build", "solve"]:
+            phase_memory = records_df[phase + "_peak_memory_MB"] - records_df["start_peak_memory_MB"]
+            MB_per_nonzero, fixed_MB = np.polyfit(records_df["number_of_nonzeros"], phase_memory, 1)
+            memory_list += [{"phase": phase, "fixed_MB": max(fixed_MB, 0), "MB_per_nonzero": max(MB_per_nonzero, 0)}]
+        self._memory_df = pd.DataFrame(memory_list).set_index("phase")
+        return self._memory_df
+
+
+#estimator shared by all networks, the calibration is read on the first estimate#
+size_estimator = Size_Estimator_STEVFNs()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Estimates the size and peak memory of STEVFNs networks")
+    parser.add_argument("network_structure", nargs = "?", default = None, help = "Network_Structure.csv")
+    parser.add_argument("--calibrate", default = None, help = "benchmark records to calibrate the memory with")
+    parser.add_argument("--available", type = float, default = None, help = "available memory in MB")
+    arguments = parser.parse_args()
+    if arguments.calibrate is not None:
+        for asset_class, calibration_error in size_estimator.calibrate_assets():
+            print("Asset class", asset_class, "was not calibrated:", calibration_error)
+        print(size_estimator.calibrate_memory(arguments.calibrate))
+        size_estimator.save()
+    if arguments.network_structure is not None:
+        try:
+            estimate = size_estimator.check(pd.read_csv(arguments.network_structure), arguments.available)
+        except MemoryError as memory_error:
+            print(memory_error)
+            sys.exit(1)
+        for key, value in estimate.items():
+            print(key, value)
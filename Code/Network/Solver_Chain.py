@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:52:19 2026
+
+Ordered chain of solver configurations for a network. Every configuration is a dict
+with the solver, its options and an optional time_limit in seconds, e.g.
+{"solver": cp.MOSEK, "options": {"verbose": False}, "time_limit": 3600}. The solvers
+are tried in order until one returns an optimal, infeasible or unbounded status.
+Solvers that are not installed, fail with an error, as MOSEK without a licence, or
+only return an inaccurate solution are skipped and the next one is tried. Without an
+accurate solution the inaccurate solution with the smallest primal residual is kept
+and without any solution SolverError is raised.
+
+Every attempt is recorded in the solver_telemetry of the network with the scenario,
+solver, status, value, solve time, iterations and residuals: the largest constraint
+violation as primal residual and, where the solver reports one, its dual residual.
+The attempt whose solution the network keeps is marked as selected.
+"""
+
+### Import Packages ###
+
+import time
+import numpy as np
+import cvxpy as cp
+from cvxpy import settings
+
+#options that limit the solve time of every solver, in seconds#
+TIME_LIMIT_OPTIONS = {cp.CLARABEL: "time_limit",
+                      cp.HIGHS: "time_limit",
+                      cp.SCS: "time_limit_secs",
+                      cp.OSQP: "time_limit",
+                      cp.GUROBI: "TimeLimit"}
+
+DEFAULT_SOLVER_CONFIGS = [{"solver": cp.MOSEK},
+                          {"solver": cp.CLARABEL, "options": {"max_iter": 10000}},
+                          {"solver": cp.SCS, "options": {"max_iters": 100000}}]
+
+#statuses that are answers of the solver, the others are retried with the next solver#
+ACCEPTED_STATUSES = [settings.OPTIMAL, settings.INFEASIBLE, settings.UNBOUNDED]
+
+
+class Solver_Chain_STEVFNs:
+    """Solves a network with the first solver configuration that succeeds"""
+    def __init__(self, solver_configs = None):
+        if solver_configs is None:
+            solver_configs = DEFAULT_SOLVER_CONFIGS
+        self.solver_configs = solver_configs
+        return
+
+    @staticmethod
+    def get_solver_options(solver_config):
+        solver = solver_config["solver"]
+        solver_options = dict(solver_config.get("options", dict()))
+        time_limit = solver_config.get("time_limit")
+        if time_limit is None:
+            return solver_options
+        if solver == cp.MOSEK:
+            mosek_params = dict(solver_options.get("mosek_params", dict()))
+            mosek_params.setdefault("MSK_DPAR_OPTIMIZER_MAX_TIME", time_limit)
+            solver_options["mosek_params"] = mosek_params
+        elif solver in TIME_LIMIT_OPTIONS:
+            solver_options.setdefault(TIME_LIMIT_OPTIONS[solver], time_limit)
+        return solver_options
+
+    @staticmethod
+    def get_primal_residual(problem):
+        """Returns the largest violation of the constraints of problem"""
+        violations = [np.max(constraint.violation(), initial = 0) for constraint in problem.constraints]
+        return float(max(violations, default = 0))
+
+    @staticmethod
+    def get_dual_residual(solver_stats):
+        #the solvers report their residuals in their own formats, None if not reported#
+        extra_stats = solver_stats.extra_stats
+        if extra_stats is None:
+            return None
+        if isinstance(extra_stats, dict) and "info" in extra_stats:
+            return extra_stats["info"].get("res_dual")
+        if hasattr(extra_stats, "max_dual_infeasibility"):
+            return extra_stats.max_dual_infeasibility
+        if hasattr(extra_stats, "info") and hasattr(extra_stats.info, "dual_res"):
+            return extra_stats.info.dual_res
+        return None
+
+    @staticmethod
+    def _is_better(attempt, other_attempt):
+        #inaccurate solutions are compared by primal residual, attempts without one come last#
+        if other_attempt is None:
+            return True
+        primal_residual = attempt["primal_residual"] if attempt["primal_residual"] is not None else np.inf
+        other_primal_residual = (other_attempt["primal_residual"] if other_attempt["primal_residual"] is not None 
+                                 else np.inf)
+        return primal_residual < other_primal_residual
+
+    def solve(self, network):
+        """Solves network with the chain of solvers, adds the telemetry of the attempts to
+        network.solver_telemetry and returns it. Raises SolverError if no solver returned a solution"""
+        installed_solvers = cp.installed_solvers()
+        attempts = []
+        inaccurate_attempt = None
+        inaccurate_solution = None
+        for solver_config in self.solver_configs:
+            solver = solver_config["solver"]
+            attempt = {"scenario_name": network.scenario_name,
+                       "solver": solver,
+                       "status": None,
+                       "value": None,
+                       "solve_time": None,
+                       "iterations": None,
+                       "primal_residual": None,
+                       "dual_residual": None,
+                       "error": None,
+                       "selected": False}
+            attempts += [attempt]
+            if solver not in installed_solvers:
+                attempt["status"] = "not_installed"
+                continue
+            solve_time = time.time()
+            try:
+                network.solve_problem(solver = solver, **self.get_solver_options(solver_config))
+            except (cp.error.SolverError, ValueError) as solver_error:
+                attempt["status"] = settings.SOLVER_ERROR
+                attempt["error"] = str(solver_error)
+                attempt["solve_time"] = time.time() - solve_time
+                continue
+            attempt["solve_time"] = time.time() - solve_time
+            attempt["status"] = network.problem.status
+            attempt["value"] = network.problem.value
+            if network.solver_stats is not None:
+                attempt["iterations"] = network.solver_stats.num_iters
+                attempt["dual_residual"] = self.get_dual_residual(network.solver_stats)
+            if network.problem.status in settings.SOLUTION_PRESENT:
+                attempt["primal_residual"] = self.get_primal_residual(network.problem)
+            if network.problem.status in ACCEPTED_STATUSES:
+                attempt["selected"] = True
+                network.solver_telemetry += attempts
+                return attempts
+            if network.problem.status in settings.INACCURATE and self._is_better(attempt, inaccurate_attempt):
+                inaccurate_attempt = attempt
+                inaccurate_solution = network.problem.solution
+        network.solver_telemetry += attempts
+        if inaccurate_attempt is None:
+            raise cp.error.SolverError("No solver of the chain solved scenario " + str(network.scenario_name) + 
+                                       ", statuses " + str([attempt["status"] for attempt in attempts]))
+        inaccurate_attempt["selected"] = True
+        network.problem.unpack(inaccurate_solution)
+        return attempts
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:20:44 2026
+
+Direct assembly of the problem of a built network as sparse matrices
+
+    minimise    0.5 x'Px + q'x + constant
+    subject to  A_eq x == b_eq,  A_ub x <= b_ub,  lower_bounds <= x <= upper_bounds
+
+without the reduction chain of cvxpy. The assets build their costs, edges and node
+balances as cvxpy expressions as usual, and the expression trees of the objective and
+constraints of the network problem are walked once into scipy.sparse matrices, with
+the current parameter values. max and maximum are replaced by epigraph variables and
+sum_squares terms of the objective go into P.
+
+The assembled problem is solved with Clarabel or, if it is an LP, with HiGHS through
+scipy.optimize.linprog, and the solution is unpacked into the cvxpy problem, so that
+asset.flows.value, cost.value and problem.value work as after a cvxpy solve. The
+cvxpy path, Network_STEVFNs.solve_problem, remains available to verify the results.
+
+Large problems skip the compilation of cvxpy with, e.g.
+
+my_network.solve_sparse(solver = "CLARABEL") # or "HIGHS" for problems without quadratic costs
+"""
+
+### Import Packages ###
+
+import time
+import numpy as np
+import cvxpy as cp
+from cvxpy import settings
+from cvxpy.reductions.solution import Solution
+from scipy import sparse
+from scipy.optimize import linprog
+
+
+class Affine:
+    """Affine function A @ x + b of the columns of a Sparse_Problem_STEVFNs, flattened in column-major order"""
+    def __init__(self, A, b):
+        self.A = sparse.csr_matrix(A)
+        self.b = np.asarray(b, dtype = np.float64).reshape(-1)
+        return
+
+    @property
+    def size(self):
+        return len(self.b)
+
+    def resize(self, number_of_columns):
+        if self.A.shape[1] < number_of_columns:
+            self.A = sparse.csr_matrix((self.A.data, self.A.indices, self.A.indptr),
+                                       shape = (self.A.shape[0], number_of_columns))
+        return self
+
+    def broadcast(self, size):
+        #scalars are broadcast to vectors, as in cvxpy#
+        if self.size == size:
+            return self
+        if self.size != 1:
+            raise ValueError("Cannot broadcast an expression of size " + str(self.size) + " to size " + str(size))
+        return self.select(np.zeros(size, dtype = np.int64))
+
+    def select(self, entries):
+        return Affine(self.A[entries], self.b[entries])
+
+    def scale(self, factor):
+        #factor is a scalar or an array of the size of the function#
+        factor = np.asarray(factor, dtype = np.float64).reshape(-1)
+        if factor.size == 1:
+            return Affine(self.A * factor[0], self.b * factor[0])
+        return Affine(sparse.diags(factor) @ self.A, factor * self.b)
+
+    def __add__(self, other):
+        size = max(self.size, other.size)
+        number_of_columns = max(self.A.shape[1], other.A.shape[1])
+        first = self.broadcast(size).resize(number_of_columns)
+        second = other.broadcast(size).resize(number_of_columns)
+        return Affine(first.A + second.A, first.b + second.b)
+
+    def __neg__(self):
+        return Affine(-self.A, -self.b)
+
+
+class Sparse_Problem_STEVFNs:
+    """Sparse matrices of a cvxpy problem built by a network, solved with HiGHS or Clarabel"""
+    def __init__(self, problem):
+        self.problem = problem
+        self.variables = problem.variables()
+        self.assembly_time = None
+        self.solve_time = None
+        self.status = None
+        self.value = None
+        return
+
+    def _get_column_offsets(self):
+        self.variable_offsets = dict()
+        self.number_of_columns = 0
+        lower_bounds = []
+        upper_bounds = []
+        for variable in self.variables:
+            for attribute, value in variable.attributes.items():
+                if value not in [False, None] and attribute not in ["nonneg", "nonpos"]:
+                    raise NotImplementedError("Variables with attribute " + attribute + " are not supported")
+            self.variable_offsets[variable.id] = self.number_of_columns
+            self.number_of_columns += variable.size
+            lower_bounds += [np.full(variable.size, 0.0 if variable.attributes["nonneg"] else -np.inf)]
+            upper_bounds += [np.full(variable.size, 0.0 if variable.attributes["nonpos"] else np.inf)]
+        return lower_bounds, upper_bounds
+
+    def _new_columns(self, size):
+        #free epigraph variables#
+        offset = self.number_of_columns
+        self.number_of_columns += size
+        self.lower_bounds += [np.full(size, -np.inf)]
+        self.upper_bounds += [np.full(size, np.inf)]
+        return Affine(sparse.csr_matrix((np.ones(size), (np.arange(size), offset + np.arange(size))),
+                                        shape = (size, self.number_of_columns)), np.zeros(size))
+
+    @staticmethod
+    def _get_constant(expression):
+        value = expression.value
+        if sparse.issparse(value):
+            return sparse.csr_matrix(value)
+        return np.asarray(value, dtype = np.float64)
+
+    def _get_affine(self, expression):
+        """Affine function of an affine cvxpy expression"""
+        if len(expression.variables()) == 0:
+            value = self._get_constant(expression)
+            if sparse.issparse(value):
+                value = value.toarray()
+            return Affine(sparse.csr_matrix((expression.size, self.number_of_columns)), value.reshape(-1, order = "F"))
+        expression_type = type(expression).__name__
+        args = expression.args
+        if isinstance(expression, cp.Variable):
+            offset = self.variable_offsets[expression.id]
+            return Affine(sparse.csr_matrix((np.ones(expression.size),
+                                             (np.arange(expression.size), offset + np.arange(expression.size))),
+                                            shape = (expression.size, self.number_of_columns)), np.zeros(expression.size))
+        if expression_type == "AddExpression":
+            affine = self._get_affine(args[0])
+            for arg in args[1:]:
+                affine = affine + self._get_affine(arg)
+            return affine.broadcast(expression.size)
+        if expression_type == "NegExpression":
+            return -self._get_affine(args[0])
+        if expression_type in ["multiply", "MulExpression", "DivExpression"]:
+            return self._get_product(expression)
+        if expression_type == "Sum" and expression.axis is None:
+            affine = self._get_affine(args[0])
+            return Affine(sparse.csr_matrix(affine.A.sum(axis = 0)), [affine.b.sum()])
+        if expression_type in ["index", "special_index"]:
+            entries = np.reshape(np.arange(args[0].size), args[0].shape, order = "F")[expression.key]
+            return self._get_affine(args[0]).select(np.reshape(entries, -1, order = "F"))
+        if expression_type == "Promote":
+            return self._get_affine(args[0]).broadcast(expression.size)
+        if expression_type == "reshape":
+            entries = np.reshape(np.arange(args[0].size), args[0].shape, order = "F")
+            entries = np.reshape(entries, expression.shape, order = expression.order)
+            return self._get_affine(args[0]).select(np.reshape(entries, -1, order = "F"))
+        if expression_type == "Hstack" and all(arg.ndim <= 1 for arg in args):
+            affines = [self._get_affine(arg) for arg in args]
+            for affine in affines:
+                affine.resize(self.number_of_columns)
+            return Affine(sparse.vstack([affine.A for affine in affines]), np.concatenate([affine.b for affine in affines]))
+        raise NotImplementedError("Expressions of type " + expression_type + " are not supported")
+
+    def _get_product(self, expression):
+        #products of a constant, evaluated with the current parameter values, and an affine expression#
+        first, second = expression.args
+        expression_type = type(expression).__name__
+        if expression_type == "DivExpression":
+            return self._get_affine(first).scale(1 / self._get_constant(second)).broadcast(expression.size)
+        if len(first.variables()) > 0:
+            if expression_type == "multiply" or second.size == 1:
+                first, second = second, first
+            else:
+                raise NotImplementedError("Products of an expression and a constant matrix are not supported")
+        constant = self._get_constant(first)
+        affine = self._get_affine(second)
+        if expression_type == "MulExpression" and first.size > 1 and second.size > 1:
+            #matrix product of a constant matrix and a vector#
+            return Affine(sparse.csr_matrix(constant) @ affine.A, constant @ affine.b)
+        if sparse.issparse(constant):
+            constant = constant.toarray()
+        constant = np.reshape(constant, -1, order = "F")
+        return affine.broadcast(expression.size).scale(np.resize(constant, expression.size) if constant.size > 1
+                                                       else constant)
+
+    def _get_convex(self, expression):
+        """Affine upper bound of a convex cvxpy expression, with epigraph variables and constraints"""
+        if expression.is_affine():
+            return self._get_affine(expression)
+        expression_type = type(expression).__name__
+        args = expression.args
+        if expression_type == "AddExpression":
+            affine = self._get_convex(args[0])
+            for arg in args[1:]:
+                affine = affine + self._get_convex(arg)
+            return affine.broadcast(expression.size)
+        if expression_type in ["multiply", "MulExpression"] and (args[0].size == 1 or args[1].size == 1):
+            constant_arg, convex_arg = (args[0], args[1]) if len(args[0].variables()) == 0 else (args[1], args[0])
+            constant = self._get_constant(constant_arg)
+            if np.any(constant < 0):
+                raise NotImplementedError("Negative multiples of convex expressions are not supported")
+            return self._get_convex(convex_arg).broadcast(expression.size).scale(constant)
+        if expression_type == "Sum" and expression.axis is None:
+            affine = self._get_convex(args[0])
+            return Affine(sparse.csr_matrix(affine.A.sum(axis = 0)), [affine.b.sum()])
+        if expression_type == "max" and expression.axis is None:
+            epigraph = self._new_columns(1)
+            self._add_inequality(self._get_convex(args[0]) + (-epigraph))
+            return epigraph
+        if expression_type == "maximum":
+            epigraph = self._new_columns(expression.size)
+            for arg in args:
+                self._add_inequality(self._get_convex(arg).broadcast(expression.size) + (-epigraph))
+            return epigraph
+        raise NotImplementedError("Convex expressions of type " + expression_type + " are not supported")
+
+    def _add_inequality(self, affine):
+        #affine <= 0#
+        self.inequalities += [affine]
+        return
+
+    def _add_objective(self, expression, factor = 1.0):
+        #sums and nonnegative multiples of sum_squares go into P, other terms are epigraphs#
+        expression_type = type(expression).__name__
+        args = expression.args
+        if expression_type == "AddExpression" and not expression.is_affine():
+            for arg in args:
+                self._add_objective(arg, factor)
+            return
+        if (expression_type in ["multiply", "MulExpression"] and expression.size == 1 and not expression.is_affine()
+            and min(len(args[0].variables()), len(args[1].variables())) == 0):
+            constant_arg, other_arg = (args[0], args[1]) if len(args[0].variables()) == 0 else (args[1], args[0])
+            constant = float(np.sum(self._get_constant(constant_arg)))
+            if constant >= 0 or other_arg.is_affine():
+                self._add_objective(other_arg, factor * constant)
+                return
+        if expression_type == "quad_over_lin" and len(args[1].variables()) == 0:
+            #factor * ||A x + b||^2 / y#
+            affine = self._get_affine(args[0])
+            quadratic_factor = factor / float(self._get_constant(args[1]))
+            self.quadratic_terms += [(affine, quadratic_factor)]
+            return
+        affine = self._get_convex(expression)
+        self.linear_terms += [(affine, factor)]
+        return
+
+    def assemble(self):
+        """Assembles the matrices of the problem with the current parameter values"""
+        assembly_time = time.time()
+        self.lower_bounds, self.upper_bounds = self._get_column_offsets()
+        self.inequalities = []
+        self.equalities = []
+        self.linear_terms = []
+        self.quadratic_terms = []
+        self.constraint_rows = []
+        if not isinstance(self.problem.objective, cp.Minimize):
+            raise NotImplementedError("Only minimisation problems are supported")
+        self._add_objective(self.problem.objective.args[0])
+        for constraint in self.problem.constraints:
+            constraint_type = type(constraint).__name__
+            if constraint_type == "Inequality":
+                self._add_inequality(self._get_convex(constraint.args[0] - constraint.args[1]))
+            elif constraint_type in ["Equality", "Zero"]:
+                self.equalities += [self._get_affine(constraint.args[0] - constraint.args[1]
+                                                     if constraint_type == "Equality" else constraint.args[0])]
+            elif constraint_type == "NonNeg":
+                self._add_inequality(-self._get_affine(constraint.args[0]))
+            elif constraint_type == "NonPos":
+                self._add_inequality(self._get_affine(constraint.args[0]))
+            else:
+                raise NotImplementedError("Constraints of type " + constraint_type + " are not supported")
+        n = self.number_of_columns
+        self.q = np.zeros(n)
+        self.constant = 0.0
+        for affine, factor in self.linear_terms:
+            affine.resize(n)
+            self.q += factor * np.asarray(affine.A.sum(axis = 0)).reshape(-1)
+            self.constant += factor * affine.b.sum()
+        self.P = sparse.csc_matrix((n, n))
+        for affine, factor in self.quadratic_terms:
+            affine.resize(n)
+            self.P = self.P + 2 * factor * (affine.A.T @ affine.A)
+            self.q += 2 * factor * (affine.A.T @ affine.b)
+            self.constant += factor * affine.b @ affine.b
+        self.P = sparse.csc_matrix(self.P)
+        self.P.eliminate_zeros()
+        self.A_ub, self.b_ub = self._stack(self.inequalities, n)
+        self.A_eq, self.b_eq = self._stack(self.equalities, n)
+        self.lower_bounds = np.concatenate(self.lower_bounds)
+        self.upper_bounds = np.concatenate(self.upper_bounds)
+        self.assembly_time = time.time() - assembly_time
+        return
+
+    @staticmethod
+    def _stack(affines, number_of_columns):
+        #A x + b (<=|==) 0 as A x (<=|==) -b#
+        if len(affines) == 0:
+            return sparse.csr_matrix((0, number_of_columns)), np.zeros(0)
+        for affine in affines:
+            affine.resize(number_of_columns)
+        return sparse.vstack([affine.A for affine in affines]).tocsr(), -np.concatenate([affine.b for affine in affines])
+
+    @property
+    def is_lp(self):
+        return self.P.nnz == 0
+
+    def solve(self, solver = "CLARABEL", **solver_options):
+        """Solves the assembled problem with "CLARABEL" or, for LPs, "HIGHS" and unpacks the
+        solution into the cvxpy problem. The options of HiGHS, e.g. method = "highs-ds", are
+        those of scipy.optimize.linprog"""
+        solver = str(solver).upper()
+        solve_time = time.time()
+        if solver == "HIGHS":
+            if not self.is_lp:
+                raise ValueError("HiGHS through scipy only solves LPs, use CLARABEL for problems with quadratic costs")
+            status, x = self._solve_highs(**solver_options)
+        elif solver == "CLARABEL":
+            status, x = self._solve_clarabel(**solver_options)
+        else:
+            raise ValueError("Unknown solver " + solver + ", use HIGHS or CLARABEL")
+        self.solve_time = time.time() - solve_time
+        self._unpack(status, x)
+        return
+
+    def _solve_highs(self, method = "highs", **solver_options):
+        result = linprog(self.q, A_ub = self.A_ub if self.A_ub.shape[0] > 0 else None,
+                         b_ub = self.b_ub if self.A_ub.shape[0] > 0 else None,
+                         A_eq = self.A_eq if self.A_eq.shape[0] > 0 else None,
+                         b_eq = self.b_eq if self.A_eq.shape[0] > 0 else None,
+                         bounds = np.column_stack([self.lower_bounds, self.upper_bounds]),
+                         method = method, options = solver_options)
+        statuses = {0: settings.OPTIMAL, 2: settings.INFEASIBLE, 3: settings.UNBOUNDED}
+        if result.status not in statuses:
+            raise cp.error.SolverError("HiGHS failed: " + str(result.message))
+        return statuses[result.status], result.x
+
+    def _solve_clarabel(self, **solver_options):
+        import clarabel
+        n = self.number_of_columns
+        #bounds are rows of the nonnegative cone#
+        lower_rows = np.flatnonzero(np.isfinite(self.lower_bounds))
+        upper_rows = np.flatnonzero(np.isfinite(self.upper_bounds))
+        A = sparse.vstack([self.A_eq, self.A_ub,
+                           -sparse.identity(n, format = "csr")[lower_rows],
+                           sparse.identity(n, format = "csr")[upper_rows]]).tocsc()
+        b = np.concatenate([self.b_eq, self.b_ub, -self.lower_bounds[lower_rows], self.upper_bounds[upper_rows]])
+        cones = []
+        if self.A_eq.shape[0] > 0:
+            cones += [clarabel.ZeroConeT(self.A_eq.shape[0])]
+        number_of_nonneg_rows = self.A_ub.shape[0] + len(lower_rows) + len(upper_rows)
+        if number_of_nonneg_rows > 0:
+            cones += [clarabel.NonnegativeConeT(number_of_nonneg_rows)]
+        clarabel_settings = clarabel.DefaultSettings()
+        clarabel_settings.verbose = False
+        solver_options.setdefault("max_iter", 10000)
+        for option, value in solver_options.items():
+            setattr(clarabel_settings, option, value)
+        solution = clarabel.DefaultSolver(sparse.triu(self.P, format = "csc"), self.q, A, b, cones,
+                                          clarabel_settings).solve()
+        statuses = {"Solved": settings.OPTIMAL, "AlmostSolved": settings.OPTIMAL_INACCURATE,
+                    "PrimalInfeasible": settings.INFEASIBLE, "AlmostPrimalInfeasible": settings.INFEASIBLE_INACCURATE,
+                    "DualInfeasible": settings.UNBOUNDED, "AlmostDualInfeasible": settings.UNBOUNDED_INACCURATE}
+        status = statuses.get(str(solution.status))
+        if status is None:
+            raise cp.error.SolverError("Clarabel failed with status " + str(solution.status))
+        return status, np.array(solution.x)
+
+    def _unpack(self, status, x):
+        self.status = status
+        primal_vars = dict()
+        if status in settings.SOLUTION_PRESENT:
+            for variable in self.variables:
+                offset = self.variable_offsets[variable.id]
+                primal_vars[variable.id] = np.reshape(x[offset : offset + variable.size], variable.shape, order = "F")
+            opt_val = None
+        else:
+            opt_val = np.inf if status in [settings.INFEASIBLE, settings.INFEASIBLE_INACCURATE] else -np.inf
+        self.problem.unpack(Solution(status, opt_val, primal_vars, dict(), dict()))
+        self.value = self.problem.value
+        return
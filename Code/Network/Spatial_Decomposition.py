@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:03:52 2026
+
+Spatial decomposition of a built network into one subproblem per location, coordinated
+with consensus ADMM. Every asset goes to the subproblem of its Location_1 and the node
+balances of a (location, type) group go with the subproblem of the first asset with
+edges to the group, so that transport assets belong to their first location. Variables
+that appear in several subproblems, the flows of transport assets into the nodes of
+their second location and the emissions of all locations into the CO2_Budget node, are
+shared variables. Every subproblem has its own copy of the shared variables, which is
+pulled towards their consensus by a quadratic penalty of weight rho.
+
+Every iteration solves all subproblems, one after the other or on a pool of forked
+worker processes, averages the copies of every shared variable into the consensus and
+updates the scaled dual variables. rho is adapted to keep the primal and dual residuals
+balanced. The iterations stop when both residuals are below tolerance relative to the
+norms of the shared variables and of the dual variables and the total cost is stable to
+within tolerance, then the solution is unpacked into the problem of the network with the
+consensus of the shared variables. The status of the network problem is optimal_inaccurate
+when locations share variables, as the consensus is only within tolerance of the optimum,
+or without convergence within max_iterations. Whether the iterations converged and the
+residuals of the last iteration are in converged, primal_residual and dual_residual.
+
+Collab case studies are solved as one subproblem per location with, e.g.
+
+locations_df = my_network.solve_locations(solver = cp.MOSEK, workers = 2, tolerance = 1e-3)
+"""
+
+### Import Packages ###
+
+import time
+import multiprocessing
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+from cvxpy import settings
+
+from .Decomposition import Decomposition_STEVFNs
+
+#spatial decomposition used by _solve_worker_location in worker processes, set before forking#
+_worker_decomposition = None
+_worker_options = dict()
+
+
+class Spatial_Decomposition_STEVFNs(Decomposition_STEVFNs):
+    """Subproblems of the locations of a built network, coordinated with ADMM"""
+    def __init__(self, network, rho = 1.0):
+        self.rho = rho
+        self.locations = []
+        self.shared_variables = []
+        self.iterations_df = None
+        self.converged = None#whether the residuals and cost of the last solve were within tolerance#
+        self.primal_residual = None#residuals of the last iteration of the last solve#
+        self.dual_residual = None
+        super().__init__(network)
+        return
+
+    def build_components(self):
+        asset_locations = np.asarray(self.network.system_structure_df["Location_1"])
+        self.locations = list(np.unique(asset_locations))
+        self.components = [[int(x) for x in np.flatnonzero(asset_locations == location)] for location in self.locations]
+        #groups of nodes with edges from the assets of several locations#
+        group_assets, group_sizes = self._get_group_assets()
+        asset_components = {asset_number: counter1 for counter1 in range(self.number_of_components)
+                            for asset_number in self.components[counter1]}
+        coupling_nodes = []
+        for group_key, assets in group_assets.items():
+            components = sorted(set(asset_components[asset_number] for asset_number in assets))
+            if len(components) > 1:
+                coupling_nodes += [{"location": group_key[0],
+                                    "type": group_key[1],
+                                    "assets": sorted(assets),
+                                    "components": [self.components[counter1] for counter1 in components]}]
+        self.coupling_nodes_df = pd.DataFrame(coupling_nodes, columns = ["location", "type", "assets", "components"])
+        return
+
+    def build_problems(self):
+        components_costs, components_constraints = self._get_components_costs_and_constraints()
+        components_variables = [cp.Problem(cp.Minimize(cost), constraints).variables()
+                                for cost, constraints in zip(components_costs, components_constraints)]
+        #variables are keyed by id, as == of cvxpy expressions builds a constraint#
+        variables = dict()
+        variable_components = dict()
+        for counter1 in range(self.number_of_components):
+            for variable in components_variables[counter1]:
+                variables[variable.id] = variable
+                variable_components.setdefault(variable.id, []).append(counter1)
+        shared_ids = [variable_id for variable_id, components in variable_components.items() if len(components) > 1]
+        self.shared_variables = [variables[variable_id] for variable_id in shared_ids]
+        #components of every shared variable and, for every component, its shared variables and their targets#
+        self.shared_components = [variable_components[variable_id] for variable_id in shared_ids]
+        self.sqrt_rho = cp.Parameter(nonneg = True)
+        self.component_targets = [dict() for component in self.components]
+        self.costs = components_costs
+        self.problems = []
+        for counter1 in range(self.number_of_components):
+            penalty = cp.Constant(0)
+            for counter2 in range(len(self.shared_variables)):
+                if counter1 not in self.shared_components[counter2]:
+                    continue
+                variable = self.shared_variables[counter2]
+                #the target is sqrt(rho) * (consensus - scaled dual), so that the problem stays DPP#
+                target = cp.Parameter(variable.shape)
+                self.component_targets[counter1][counter2] = target
+                penalty = penalty + 0.5 * cp.sum_squares(self.sqrt_rho * variable - target)
+            self.problems += [cp.Problem(cp.Minimize(components_costs[counter1] + penalty),
+                                         components_constraints[counter1])]
+        return
+
+    def compile(self, solver = cp.CLARABEL, ignore_dpp = False, **solver_options):
+        self.sqrt_rho.value = np.sqrt(self.rho)
+        for counter1 in range(self.number_of_components):
+            for target in self.component_targets[counter1].values():
+                target.value = np.zeros(target.shape)
+        return super().compile(solver, ignore_dpp, **solver_options)
+
+    def solve_location(self, component_number, targets, sqrt_rho, **options):
+        """Solves the subproblem of a location with the targets of its shared variables and
+        returns the results of solve_component and the cost and shared variables of the location"""
+        self.sqrt_rho.value = sqrt_rho
+        for counter2, target in self.component_targets[component_number].items():
+            target.value = targets[counter2]
+        component_results = self.solve_component(component_number, **options)
+        component_results["cost"] = self.costs[component_number].value
+        component_results["shared_values"] = {counter2: self.shared_variables[counter2].value
+                                              for counter2 in self.component_targets[component_number]}
+        return component_results
+
+    def solve(self, solver = cp.CLARABEL, workers = 1, ignore_dpp = False, tolerance = 1e-3,
+              absolute_tolerance = 1e-6, max_iterations = 1000, cost_window = 20, **solver_options):
+        """Solves the network with ADMM over the subproblems of its locations on workers processes
+        and unpacks the solution into the problem of the network. The iterations stop when the
+        residuals are below tolerance and the total cost changed by less than tolerance, relative,
+        over the last cost_window iterations. Returns components_df, the residuals and cost of every
+        iteration are in iterations_df. The network problem is optimal_inaccurate, or optimal when
+        the locations share no variables"""
+        global _worker_decomposition, _worker_options
+        options = dict(solver = solver, ignore_dpp = ignore_dpp, **solver_options)
+        workers = max(1, min(workers, self.number_of_components))
+        pool = None
+        if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            #forked workers share the compiled problems copy-on-write#
+            self.compile(**options)
+            _worker_decomposition = self
+            _worker_options = options
+            pool = multiprocessing.get_context("fork").Pool(workers)
+        try:
+            components_results, converged = self._iterate(pool, options, tolerance, absolute_tolerance, max_iterations,
+                                                          cost_window)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            _worker_decomposition = None
+            _worker_options = dict()
+        self.converged = converged
+        self.primal_residual = np.nan
+        self.dual_residual = np.nan
+        if len(self.iterations_df) > 0:
+            self.primal_residual = self.iterations_df["primal_residual"].iloc[-1]
+            self.dual_residual = self.iterations_df["dual_residual"].iloc[-1]
+        #the consensus of shared variables is only within tolerance of the optimum#
+        if not converged or len(self.shared_variables) > 0:
+            for component_results in components_results:
+                if component_results["status"] == settings.OPTIMAL:
+                    component_results["status"] = settings.OPTIMAL_INACCURATE
+        self._unpack(components_results)
+        self.components_df = pd.DataFrame([{"component": counter1,
+                                            "location": self.locations[counter1],
+                                            "assets": self.components[counter1],
+                                            "status": components_results[counter1]["status"],
+                                            "value": components_results[counter1]["cost"],
+                                            "solve_time": components_results[counter1]["solve_time"]}
+                                           for counter1 in range(self.number_of_components)])
+        return self.components_df
+
+    def _iterate(self, pool, options, tolerance, absolute_tolerance, max_iterations, cost_window):
+        rho = self.rho
+        consensus = [np.zeros(variable.shape) for variable in self.shared_variables]
+        scaled_duals = [{counter1: np.zeros(variable.shape) for counter1 in components}
+                        for variable, components in zip(self.shared_variables, self.shared_components)]
+        number_of_shared_values = sum(variable.size for variable in self.shared_variables)
+        iterations_list = []
+        converged = False
+        for iteration in range(max_iterations):
+            iteration_time = time.time()
+            tasks = [(counter1, {counter2: np.sqrt(rho) * (consensus[counter2] - scaled_duals[counter2][counter1])
+                                 for counter2 in self.component_targets[counter1]}, np.sqrt(rho))
+                     for counter1 in range(self.number_of_components)]
+            if pool is None:
+                components_results = [self.solve_location(*task, **options) for task in tasks]
+            else:
+                components_results = pool.map(_solve_worker_location, tasks, chunksize = 1)
+            if any(component_results["status"] not in settings.SOLUTION_PRESENT for component_results in components_results):
+                break
+            #consensus is the mean of the copies of every shared variable, shifted by the scaled duals#
+            primal_residual = 0.0
+            dual_residual = 0.0
+            shared_norm = 0.0
+            consensus_norm = 0.0
+            dual_norm = 0.0
+            for counter2 in range(len(self.shared_variables)):
+                copies = {counter1: components_results[counter1]["shared_values"][counter2]
+                          for counter1 in self.shared_components[counter2]}
+                new_consensus = np.mean([copies[counter1] + scaled_duals[counter2][counter1] for counter1 in copies],
+                                        axis = 0)
+                for counter1 in copies:
+                    scaled_duals[counter2][counter1] = scaled_duals[counter2][counter1] + copies[counter1] - new_consensus
+                    primal_residual += np.sum((copies[counter1] - new_consensus)**2)
+                    shared_norm += np.sum(copies[counter1]**2)
+                    consensus_norm += np.sum(new_consensus**2)
+                    dual_norm += np.sum(scaled_duals[counter2][counter1]**2)
+                dual_residual += len(copies) * np.sum((new_consensus - consensus[counter2])**2)
+                consensus[counter2] = new_consensus
+            primal_residual = np.sqrt(primal_residual)
+            dual_residual = rho * np.sqrt(dual_residual)
+            primal_tolerance = (np.sqrt(number_of_shared_values) * absolute_tolerance +
+                                tolerance * np.sqrt(max(shared_norm, consensus_norm)))
+            dual_tolerance = np.sqrt(number_of_shared_values) * absolute_tolerance + tolerance * rho * np.sqrt(dual_norm)
+            iterations_list += [{"iteration": iteration,
+                                 "rho": rho,
+                                 "primal_residual": primal_residual,
+                                 "dual_residual": dual_residual,
+                                 "cost": sum(component_results["cost"] for component_results in components_results),
+                                 "time": time.time() - iteration_time}]
+            #ADMM costs converge slowly after the residuals, the cost must also be stable over cost_window iterations#
+            cost_change = np.inf
+            if iteration >= cost_window:
+                cost_change = (abs(iterations_list[-1]["cost"] - iterations_list[-1 - cost_window]["cost"]) /
+                               max(abs(iterations_list[-1]["cost"]), absolute_tolerance))
+            if primal_residual <= primal_tolerance and dual_residual <= dual_tolerance and cost_change <= tolerance:
+                converged = True
+                break
+            #residual balancing, the scaled duals scale with 1/rho#
+            if primal_residual > 10 * dual_residual:
+                rho = 2 * rho
+                scaled_duals = [{counter1: dual / 2 for counter1, dual in duals.items()} for duals in scaled_duals]
+            elif dual_residual > 10 * primal_residual:
+                rho = rho / 2
+                scaled_duals = [{counter1: dual * 2 for counter1, dual in duals.items()} for duals in scaled_duals]
+        self.iterations_df = pd.DataFrame(iterations_list, columns = ["iteration", "rho", "primal_residual",
+                                                                     "dual_residual", "cost", "time"])
+        #the network is unpacked with the consensus of the shared variables#
+        for counter1 in range(self.number_of_components):
+            variable_ids = [variable.id for variable in self.problems[counter1].variables()]
+            for counter2 in self.component_targets[counter1]:
+                position = variable_ids.index(self.shared_variables[counter2].id)
+                components_results[counter1]["primal_values"][position] = consensus[counter2]
+        return components_results, converged
+
+
+def _solve_worker_location(task):
+    return _worker_decomposition.solve_location(*task, **_worker_options)
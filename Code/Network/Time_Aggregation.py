@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:48:30 2026
+
+Time series aggregation into representative periods. The joint RE and demand
+profiles of all assets of a network are cut into periods of period_length hours,
+the periods are clustered with k-medoids and every cluster is represented by its
+medoid period, weighted by the number of periods in the cluster.
+
+A network built with a Time_Aggregation_STEVFNs simulates only the representative
+periods one after the other. Profiles are taken from the hours of the representative
+periods and usage costs and emissions are weighted by the hours each simulated time
+step represents. With the period assignments and link_storage, storage carries its
+state of charge over the chronological sequence of periods of the full profiles,
+otherwise storage is cyclic within every representative period. Without cyclic_storage
+the stored quantity at the start of the first period is a parameter of the storage
+assets instead of the stored quantity at the end of the last period, as for the
+windows of a rolling horizon.
+
+A case study is simulated over 24 representative days of the full year instead of
+Start_Time to End_Time with, e.g.
+
+scenarios = [(pd.read_csv(os.path.join(folder, "Location_Parameters.csv")),
+              pd.read_csv(os.path.join(folder, "Asset_Parameters.csv"))) for folder in scenario_folders_list]
+time_aggregation = Time_Aggregation_STEVFNs.from_scenarios(network_structure_df, scenarios, 24)
+time_aggregation.link_storage = False # for storage cyclic within every day
+my_network = build_cache.load_or_build(network_structure_df, solver = cp.MOSEK, time_aggregation = time_aggregation)
+"""
+
+### Import Packages ###
+
+import hashlib
+import numpy as np
+from .Network import Network_STEVFNs
+
+class Time_Aggregation_STEVFNs:
+    """Representative periods of a year of hourly profiles and their weights"""
+    def __init__(self, period_length, period_starts, period_weights, period_assignments = None, link_storage = True,
+                 cyclic_storage = True):
+        self.period_length = int(period_length)
+        #first hour of every representative period in the full profiles#
+        self.period_starts = np.asarray(period_starts, dtype = np.int64)
+        #number of periods of the full profiles represented by every representative period#
+        self.period_weights = np.asarray(period_weights, dtype = np.float64)
+        #representative period of every period of the full profiles#
+        self.period_assignments = period_assignments
+        if period_assignments is not None:
+            self.period_assignments = np.asarray(period_assignments, dtype = np.int64)
+        #storage assets link their state of charge across periods, needs the period assignments#
+        self.link_storage = link_storage
+        self.cyclic_storage = cyclic_storage
+        self.number_of_periods = len(self.period_starts)
+        self.number_of_timesteps = self.number_of_periods * self.period_length
+        #hour of the full profiles of every simulated time step#
+        self.hours = (self.period_starts[:, np.newaxis] + np.arange(self.period_length)).reshape(-1)
+        #hours of the full profiles represented by every simulated time step#
+        self.timestep_weights = np.repeat(self.period_weights, self.period_length)
+        return
+
+    @property
+    def relative_timestep_weights(self):
+        """Time step weights scaled to a mean of 1, so that 8760/simulated_timesteps
+        still scales the weighted sums to a year"""
+        return self.timestep_weights / self.timestep_weights.mean()
+
+    def set_period_starts(self, period_starts, number_of_hours = 8760):
+        """Moves the representative periods to period_starts, hours past number_of_hours
+        wrap around to the start of the profiles. The network is updated with the new
+        profiles on its next update"""
+        self.period_starts = np.asarray(period_starts, dtype = np.int64)
+        self.hours = (self.period_starts[:, np.newaxis] + np.arange(self.period_length)).reshape(-1) % number_of_hours
+        return
+
+    @property
+    def links_storage(self):
+        return self.link_storage == True and self.period_assignments is not None
+
+    def get_key(self):
+        aggregation_hash = hashlib.sha256(np.int64(self.period_length).tobytes())
+        aggregation_hash.update(self.period_starts.tobytes())
+        aggregation_hash.update(self.period_weights.tobytes())
+        if self.links_storage:
+            aggregation_hash.update(self.period_assignments.tobytes())
+            aggregation_hash.update(np.int64(self.cyclic_storage == True).tobytes())
+        return aggregation_hash.hexdigest()[:32]
+
+    def shift_times(self, node_times, shift):
+        """Shifts node_times by shift time steps, cyclically within every representative period"""
+        node_times = np.asarray(node_times)
+        period_times = node_times % self.period_length
+        return node_times - period_times + (period_times + shift) % self.period_length
+
+    def get_network_structure_df(self, network_structure_df):
+        """Network structure with the time steps of the representative periods"""
+        network_structure_df = network_structure_df.copy()
+        network_structure_df["Start_Time"] = 0
+        network_structure_df["End_Time"] = self.number_of_timesteps
+        network_structure_df["Period"] = 1
+        return network_structure_df
+
+    @staticmethod
+    def _k_medoids(features, number_of_clusters, max_iterations = 100, seed = 0):
+        #Euclidean distances between all periods#
+        squared_norms = (features**2).sum(axis = 1)
+        distances = squared_norms[:, np.newaxis] + squared_norms[np.newaxis, :] - 2 * features @ features.T
+        distances = np.sqrt(np.maximum(distances, 0))
+        #k-medoids++ initialisation#
+        rng = np.random.default_rng(seed)
+        medoids = [int(rng.integers(len(features)))]
+        for counter1 in range(1, number_of_clusters):
+            closest_distances = distances[:, medoids].min(axis = 1)**2
+            if closest_distances.sum() == 0:
+                medoids += [int(np.setdiff1d(np.arange(len(features)), medoids)[0])]
+            else:
+                medoids += [int(rng.choice(len(features), p = closest_distances / closest_distances.sum()))]
+        medoids = np.array(medoids)
+        #alternate between assigning periods and moving every medoid to the centre of its cluster#
+        for counter1 in range(max_iterations):
+            assignments = distances[:, medoids].argmin(axis = 1)
+            new_medoids = medoids.copy()
+            for cluster in range(number_of_clusters):
+                members = np.flatnonzero(assignments == cluster)
+                if len(members) > 0:
+                    new_medoids[cluster] = members[distances[np.ix_(members, members)].sum(axis = 1).argmin()]
+            if np.array_equal(new_medoids, medoids):
+                break
+            medoids = new_medoids
+        assignments = distances[:, medoids].argmin(axis = 1)
+        return medoids, assignments
+
+    @classmethod
+    def fit(cls, profiles, number_of_periods, period_length = 24, seed = 0):
+        """Clusters the periods of the profiles, a list of hourly profiles of any length,
+        into number_of_periods representative periods"""
+        profiles_length = min([len(profile) for profile in profiles])
+        number_of_full_periods = profiles_length // period_length
+        if not 0 < number_of_periods <= number_of_full_periods:
+            raise ValueError("number_of_periods must be between 1 and " + str(number_of_full_periods))
+        #profiles are scaled to their maximum so that RE and demand profiles are comparable#
+        profiles = np.array([profile[:number_of_full_periods * period_length] for profile in profiles],
+                            dtype = np.float64)
+        profiles_max = np.abs(profiles).max(axis = 1)
+        profiles = profiles / np.where(profiles_max > 0, profiles_max, 1)[:, np.newaxis]
+        features = profiles.reshape(len(profiles), number_of_full_periods, period_length)
+        features = features.transpose(1, 0, 2).reshape(number_of_full_periods, -1)
+        medoids, assignments = cls._k_medoids(features, number_of_periods, seed = seed)
+        #representative periods are kept in chronological order#
+        order = np.argsort(medoids)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(number_of_periods)
+        period_weights = np.bincount(assignments, minlength = number_of_periods)[order]
+        return cls(period_length, medoids[order] * period_length, period_weights, rank[assignments])
+
+    @classmethod
+    def from_scenarios(cls, network_structure_df, scenarios, number_of_periods, period_length = 24, seed = 0):
+        """Clusters the profiles of all assets of network_structure_df in all scenarios,
+        a list of (location_parameters_df, asset_parameters_df)"""
+        network = Network_STEVFNs()
+        network.generate_assets(network_structure_df)
+        profiles_dict = dict()
+        for location_parameters_df, asset_parameters_df in scenarios:
+            profiles_dict.update(network.get_full_profiles(location_parameters_df, asset_parameters_df))
+        if len(profiles_dict) == 0:
+            raise ValueError("the network has no assets with profiles")
+        return cls.fit(list(profiles_dict.values()), number_of_periods, period_length, seed)
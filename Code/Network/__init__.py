@@ -6,7 +6,16 @@ Created on Wed Nov  3 11:17:12 2021
 @author: aniqahsan
 """
 
+import numpy as np
 import cvxpy as cp
+from scipy import sparse
+
+####### Define Functions #######
+#named functions rather than lambdas so that built networks can be pickled#
+
+def identity_conversion_fun(flow, params):
+    return flow
+
 
 ####### Define Classes #######
 
@@ -60,7 +69,7 @@ class __Edge:
 
 class Edge_STEVFNs(__Edge):
     """STEVFNs Edge Class"""
-    conversion_fun = staticmethod(lambda flow,params:flow)
+    conversion_fun = staticmethod(identity_conversion_fun)
     def __init__(self):
         super().__init__()
         self.flow = cp.Constant(0)
@@ -71,14 +80,73 @@ class Edge_STEVFNs(__Edge):
         return self.conversion_fun(self.flow, self.conversion_fun_params)
 
 
+class Block_Edge_STEVFNs:
+    """STEVFNs Edge Class that connects a vector of flows to vectors of source and target nodes,
+    entry i of the flows goes from source_nodes[i] to target_nodes[i]"""
+    conversion_fun = staticmethod(identity_conversion_fun)
+    def __init__(self):
+        self.source_nodes = []
+        self.target_nodes = []
+        self.flow = cp.Constant(0)
+        self.conversion_fun_params = dict()
+        return
+    
+    def attach_source_nodes(self, source_nodes):
+        self.source_nodes = source_nodes
+        for counter1 in range(len(source_nodes)):
+            source_nodes[counter1].attach_output_block_edge(self, counter1)
+        return
+    
+    def attach_target_nodes(self, target_nodes):
+        self.target_nodes = target_nodes
+        for counter1 in range(len(target_nodes)):
+            target_nodes[counter1].attach_input_block_edge(self, counter1)
+        return
+    
+    def extract_flow(self):
+        return self.conversion_fun(self.flow, self.conversion_fun_params)
+    
+    @staticmethod
+    def select_flow(flow, flow_indices):
+        #Returns the sum of the entries of flow at flow_indices, scalar flows apply to every entry#
+        if flow.size == 1:
+            return len(flow_indices) * flow if len(flow_indices) > 1 else flow
+        if len(flow_indices) == 1:
+            return flow[flow_indices[0]]
+        return cp.sum(flow[flow_indices])
+
+
 class Node_STEVFNs(__Node):
     def __init__(self):
         super().__init__()
+        self.input_block_edges = dict()#block edge : indices of the edge entries that end at this node#
+        self.output_block_edges = dict()#block edge : indices of the edge entries that start at this node#
         self.curtailment = True
         self.net_output_flows = cp.Constant(0)
         self.constraints = []
         return
     
+    @property
+    def net_output_flows(self):
+        if self.node_group is not None:
+            return self.node_group.net_output_flows[self.node_group_rows]
+        return self._net_output_flows
+    
+    @net_output_flows.setter
+    def net_output_flows(self, net_output_flows):
+        self.node_group = None
+        self.node_group_rows = None
+        self._net_output_flows = net_output_flows
+        return
+    
+    def attach_input_block_edge(self, input_block_edge, edge_index):
+        self.input_block_edges.setdefault(input_block_edge, []).append(edge_index)
+        return
+    
+    def attach_output_block_edge(self, output_block_edge, edge_index):
+        self.output_block_edges.setdefault(output_block_edge, []).append(edge_index)
+        return
+    
     def build_constraints(self):
         total_output_flows = self.calculate_total_output_flows()
         total_input_flows = self.calculate_total_input_flows()
@@ -101,20 +169,157 @@ class Node_STEVFNs(__Node):
         return
     
     def calculate_total_output_flows(self):
+        output_flows = [output_edge.flow for output_edge in self.output_edges]
+        for output_block_edge, edge_indices in self.output_block_edges.items():
+            output_flows += [Block_Edge_STEVFNs.select_flow(output_block_edge.flow, edge_indices)]
         total_output_flows = cp.Constant(0)
-        for output_edge in self.output_edges:
+        for output_flow in output_flows:
             if total_output_flows.sign == "ZERO":
-                total_output_flows = output_edge.flow
+                total_output_flows = output_flow
             else:
-                total_output_flows += output_edge.flow
+                total_output_flows += output_flow
         return total_output_flows
     
     def calculate_total_input_flows(self):
+        input_flows = [input_edge.extract_flow() for input_edge in self.input_edges]
+        for input_block_edge, edge_indices in self.input_block_edges.items():
+            input_flows += [Block_Edge_STEVFNs.select_flow(input_block_edge.extract_flow(), edge_indices)]
         total_input_flows = cp.Constant(0)
-        for input_edge in self.input_edges:
+        for input_flow in input_flows:
             if total_input_flows.sign == "ZERO":
-                total_input_flows = input_edge.extract_flow()
+                total_input_flows = input_flow
             else:
-                total_input_flows += input_edge.extract_flow()
+                total_input_flows += input_flow
         return total_input_flows
     
+    def calculate_balance_terms(self):
+        """Returns list of (flow, sign) pairs of the edges (not block edges) whose sum is 
+        the net output flow of the node"""
+        balance_terms = []
+        for output_edge in self.output_edges:
+            if output_edge.flow.sign != "ZERO":
+                balance_terms += [(output_edge.flow, 1.0)]
+        for input_edge in self.input_edges:
+            input_flow = input_edge.extract_flow()
+            if input_flow.sign != "ZERO":
+                balance_terms += [(input_flow, -1.0)]
+        return balance_terms
+
+
+class Node_Group_STEVFNs:
+    """Group of nodes whose balances are built together as A @ x (<=|==) 0, 
+    where x stacks the edge flows of the nodes and A is a sparse incidence matrix"""
+    flow_terms_per_block = 256#cvxpy compile time grows quadratically with the size of a single hstack#
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.net_output_flows = cp.Constant(0)
+        self.constraints = []
+        return
+    
+    def build_constraints(self):
+        self._build_incidence_matrix()
+        self.constraints = []
+        if self.number_of_rows == 0:
+            self.net_output_flows = cp.Constant(0)
+            return
+        self.net_output_flows = self._build_net_output_flows()
+        if self.number_of_curtailed_rows > 0:
+            self.constraints += [self.net_output_flows[:self.number_of_curtailed_rows] <= 0]
+        if self.number_of_curtailed_rows < self.number_of_rows:
+            self.constraints += [self.net_output_flows[self.number_of_curtailed_rows:] == 0]
+        return
+    
+    def _collect_flow_terms(self):
+        #Returns list of (flow, sign, node_numbers)#
+        #a single node number means the whole flow is a term of that node, as for edges#
+        #otherwise entry i of flow is a term of node node_numbers[i], as for block edges#
+        node_numbers = {self.nodes[counter1] : counter1 for counter1 in range(len(self.nodes))}
+        flow_terms = []
+        block_edges = dict()
+        for counter1 in range(len(self.nodes)):
+            node = self.nodes[counter1]
+            for flow, sign in node.calculate_balance_terms():
+                flow_terms += [(flow, sign, np.array([counter1]))]
+            for output_block_edge in node.output_block_edges:
+                block_edges[(output_block_edge, 1.0)] = output_block_edge.source_nodes
+            for input_block_edge in node.input_block_edges:
+                block_edges[(input_block_edge, -1.0)] = input_block_edge.target_nodes
+        for (block_edge, sign), edge_nodes in block_edges.items():
+            flow = block_edge.flow if sign > 0 else block_edge.extract_flow()
+            if flow.sign == "ZERO":
+                continue
+            if flow.size == 1 and len(edge_nodes) > 1:
+                flow = cp.promote(flow, (len(edge_nodes),))
+            edge_node_numbers = np.array([node_numbers.get(node, -1) for node in edge_nodes])
+            group_entries = np.flatnonzero(edge_node_numbers >= 0)
+            if len(group_entries) < len(edge_nodes):
+                flow = flow[group_entries]
+            flow_terms += [(flow, sign, edge_node_numbers[group_entries])]
+        return flow_terms
+    
+    def _build_incidence_matrix(self):
+        flow_terms = self._collect_flow_terms()
+        for node in self.nodes:
+            node.net_output_flows = cp.Constant(0)
+            node.constraints = []
+        #node sizes are 1 unless a vector edge flow is broadcast over the node, as in Node_STEVFNs.build_constraints#
+        node_sizes = np.zeros(len(self.nodes), dtype = int)
+        for flow, sign, node_numbers in flow_terms:
+            if len(node_numbers) == 1:
+                node_sizes[node_numbers[0]] = max(node_sizes[node_numbers[0]], flow.size)
+            else:
+                node_sizes[node_numbers] = np.maximum(node_sizes[node_numbers], 1)
+        node_curtailments = np.array([node.curtailment == True for node in self.nodes], dtype = bool)
+        self.number_of_rows = int(node_sizes.sum())
+        self.number_of_curtailed_rows = int(node_sizes[node_curtailments].sum())
+        if self.number_of_rows == 0:
+            return
+        #curtailed rows come first so each constraint is a single slice of net_output_flows#
+        node_order = np.argsort(np.logical_not(node_curtailments), kind = "stable")
+        node_offsets = np.zeros(len(self.nodes), dtype = int)
+        node_offsets[node_order] = np.cumsum(node_sizes[node_order]) - node_sizes[node_order]
+        for counter1 in np.flatnonzero(node_sizes):
+            node = self.nodes[counter1]
+            node.node_group = self
+            if node_sizes[counter1] == 1:
+                node.node_group_rows = node_offsets[counter1]
+            else:
+                node.node_group_rows = slice(node_offsets[counter1], node_offsets[counter1] + node_sizes[counter1])
+        self.flow_terms = []
+        rows = []
+        columns = []
+        values = []
+        number_of_columns = 0
+        for flow, sign, node_numbers in flow_terms:
+            if len(node_numbers) == 1 and flow.size > 1:
+                entry_rows = node_offsets[node_numbers[0]] + np.arange(flow.size)
+                entry_columns = number_of_columns + np.arange(flow.size)
+            else:
+                #each entry of the flow is broadcast over the rows of its node#
+                entry_sizes = node_sizes[node_numbers]
+                entry_rows = (np.repeat(node_offsets[node_numbers], entry_sizes) + np.arange(entry_sizes.sum()) - 
+                              np.repeat(np.cumsum(entry_sizes) - entry_sizes, entry_sizes))
+                entry_columns = np.repeat(number_of_columns + np.arange(flow.size), entry_sizes)
+            rows += [entry_rows]
+            columns += [entry_columns]
+            values += [np.full(len(entry_rows), sign)]
+            self.flow_terms += [flow]
+            number_of_columns += flow.size
+        self.incidence_matrix = sparse.csc_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))), 
+                                                  shape = (self.number_of_rows, number_of_columns))
+        return
+    
+    def _build_net_output_flows(self):
+        net_output_flows = cp.Constant(0)
+        first_column = 0
+        for counter1 in range(0, len(self.flow_terms), self.flow_terms_per_block):
+            flow_terms = self.flow_terms[counter1 : counter1 + self.flow_terms_per_block]
+            last_column = first_column + sum(flow.size for flow in flow_terms)
+            block_flows = self.incidence_matrix[:, first_column : last_column] @ cp.hstack(flow_terms)
+            if net_output_flows.sign == "ZERO":
+                net_output_flows = block_flows
+            else:
+                net_output_flows += block_flows
+            first_column = last_column
+        return net_output_flows
+    
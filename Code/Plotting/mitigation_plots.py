@@ -12,12 +12,18 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from itertools import cycle
 
+def _read_data(data):
+    # Data can be a csv file or a DataFrame, e.g. the sweep_df of Budget_Sweep.run_budget_sweep
+    if isinstance(data, pd.DataFrame):
+        return data.copy()
+    return pd.read_csv(data)
+
 def mitigation_curve(total_data_filename, plot_filename, case_study_name, countries):
     '''
     Parameters
     ----------
-    total_data_filename : path
-        Path to the file with total data to be plotted.
+    total_data_filename : path or DataFrame
+        Path to the file with total data to be plotted, or the total data.
     plot_filename : path
         Path and figure filename to save the final figure.
     case_study_name : string
@@ -33,7 +39,7 @@ def mitigation_curve(total_data_filename, plot_filename, case_study_name, countr
 
     '''
     
-    total_data = pd.read_csv(total_data_filename)
+    total_data = _read_data(total_data_filename)
     total_data = total_data.sort_values(by=['technology_name'])
     
     df = pd.DataFrame()
@@ -91,10 +97,10 @@ def dpacc_subplots(total_data_filename, capacities_data_filename, plot_filename,
     '''
     Parameters
     ----------
-    total_data_filename : path
-        Path to the file with total data to be plotted.
-    capacities_data_filename: path
-        Path to the file with capacities data to be plotted.
+    total_data_filename : path or DataFrame
+        Path to the file with total data to be plotted, or the total data.
+    capacities_data_filename: path or DataFrame
+        Path to the file with capacities data to be plotted, or the capacities data.
     plot_filename : path
         Path and figure filename to save the final figure.
     case_study_name: string
@@ -113,7 +119,7 @@ def dpacc_subplots(total_data_filename, capacities_data_filename, plot_filename,
     df = pd.DataFrame()
     row = pd.DataFrame()
     
-    total_data = pd.read_csv(total_data_filename)
+    total_data = _read_data(total_data_filename)
     total_data = total_data.sort_values(by=['technology_name'])
     
     while not total_data.empty:
@@ -149,7 +155,7 @@ def dpacc_subplots(total_data_filename, capacities_data_filename, plot_filename,
     
     
     cap_df = pd.DataFrame()
-    cap_data = pd.read_csv(capacities_data_filename)
+    cap_data = _read_data(capacities_data_filename)
     cap_data = cap_data.sort_values(by=['technology_name'])
     
     while not cap_data.empty:
@@ -5,22 +5,59 @@ Created on Tue Oct 31 10:49:50 2023
 
 @author: Mónica Sagastuy Breña
 
-The functions in this script are hard-coded to export modelling results within the
-case studies in the author's DPhil work. They may serve as guidance on how to 
-obtain results from the model but changes to the network structure may require editing
-of these functions.
+The functions in this script export modelling results within the case studies in
+the author's DPhil work. They are built on Results_Extractor_STEVFNs, which reads the
+flows of every asset from the edges of the network, so they apply to every asset
+class without listing asset names. The columns of export_aut_flows and the curtailment
+keep their original names and definition, technology_names and converted_flows give
+the flows per technology and the curtailment after conversion losses.
 
 Functions here serve to export asset data such as cost and sizes, along with total
-emissions, and the power flows per hour for a given case study/scenario. 
+emissions, and the power flows per hour for a given case study/scenario. Every
+function takes an extractor of the network, so that the flows of a scenario are
+extracted once for all functions, or extracts them itself.
 
 They need to be called upon in main.py
 """
 
+
 import pandas as pd
 import numpy as np
 
+from .Results_Extractor import Results_Extractor_STEVFNs
+
+# Units of the asset sizes in export_results, GW for the assets that are not listed
+SIZE_UNITS = {'BESS': 'GWh', 'NH3_Storage': 'GWh', 'EL_Demand': 'GWh', 'HTH_Demand': 'GWh',
+              'NH3_Transport': 'kt_NH3'}
+
+# Short names of the assets of multi assets in the flow names, e.g. BESSch_[MEX], other assets keep their name
+COMPONENT_LABELS = {'Charging': 'ch', 'Discharging': 'disch'}
+
+# RE_type of the renewable assets whose curtailment is reported, curtailed in this order
+CURTAILED_RE_TYPES = {'PV': 'PVOUT', 'Wind': 'WINDOUT'}
+
+# Names of the flows in export_aut_flows, by RE_type, by asset of multi assets and by start of the asset name,
+# other assets keep their technology name
+RE_FLOW_NAMES = {'PVOUT': 'PV_total', 'WINDOUT': 'Wind_total'}
+COMPONENT_FLOW_NAMES = {'Charging': 'BESS_Charging', 'Discharging': 'BESS_Discharging'}
+ASSET_FLOW_NAMES = {'PP_': 'PP_total', 'EL_Demand': 'Net_demand'}
+# Assets of the columns of export_aut_flows before it exported every asset, their columns come first
+LEGACY_AUT_FLOW_ASSETS = ['EL_Demand_UM', 'EL_Demand', 'BESS', 'PP_CO2', 'PP_CO2_Existing', 'RE_PV_Existing',
+                          'RE_PV_Openfield_Lim', 'RE_WIND_Onshore_Lim']
+
 
-def export_results(my_network):
+def _get_extractor(my_network, extractor):
+    if extractor is None:
+        return Results_Extractor_STEVFNs(my_network)
+    return extractor
+
+def _get_location_label(location_1, location_2):
+    # Assets between two locations, e.g. transport, are labelled location_1-location_2
+    if location_1 == location_2:
+        return f"{location_1}"
+    return f"{location_1}-{location_2}"
+
+def export_results(my_network, extractor = None):
     '''
     This function exports a DataFrame with asset sizes and costs, total throughout
     the project lifetime. 
@@ -30,79 +67,85 @@ def export_results(my_network):
     my_network : STEVFNs Network
         Network object created based on the assets in a network structure, timesteps
         and other parameters defined in STEVFNs.
+    extractor : Results_Extractor_STEVFNs, optional
+        Extractor of my_network, created if not given.
 
     Returns
     -------
     costs_df : DataFrame with cost and size results collated
 
     '''
-    sizes_df = pd.DataFrame()
-    costs_df = pd.DataFrame()
-    number_assets = len(my_network.assets)
+    assets_df = _get_extractor(my_network, extractor).assets_df
     
+    cost_names = ['Total_System_Cost']
+    costs = [my_network.problem.value]
+    size_names = ['CO2_Budget_GgCO2']
+    sizes = [assets_df.iloc[0]["size"]]
+    # Last asset first, as in the original format
+    for counter1 in range(len(assets_df) - 1, 0, -1):
+        asset = assets_df.iloc[counter1]
+        name = asset["asset_name"]
+        location = _get_location_label(asset["location_1"], asset["location_2"])
+        cost_names += [f'{name}_{location}_G$']
+        costs += [asset["cost"]]
+        size_names += [f'{name}_{location}_{SIZE_UNITS.get(name, "GW")}']
+        sizes += [asset["size"]]
     
-    for asset in range(1, number_assets):
-
-        name = my_network.assets[asset].asset_name
-        
-        ### Exceptions in formatting or extracting results per type of asset ###
-        if name == 'BESS' or name == 'NH3_Storage':
-            loc1 = my_network.assets[asset].asset_structure["Location_1"]
-            costs_df.insert(0, f'{name}_{loc1}_G$', [my_network.assets[asset].cost.value])
-            sizes_df.insert(0, f'{name}_{loc1}_GWh', [my_network.assets[asset].asset_size()])        
-            
-        elif name == 'RE_PV_Rooftop_Lim' or name == 'RE_PV_Openfield_Lim' or name == 'RE_WIND_Onshore_Lim' \
-            or name == 'RE_WIND_Offshore_Lim' or name == 'RE_WIND_Onshore_Existing' or name == 'RE_PV_Openfield_Exising':
-            loc1 = my_network.assets[asset].target_node_location
-            costs_df.insert(0, f'{name}_{loc1}_G$', [my_network.assets[asset].cost.value])
-            sizes_df.insert(0, f'{name}_{loc1}_GW', [my_network.assets[asset].asset_size()])
-
-        elif name == 'EL_Demand' or name == 'HTH_Demand':
-            loc1 = my_network.assets[asset].node_location
-            costs_df.insert(0, f'{name}_{loc1}_G$', [my_network.assets[asset].cost.value])
-            sizes_df.insert(0, f'{name}_{loc1}_GWh', [my_network.assets[asset].asset_size()])
-            
-        elif name == 'EL_Transport':
-            loc1 = my_network.assets[asset].asset_structure["Location_1"]
-            loc2 = my_network.assets[asset].asset_structure["Location_2"]
-            costs_df.insert(0, f'{name}_{loc1}-{loc2}_G$', [my_network.assets[asset].cost.value])
-            sizes_df.insert(0, f'{name}_{loc1}-{loc2}_GW', [my_network.assets[asset].asset_size()])
-        elif name == 'NH3_Transport':
-            loc1 = my_network.assets[asset].asset_structure["Location_1"]
-            loc2 = my_network.assets[asset].asset_structure["Location_2"]
-            costs_df.insert(0, f'{name}_{loc1}-{loc2}_G$', [my_network.assets[asset].cost.value])
-            sizes_df.insert(0, f'{name}_{loc1}-{loc2}_kt_NH3', [my_network.assets[asset].asset_size()])
-        
-        ### The rest of the assets, in general ###
-        else:
-            loc1 = my_network.assets[asset].asset_structure["Location_1"]
-            costs_df.insert(0, f'{name}_{loc1}_G$', [my_network.assets[asset].cost.value])
-            sizes_df.insert(0, f'{name}_{loc1}_GW', [my_network.assets[asset].asset_size()])
+    costs_df = pd.DataFrame({"Costs": costs, "Asset Name": cost_names})
+    costs_df.index.name = 'Number'
+    sizes_df = pd.DataFrame({"Sizes": sizes, "Asset Name": size_names})
+    sizes_df.index.name = 'Number'
     
-    costs_df.insert(0, 'Total_System_Cost', [my_network.problem.value])
-    sizes_df.insert(0, 'CO2_Budget_GgCO2',  [my_network.assets[0].asset_size()])    
+    costs_df = pd.concat([costs_df, sizes_df], axis=1)
     
-    ## hardcoded for better format output 
-    index = list(range(number_assets))
-    costs_df = costs_df.T
-    costs_df['Number'] = index
-    costs_df['Asset Name'] = costs_df.index
-    costs_df = costs_df.set_index(costs_df['Number'])
-    costs_df = costs_df.drop('Number', axis=1)
-    costs_df = costs_df.rename(columns={0: "Costs"})
+    return costs_df
+
+def _get_total_data(my_network, location_parameters_df, asset_parameters_df, extractor, rounded):
+    location_names = list(location_parameters_df["location_name"])
+    loc_names_set_list = list(set(asset_parameters_df["Location_1"]).union(set(asset_parameters_df["Location_2"])))
+    loc_names_list = ["",]*max(4, len(loc_names_set_list))
+    for counter1 in range(len(loc_names_set_list)):
+        loc_names_list[counter1] = location_names[loc_names_set_list[counter1]]
     
-    sizes_df = sizes_df.T
-    sizes_df['Number'] = index
-    sizes_df['Asset Name'] = sizes_df.index
-    sizes_df = sizes_df.set_index(sizes_df['Number'])
-    sizes_df = sizes_df.drop('Number', axis=1)
-    sizes_df = sizes_df.rename(columns={0: "Sizes"})
+    total_data_columns = ["country_1",
+                  "country_2",
+                  "country_3",
+                  "country_4",
+                  "collaboration_emissions",
+                  "technology_cost",
+                  "technology_size",
+                  "technology_name",]
+    if not rounded:
+        total_data_columns.remove("technology_size")
     
-    costs_df = pd.concat([costs_df, sizes_df], axis=1)
+    assets_df = _get_extractor(my_network, extractor).assets_df
+    # Hardcoded CO2_Budget Asset always in Network Structure as asset 0
+    collaboration_emissions = assets_df.iloc[0]["size"]
+    assets_df = assets_df.iloc[1:]
+    technology_names = [name + r"_[" + _get_location_label(location_names[loc1], location_names[loc2]) + r"]"
+                        for name, loc1, loc2 in zip(assets_df["asset_name"], assets_df["location_1"],
+                                                    assets_df["location_2"])]
     
-    return costs_df
+    N = np.ceil(my_network.system_parameters_df.loc["project_life", "value"]/8760) #number of years for the project
+    collaboration_emissions = collaboration_emissions/N # Number is annualized, number is converted from ktCO2e to MtCO2e
+    technology_costs = assets_df["cost"].to_numpy(dtype = np.float64)/N # Number is annualized
+    if rounded:
+        collaboration_emissions = round(collaboration_emissions, 1)
+        technology_costs = np.round(technology_costs, 1)
+    number_of_technologies = len(assets_df)
+    t_df = pd.DataFrame({"country_1": [loc_names_list[0]]*number_of_technologies,
+                         "country_2": [loc_names_list[1]]*number_of_technologies,
+                         "country_3": [loc_names_list[2]]*number_of_technologies,
+                         "country_4": [loc_names_list[3]]*number_of_technologies,
+                         "collaboration_emissions_MtCO2e/y": [collaboration_emissions]*number_of_technologies,
+                         "technology_cost_G$/y": technology_costs,
+                         "technology_size": assets_df["size"].to_numpy(),
+                         "technology_name": technology_names,
+        })
+    total_data_df = pd.concat([pd.DataFrame(columns = total_data_columns), t_df], ignore_index=True)
+    return total_data_df
 
-def get_total_data_rounded(my_network, location_parameters_df, asset_parameters_df):
+def get_total_data_rounded(my_network, location_parameters_df, asset_parameters_df, extractor = None):
     '''
     This function exports data for the case study being run for assets per location
     including asset size, asset cost and the country(ies) total emissions per scenario
@@ -119,6 +162,8 @@ def get_total_data_rounded(my_network, location_parameters_df, asset_parameters_
         Obtained by reading Location_Parameters.csv file in a case study, coded in main.
     asset_parameters_df : DataFrame
         Obtained by reading Asset_Parameters.csv file in a case study, coded in main.
+    extractor : Results_Extractor_STEVFNs, optional
+        Extractor of my_network, created if not given.
 
     Returns
     -------
@@ -127,95 +172,10 @@ def get_total_data_rounded(my_network, location_parameters_df, asset_parameters_
         collaboration) for size, cost, and emissions. Rounds the values to one decimal
 
     '''
-    location_names = list(location_parameters_df["location_name"])
-    loc_names_set_list = list(set(asset_parameters_df["Location_1"]).union(set(asset_parameters_df["Location_2"])))
-    loc_names_list = ["",]*4
-    for counter1 in range(len(loc_names_set_list)):
-        loc_names_list[counter1] = location_names[loc_names_set_list[counter1]]
-    
-    total_data_columns = ["country_1",
-                  "country_2",
-                  "country_3",
-                  "country_4",
-                  "collaboration_emissions",
-                  "technology_cost",
-                  "technology_size",
-                  "technology_name",]
-    total_data_df = pd.DataFrame(columns = total_data_columns)
-    
-    # Hardcoded CO2_Budget Asset always in Network Structure as asset 0
-    collaboration_emissions =  my_network.assets[0].asset_size()
-    loc_names_set = set()
-    
-    storage_assets = ['BESS', 'NH3_Storage']
-    renewable_assets = ['RE_PV_Rooftop_Lim', 'RE_PV_Openfield_Lim', 'RE_WIND_Onshore_Lim',
-                        'RE_WIND_Offshore_Lim', 'RE_WIND_Onshore_Existing', 'RE_PV_Openfield_Exising']
-    demand_assets = ['EL_Demand', 'HTH_Demand']
-    transport_assets= ['EL_Transport', 'NH3_Transport']
-    
-    for counter1 in range(1,len(my_network.assets)):
-        asset = my_network.assets[counter1]
-        name = asset.asset_name
-        
-        ### Exceptions in formatting or extracting results per type of asset ###
-        if name in storage_assets:
-            loc1 = asset.asset_structure["Location_1"]
-            loc_name = location_names[loc1]
-            loc_names_set.add(loc_name)
-            technology_name = name + r"_[" + loc_name + r"]"
-            technology_cost = asset.cost.value
-            technology_size = asset.asset_size()
-            
-        elif name in renewable_assets:
-            loc1 = asset.target_node_location
-            loc_name = location_names[loc1]
-            loc_names_set.add(loc_name)
-            technology_name = name + r"_[" + loc_name + r"]"
-            technology_cost =  asset.cost.value
-            technology_size = asset.asset_size()
-
-        elif name in demand_assets:
-            loc1 = asset.node_location
-            loc_name = location_names[loc1]
-            loc_names_set.add(loc_name)
-            technology_name = name + r"_[" + loc_name + r"]"
-            technology_cost = asset.cost.value
-            technology_size = asset.asset_size()
-            
-        elif name in transport_assets:
-            loc1 = asset.asset_structure["Location_1"]
-            loc2 = asset.asset_structure["Location_2"]
-            loc_name_1 = location_names[loc1]
-            loc_name_2 = location_names[loc2]
-            loc_names_set.add(loc_name_1)
-            loc_names_set.add(loc_name_1)
-            technology_name = name + r"_[" + loc_name_1 + r"-" + loc_name_2 + r"]"
-            technology_cost = asset.cost.value
-            technology_size = asset.asset_size()
-        ### The rest of the assets, in general ###
-        else:
-            loc1 = asset.asset_structure["Location_1"]
-            loc_name = location_names[loc1]
-            loc_names_set.add(loc_name)
-            technology_name = name + r"_[" + loc_name + r"]"
-            technology_cost = asset.cost.value
-            technology_size = asset.asset_size()
-        
-        N = np.ceil(my_network.system_parameters_df.loc["project_life", "value"]/8760) #number of years for the project
-        t_df = pd.DataFrame({"country_1": [loc_names_list[0]],
-                             "country_2": [loc_names_list[1]],
-                             "country_3": [loc_names_list[2]],
-                             "country_4": [loc_names_list[3]],
-                             "collaboration_emissions_MtCO2e/y": [round(collaboration_emissions/N, 1)],# Number is annualized, number is converted from ktCO2e to MtCO2e
-                             "technology_cost_G$/y": [round(technology_cost/N, 1)],# Number is annualized
-                             "technology_size": [technology_size],
-                             "technology_name": [technology_name],  
-            })
-        total_data_df = pd.concat([total_data_df, t_df], ignore_index=True)
-    return total_data_df
+    return _get_total_data(my_network, location_parameters_df, asset_parameters_df, extractor, rounded = True)
 
 
-def get_total_data(my_network, location_parameters_df, asset_parameters_df):
+def get_total_data(my_network, location_parameters_df, asset_parameters_df, extractor = None):
     '''
     This function exports data for the case study being run for assets per location
     including asset size, asset cost and the country(ies) total emissions per scenario
@@ -232,6 +192,8 @@ def get_total_data(my_network, location_parameters_df, asset_parameters_df):
         Obtained by reading Location_Parameters.csv file in a case study, coded in main.
     asset_parameters_df : DataFrame
         Obtained by reading Asset_Parameters.csv file in a case study, coded in main.
+    extractor : Results_Extractor_STEVFNs, optional
+        Extractor of my_network, created if not given.
     
     Returns
     -------
@@ -239,94 +201,44 @@ def get_total_data(my_network, location_parameters_df, asset_parameters_df):
         Results compiled for sets of countries in a case study (either autarky or
         collaboration) for size, cost, and emissions. Does NOT round values
     '''
-    location_names = list(location_parameters_df["location_name"])
-    loc_names_set_list = list(set(asset_parameters_df["Location_1"]).union(set(asset_parameters_df["Location_2"])))
-    loc_names_list = ["",]*4
-    for counter1 in range(len(loc_names_set_list)):
-        loc_names_list[counter1] = location_names[loc_names_set_list[counter1]]
-    
-    total_data_columns = ["country_1",
-                  "country_2",
-                  "country_3",
-                  "country_4",
-                  "collaboration_emissions",
-                  "technology_cost",
-                  "technology_name",]
-    total_data_df = pd.DataFrame(columns = total_data_columns)
-    
-    collaboration_emissions =  my_network.assets[0].asset_size()
-    loc_names_set = set()
-    
-    # Define asset types to distinguish formatting
-    storage_assets = ['BESS', 'NH3_Storage']
-    renewable_assets = ['RE_PV_Rooftop_Lim', 'RE_PV_Openfield_Lim', 'RE_WIND_Onshore_Lim',
-                        'RE_WIND_Offshore_Lim', 'RE_WIND_Onshore_Existing', 'RE_PV_Openfield_Exising']
-    demand_assets = ['EL_Demand', 'HTH_Demand']
-    transport_assets= ['EL_Transport', 'NH3_Transport']
-    
-    for counter1 in range(1,len(my_network.assets)):
-        asset = my_network.assets[counter1]
-        name = asset.asset_name
-        
-        ### Exceptions in formatting or extracting results per type of asset ###
-        if name in storage_assets:
-            loc1 = asset.asset_structure["Location_1"]
-            loc_name = location_names[loc1]
-            loc_names_set.add(loc_name)
-            technology_name = name + r"_[" + loc_name + r"]"
-            technology_cost = asset.cost.value
-            technology_size = asset.asset_size()
-            
-        elif name in renewable_assets:
-            loc1 = asset.target_node_location
-            loc_name = location_names[loc1]
-            loc_names_set.add(loc_name)
-            technology_name = name + r"_[" + loc_name + r"]"
-            technology_cost =  asset.cost.value
-            technology_size = asset.asset_size()
-
-        elif name in demand_assets:
-            loc1 = asset.node_location
-            loc_name = location_names[loc1]
-            loc_names_set.add(loc_name)
-            technology_name = name + r"_[" + loc_name + r"]"
-            technology_cost = asset.cost.value
-            technology_size = asset.asset_size()
-            
-        elif name in transport_assets:
-            loc1 = asset.asset_structure["Location_1"]
-            loc2 = asset.asset_structure["Location_2"]
-            loc_name_1 = location_names[loc1]
-            loc_name_2 = location_names[loc2]
-            loc_names_set.add(loc_name_1)
-            loc_names_set.add(loc_name_1)
-            technology_name = name + r"_[" + loc_name_1 + r"-" + loc_name_2 + r"]"
-            technology_cost = asset.cost.value
-            technology_size = asset.asset_size()
-        
-        ### The rest of the assets, in general ###
-        else:
-            loc1 = asset.asset_structure["Location_1"]
-            loc_name = location_names[loc1]
-            loc_names_set.add(loc_name)
-            technology_name = name + r"_[" + loc_name + r"]"
-            technology_cost = asset.cost.value
-            technology_size = asset.asset_size()
-        
-        N = np.ceil(my_network.system_parameters_df.loc["project_life", "value"]/8760) #number of years for the project
-        t_df = pd.DataFrame({"country_1": [loc_names_list[0]],
-                             "country_2": [loc_names_list[1]],
-                             "country_3": [loc_names_list[2]],
-                             "country_4": [loc_names_list[3]],
-                             "collaboration_emissions_MtCO2e/y": [collaboration_emissions/N],# Number is annualized, number is converted from ktCO2e to MtCO2e
-                             "technology_cost_G$/y": [technology_cost/N],# Number is annualized
-                             "technology_size": [technology_size],
-                             "technology_name": [technology_name],
-            })
-        total_data_df = pd.concat([total_data_df, t_df], ignore_index=True)
-    return total_data_df
+    return _get_total_data(my_network, location_parameters_df, asset_parameters_df, extractor, rounded = False)
+
+def _get_flows_df(extractor, node_type):
+    '''
+    Flows of the edges of every asset to or from the nodes of node_type, one row per edge entry,
+    with the technology, the location of the node and, for edges between two nodes of node_type
+    such as transport, the location of the other node
+    '''
+    edges_df = extractor.edges_df
+    flows_df = edges_df[(edges_df["source_type"] == node_type) | (edges_df["target_type"] == node_type)]
+    flows_df = flows_df[["asset_number", "asset_name", "component", "edge", "flow"]].assign(
+        location = flows_df["target_location"].where(flows_df["target_type"] == node_type, flows_df["source_location"]),
+        other_location = flows_df["target_location"].where(flows_df["source_type"] == node_type)
+                         .where(flows_df["target_type"] == node_type),
+        time = flows_df["target_time"].where(flows_df["target_type"] == node_type, flows_df["source_time"]))
+    # Both ends of node_type, the flow is labelled from the source to the target
+    between_nodes = flows_df["other_location"].notna()
+    flows_df.loc[between_nodes, "location"] = edges_df.loc[flows_df.index[between_nodes], "source_location"]
+    flows_df.loc[between_nodes, "time"] = edges_df.loc[flows_df.index[between_nodes], "source_time"]
+    # The assets of multi assets are named when more than one of them has flows of node_type
+    components = flows_df.groupby("asset_number")["component"].nunique()
+    named_components = flows_df["asset_number"].map(components) > 1
+    component_labels = flows_df["component"].astype(str).map(lambda component: COMPONENT_LABELS.get(component,
+                                                                                                  "_" + component))
+    flows_df["technology"] = flows_df["asset_name"].astype(str) + component_labels.where(named_components, "")
+    return flows_df
 
-def export_aut_flows(my_network):
+def _get_aut_flow_name(technology, asset_name, component, re_type):
+    if re_type in RE_FLOW_NAMES:
+        return RE_FLOW_NAMES[re_type]
+    if component in COMPONENT_FLOW_NAMES:
+        return COMPONENT_FLOW_NAMES[component]
+    for name_start, flow_name in ASSET_FLOW_NAMES.items():
+        if asset_name.startswith(name_start):
+            return flow_name
+    return technology
+
+def export_aut_flows(my_network, node_type = "EL", extractor = None, technology_names = False):
     '''
     This function exports the flows of the network in autarky, (single-country)
     case studies. 
@@ -335,55 +247,48 @@ def export_aut_flows(my_network):
     ----------
     my_network : STEVFNs network
         Full network after running a given system
+    node_type : string, optional
+        Type of the nodes whose flows are exported, electricity by default.
+    extractor : Results_Extractor_STEVFNs, optional
+        Extractor of my_network, created if not given.
+    technology_names : bool, optional
+        False by default, one column per asset named by its kind of flow, e.g. PV_total,
+        BESS_Charging or Net_demand, the columns of the assets in LEGACY_AUT_FLOW_ASSETS first
+        and then the other assets, e.g. RE_WIND_Existing or EL_Transport. If True one column
+        per technology, e.g. BESSch, summed over the locations.
 
     Returns
     -------
     Dataframe of flows for Autarky Case Study
     '''
-    # Initialize an empty list to hold DataFrames for each asset
-    data_frames = []
-
-    # Iterate over each asset and collect flow data
-    for i in range(1, len(my_network.assets)):
-        asset = my_network.assets[i]
-        name = asset.asset_name
-        
-        if name == 'EL_Demand_UM':
-            demand_data = asset.assets_dictionary['Net_EL_Demand'].flows.value
-            df = pd.DataFrame({"Net_demand": demand_data})
-            data_frames.append(df)
-        
-        elif name == 'EL_Demand':
-            demand_data = asset.flows.value
-            df = pd.DataFrame({"Net_demand": demand_data})
-            data_frames.append(df)
-        
-        elif name == 'BESS':
-            BESS_ch = asset.assets_dictionary['Charging'].flows.value
-            BESS_disch = asset.assets_dictionary['Discharging'].flows.value
-            df = pd.DataFrame({"BESS_Charging": BESS_ch, "BESS_Discharging": BESS_disch})
-            data_frames.append(df)
-        
-        elif name in ['PP_CO2', 'PP_CO2_Existing']:
-            pp_data = asset.flows.value
-            df = pd.DataFrame({"PP_total": pp_data})
-            data_frames.append(df)
-        
-        elif name in ['RE_PV_Existing', 'RE_PV_Openfield_Lim']:
-            pv_data = asset.get_plot_data()
-            df = pd.DataFrame({"PV_total": pv_data})
-            data_frames.append(df)
-        
-        elif name in ['RE_Wind_Existing', 'RE_WIND_Onshore_Lim']:
-            wind_data = asset.get_plot_data()
-            df = pd.DataFrame({"Wind_total": wind_data})
-            data_frames.append(df)
-
-    flows_df = pd.concat(data_frames, axis=1)
+    extractor = _get_extractor(my_network, extractor)
+    flows_df = _get_flows_df(extractor, node_type)
+    if technology_names == True:
+        flows_df = flows_df.pivot_table(index = "time", columns = "technology", values = "flow", aggfunc = "sum",
+                                        sort = False)
+        return flows_df.reset_index(drop = True).rename_axis(None, axis = 1)
+    
+    re_types = extractor.assets_df.set_index("asset_number")["RE_type"]
+    flows_list = []
+    new_flows_list = []
+    for (asset_number, component, edge, technology), technology_flows_df in flows_df.groupby(
+            ["asset_number", "component", "edge", "technology"], sort = False, observed = True):
+        asset_name = str(technology_flows_df["asset_name"].iloc[0])
+        flow_name = _get_aut_flow_name(technology, asset_name, component, re_types[asset_number])
+        flow = technology_flows_df.groupby("time", sort = False)["flow"].sum().reset_index(drop = True).rename(flow_name)
+        if asset_name in LEGACY_AUT_FLOW_ASSETS:
+            flows_list += [flow]
+        else:
+            new_flows_list += [flow]
+    # Columns of assets that were not exported before come after the legacy columns, so they keep their positions
+    flows_list += new_flows_list
+    if len(flows_list) == 0:
+        return pd.DataFrame()
+    flows_df = pd.concat(flows_list, axis=1)
     
     return flows_df
     
-def export_collab_flows(my_network, location_parameters_df):
+def export_collab_flows(my_network, location_parameters_df, node_type = "EL", extractor = None):
     '''
     This function exports the flows of the network in autarky and collaboration
     forms for multiple country configuration case studies.
@@ -394,144 +299,90 @@ def export_collab_flows(my_network, location_parameters_df):
         Full network after running a given system
     location_parameters_df : DataFrame
         From Location_Parameters.csv in a scenario folder
+    node_type : string, optional
+        Type of the nodes whose flows are exported, electricity by default.
+    extractor : Results_Extractor_STEVFNs, optional
+        Extractor of my_network, created if not given.
     Returns
     -------
-    Dataframe of flows for Collab Case Studies
+    Dataframe of flows for Collab Case Studies, one column per technology and location,
+    e.g. BESSch_[MEX] or EL_Transport_[MEX-CHL]
     '''
-    # Extract timesteps being run
-    timesteps = my_network.system_structure_properties["simulated_timesteps"]
-
-    # Initialize an empty list to hold individual DataFrames for each asset and location
-    data_frames = []
-
-    # Extract hourly arrays of flows for each asset
-    for i in range(1, len(my_network.assets)):
-        asset = my_network.assets[i]
-        name = asset.asset_name
-        
-        loc1 = asset.node_location if 'node_location' in dir(asset) \
-            else asset.asset_structure.get("Location_1")
-        if loc1 not in location_parameters_df.index:
-            continue  # Skip if the location is not in the location parameters DataFrame
-
-        loc_name = location_parameters_df.loc[loc1, "location_name"]
-
-        if name == 'EL_Demand_UM' or name == 'EL_Demand':
-            demand_name = f"{name}_[{loc_name}]"
-            demand_data = asset.assets_dictionary['Net_EL_Demand'].flows.value \
-                if name == 'EL_Demand_UM' else asset.flows.value
-            df = pd.DataFrame({demand_name: demand_data})
-            data_frames.append(df)
-
-        elif name == 'BESS':
-            bess_ch_name = f"{name}ch_[{loc_name}]"
-            bess_disch_name = f"{name}disch_[{loc_name}]"
-            BESS_ch = asset.assets_dictionary['Charging'].flows.value
-            BESS_disch = asset.assets_dictionary['Discharging'].flows.value
-            df = pd.DataFrame({bess_ch_name: BESS_ch, bess_disch_name: BESS_disch})
-            data_frames.append(df)
-
-        elif name in ['PP_CO2', 'PP_CO2_Existing']:
-            pp_name = f"{name}_[{loc_name}]"
-            pp_data = asset.flows.value
-            df = pd.DataFrame({pp_name: pp_data})
-            data_frames.append(df)
-
-        elif name in ['RE_PV_Exiting', 'RE_PV_Openfield_Lim']:
-            pv_name = f"{name}_[{loc_name}]"
-            pv_data = asset.get_plot_data()
-            df = pd.DataFrame({pv_name: pv_data})
-            data_frames.append(df)
-
-        elif name in ['RE_Wind_Existing', 'RE_WIND_Onshore_Lim']:
-            wind_name = f"{name}_[{loc_name}]"
-            wind_data = asset.get_plot_data()
-            df = pd.DataFrame({wind_name: wind_data})
-            data_frames.append(df)
-
-        elif name == 'EL_Transport':
-            loc2 = asset.asset_structure["Location_2"]
-            loc_name_2 = location_parameters_df.loc[loc2, "location_name"]
-            transport_out_name = f"{name}_[{loc_name}-{loc_name_2}]"
-            transport_in_name = f"{name}_[{loc_name_2}-{loc_name}]"
-            HVDC_out = asset.flows.value[:timesteps]
-            HVDC_in = asset.flows.value[timesteps:(2*timesteps)]
-            df = pd.DataFrame({transport_out_name: HVDC_out, transport_in_name: HVDC_in})
-            data_frames.append(df)
-
-    # Concatenate all data frames along columns to form a single output DataFrame
-    flows_df = pd.concat(data_frames, axis=1)
+    flows_df = _get_flows_df(_get_extractor(my_network, extractor), node_type)
+    location_names = location_parameters_df["location_name"]
+    
+    # Skip flows at locations that are not in the location parameters DataFrame
+    in_locations = flows_df["location"].isin(location_names.index) & \
+        (flows_df["other_location"].isna() | flows_df["other_location"].isin(location_names.index))
+    flows_df = flows_df[in_locations]
+    location_labels = flows_df["location"].map(location_names).astype(str)
+    between_nodes = flows_df["other_location"].notna()
+    location_labels = location_labels.where(~between_nodes,
+                                            location_labels + "-" + flows_df["other_location"].map(location_names).astype(str))
+    flows_df = flows_df.assign(technology_name = flows_df["technology"] + "_[" + location_labels + "]")
+    
+    # One column per edge and location, in the order of the assets
+    flows_list = [pd.Series(technology_flows_df["flow"].to_numpy(), name = technology_name)
+                  for (asset_number, component, edge, technology_name), technology_flows_df in
+                  flows_df.groupby(["asset_number", "component", "edge", "technology_name"], sort = False, observed = True)]
+    if len(flows_list) == 0:
+        return pd.DataFrame()
+    flows_df = pd.concat(flows_list, axis=1)
 
     return flows_df
 
-def calculate_curtailment_aut(my_network):
+def _get_curtailment_df(extractor, node_type, converted_flows, by_location = True):
+    '''
+    Curtailment, the surplus of the flows into the nodes of node_type, and the curtailment of
+    the renewable assets of CURTAILED_RE_TYPES, curtailed in that order, by location and time
+    or by time only. Without converted_flows the flows are taken before conversion, as
+    generation and discharge minus demand and charging, so conversion losses are not counted
+    '''
+    node_flows_df = extractor.get_node_flows_df(node_type, converted = converted_flows)
+    index_columns = ["location", "time"] if by_location else ["time"]
+    curtailment_df = node_flows_df.groupby(index_columns, sort = False)["flow"].sum().to_frame("Total_Curtailment")
+    # Ensure curtailment is non-negative
+    curtailment_df["Total_Curtailment"] = curtailment_df["Total_Curtailment"].clip(lower = 0)
+    
+    remaining_curtailment = curtailment_df["Total_Curtailment"]
+    assets_df = extractor.assets_df
+    for label, re_type in CURTAILED_RE_TYPES.items():
+        re_assets = assets_df["asset_number"][assets_df["RE_type"] == re_type]
+        re_flows_df = node_flows_df[node_flows_df["asset_number"].isin(re_assets) & (node_flows_df["flow"] > 0)]
+        generation = re_flows_df.groupby(index_columns)["flow"].sum().reindex(curtailment_df.index, fill_value = 0)
+        curtailment_df[label + "_Curtailment"] = np.minimum(remaining_curtailment, generation)
+        remaining_curtailment = remaining_curtailment - curtailment_df[label + "_Curtailment"]
+    return curtailment_df.reset_index()
+
+def calculate_curtailment_aut(my_network, node_type = "EL", extractor = None, converted_flows = False):
     '''
     Parameters
     ----------
     my_network : STEVFNs network
         Full network after running a given system
+    node_type : string, optional
+        Type of the nodes whose curtailment is calculated, electricity by default.
+    extractor : Results_Extractor_STEVFNs, optional
+        Extractor of my_network, created if not given.
+    converted_flows : bool, optional
+        False by default, curtailment is the excess of generation and discharge over demand and
+        charging of all locations together, before conversion losses. If True it is the surplus
+        of the node balance of every location, after the losses of e.g. storage and transport,
+        summed over the locations.
 
     Returns
     -------
     DataFrame
         Dataframe of curtailment data, hourly
     '''
-    # Extract timesteps in network structure
-    timesteps = my_network.system_structure_properties["simulated_timesteps"]
-
-    total_generation = np.zeros(timesteps)
-    total_demand = np.zeros(timesteps)
-    total_outflows = np.zeros(timesteps)
-    total_storage_discharge = np.zeros(timesteps)
-    pv_generation = np.zeros(timesteps)
-    wind_generation = np.zeros(timesteps)
-
-    for i in range(1, len(my_network.assets)):
-        asset = my_network.assets[i]
-        name = asset.asset_name
-
-        if name in ['RE_PV_Exiting', 'RE_PV_Openfield_Lim']:
-            pv_data = asset.get_plot_data() if 'get_plot_data' in dir(asset) else asset.flows.value
-            pv_generation += pv_data
-            total_generation += pv_data
-
-        elif name in ['RE_Wind_Existing', 'RE_WIND_Onshore_Lim']:
-            wind_data = asset.get_plot_data() if 'get_plot_data' in dir(asset) else asset.flows.value
-            wind_generation += wind_data
-            total_generation += wind_data
-
-        elif name in ['PP_CO2', 'PP_CO2_Existing']:
-            generation_data = asset.flows.value
-            total_generation += generation_data
-
-        elif name == 'EL_Demand_UM' or name == 'EL_Demand':
-            demand_data = asset.assets_dictionary['Net_EL_Demand'].flows.value if name == 'EL_Demand_UM' else asset.flows.value
-            total_demand += demand_data
-
-        elif name == 'BESS':
-            BESS_charging = asset.assets_dictionary['Charging'].flows.value
-            BESS_discharging = asset.assets_dictionary['Discharging'].flows.value
-            total_outflows += BESS_charging
-            total_storage_discharge += BESS_discharging
-
-    # Calculate curtailment as the excess generation at each hour
-    curtailment = (total_generation + total_storage_discharge) - (total_demand + total_outflows)
-    curtailment[curtailment < 0] = 0  # Ensure curtailment is non-negative
-
-    # Determine curtailment contributions from PV and Wind, assuming PV is curtailed first
-    pv_curtailment = np.minimum(curtailment, pv_generation)
-    wind_curtailment = np.minimum(curtailment - pv_curtailment, wind_generation)
-
-    # Create a DataFrame for curtailment
-    curtailment_df = pd.DataFrame({
-        "Total_Curtailment": curtailment,
-        "PV_Curtailment": pv_curtailment,
-        "Wind_Curtailment": wind_curtailment
-    })
-
-    return curtailment_df
-
-def calculate_curtailment_collab(my_network, location_parameters_df):
+    curtailment_df = _get_curtailment_df(_get_extractor(my_network, extractor), node_type, converted_flows,
+                                         by_location = converted_flows)
+    curtailment_df = curtailment_df.drop(columns = "location", errors = "ignore").groupby("time").sum()
+
+    return curtailment_df.reset_index(drop = True)
+
+def calculate_curtailment_collab(my_network, location_parameters_df, node_type = "EL", extractor = None,
+                                 converted_flows = False):
     '''
     Parameters
     ----------
@@ -539,100 +390,28 @@ def calculate_curtailment_collab(my_network, location_parameters_df):
         Full network after running a given system in collaboration.
     location_parameters_df : DataFrame
         A DataFrame with location parameters, indexed by location IDs.
+    node_type : string, optional
+        Type of the nodes whose curtailment is calculated, electricity by default.
+    extractor : Results_Extractor_STEVFNs, optional
+        Extractor of my_network, created if not given.
+    converted_flows : bool, optional
+        False by default, curtailment is the excess of generation, discharge and imports over
+        demand, charging and exports, before conversion losses. If True it is the surplus of the
+        node balance, after the losses of e.g. storage and transport.
 
     Returns
     -------
     DataFrame
         Dataframe of curtailment data by location, hourly.
     '''
-    # Extract timesteps in network structure
-    timesteps = my_network.system_structure_properties["simulated_timesteps"]
+    curtailment_df = _get_curtailment_df(_get_extractor(my_network, extractor), node_type, converted_flows)
     
-    # Initialize dictionaries to store results for each location
-    curtailment_data = {}
+    # Skip locations that are not in the location parameters DataFrame
+    curtailment_df = curtailment_df[curtailment_df["location"].isin(location_parameters_df.index)]
+    curtailment_df = curtailment_df.assign(Location = curtailment_df["location"].map(location_parameters_df["location_name"]),
+                                           Hour = curtailment_df["time"])
+    curtailment_df = curtailment_df.sort_values(["location", "time"], kind = "stable")
     
-    # Process assets by location
-    for i in range(1, len(my_network.assets)):
-        asset = my_network.assets[i]
-        name = asset.asset_name
-
-        # Determine the location of the asset
-        loc1 = asset.node_location if 'node_location' in dir(asset) \
-            else asset.asset_structure.get("Location_1")
-        if loc1 not in location_parameters_df.index:
-            continue  # Skip if the location is not in the location parameters DataFrame
-
-        loc_name = location_parameters_df.loc[loc1, "location_name"]
-
-        # Initialize location-specific data structure if not already present
-        if loc_name not in curtailment_data:
-            curtailment_data[loc_name] = {
-                "Total_Generation": np.zeros(timesteps),
-                "Total_Demand": np.zeros(timesteps),
-                "Total_Outflows": np.zeros(timesteps),
-                "Total_Storage_Discharge": np.zeros(timesteps),
-                "PV_Generation": np.zeros(timesteps),
-                "Wind_Generation": np.zeros(timesteps),
-                "HVDC_In": np.zeros(timesteps),
-            }
-
-        # Fetch generation or consumption data
-        if name in ['RE_PV_Exiting', 'RE_PV_Openfield_Lim']:
-            pv_data = asset.get_plot_data() if 'get_plot_data' in dir(asset) else asset.flows.value
-            curtailment_data[loc_name]["PV_Generation"] += pv_data
-            curtailment_data[loc_name]["Total_Generation"] += pv_data
-
-        elif name in ['RE_Wind_Existing', 'RE_WIND_Onshore_Lim']:
-            wind_data = asset.get_plot_data() if 'get_plot_data' in dir(asset) else asset.flows.value
-            curtailment_data[loc_name]["Wind_Generation"] += wind_data
-            curtailment_data[loc_name]["Total_Generation"] += wind_data
-
-        elif name in ['PP_CO2', 'PP_CO2_Existing']:
-            generation_data = asset.flows.value
-            curtailment_data[loc_name]["Total_Generation"] += generation_data
-
-        elif name == 'EL_Demand_UM' or name == 'EL_Demand':
-            demand_data = asset.assets_dictionary['Net_EL_Demand'].flows.value if name == 'EL_Demand_UM' else asset.flows.value
-            curtailment_data[loc_name]["Total_Demand"] += demand_data
-
-        elif name == 'BESS':
-            BESS_charging = asset.assets_dictionary['Charging'].flows.value
-            BESS_discharging = asset.assets_dictionary['Discharging'].flows.value
-            curtailment_data[loc_name]["Total_Outflows"] += BESS_charging
-            curtailment_data[loc_name]["Total_Storage_Discharge"] += BESS_discharging
-
-        elif name == 'EL_Transport':
-            HVDC_out = asset.flows.value[:timesteps]
-            HVDC_in = asset.flows.value[timesteps:timesteps*2]
-            curtailment_data[loc_name]["Total_Outflows"] += HVDC_out
-            curtailment_data[loc_name]["HVDC_In"] += HVDC_in
-
-    # Calculate curtailment for each location
-    results = []
-    for loc_name, data in curtailment_data.items():
-        # Calculate curtailment as excess generation
-        curtailment = (data["Total_Generation"] + data["Total_Storage_Discharge"] + data["HVDC_In"]) - \
-                      (data["Total_Demand"] + data["Total_Outflows"])
-        curtailment[curtailment < 0] = 0  # Ensure non-negative curtailment
-
-        # Determine curtailment contributions from PV and Wind
-        pv_curtailment = np.minimum(curtailment, data["PV_Generation"])
-        wind_curtailment = np.minimum(curtailment - pv_curtailment, data["Wind_Generation"])
-
-        # Store results in a structured format
-        results.append(pd.DataFrame({
-            "Location": loc_name,
-            "Hour": np.arange(timesteps),
-            "Total_Curtailment": curtailment,
-            "PV_Curtailment": pv_curtailment,
-            "Wind_Curtailment": wind_curtailment
-        }))
-
-    # Combine results into a single DataFrame
-    curtailment_df = pd.concat(results, ignore_index=True)
-
-    return curtailment_df
-
-
-
-
+    curtailment_columns = ["Location", "Hour", "Total_Curtailment"] + [label + "_Curtailment"
+                                                                      for label in CURTAILED_RE_TYPES]
+    return curtailment_df[curtailment_columns].reset_index(drop = True)
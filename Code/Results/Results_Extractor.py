@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:20:14 2026
+
+Extraction of the results of a solved network from its edge and node graph, the same
+for every asset class. The block edges of every asset, and of the assets of Multi_Assets,
+are walked once and the values of their flows are evaluated once per edge, into edges_df
+with one row per edge entry: the asset, component and edge, the (location, type, time)
+of its source and target nodes, the flow that leaves the source node and the converted
+flow that arrives at the target node. Entries without a source or target node have the
+node type "NULL". The size and cost of every asset are evaluated once into assets_df.
+
+get_node_flows_df() has the flows of every asset into the nodes of a node type, negative
+for flows out of the nodes, so that the sum of the flows of a node is its curtailment,
+and get_asset_flows_df() has them per asset and location as hourly columns.
+"""
+
+### Import Packages ###
+
+import numpy as np
+import pandas as pd
+
+EDGE_COLUMNS = ["asset_number", "asset_name", "component", "edge", "entry",
+                "source_location", "source_type", "source_time",
+                "target_location", "target_type", "target_time",
+                "flow", "converted_flow"]
+
+
+def get_components(asset, component_name = ""):
+    """Returns (component_name, component) of asset and of the assets of multi assets,
+    component_name is "" for assets that are not Multi_Assets"""
+    assets_dictionary = getattr(asset, "assets_dictionary", None)
+    if assets_dictionary is None:
+        return [(component_name, asset)]
+    components = []
+    for sub_asset_name, sub_asset in assets_dictionary.items():
+        sub_component_name = sub_asset_name if component_name == "" else component_name + r"_" + sub_asset_name
+        components += get_components(sub_asset, sub_component_name)
+    return components
+
+
+def get_values(expression, number_of_entries):
+    #values of expression as float64, scalar flows apply to every entry, nan before a solve#
+    value = expression.value
+    if value is None:
+        return np.full(number_of_entries, np.nan)
+    return np.resize(np.asarray(value, dtype = np.float64).reshape(-1), number_of_entries)
+
+
+class Results_Extractor_STEVFNs:
+    """Flows, sizes and costs of all assets of a solved network, extracted in one pass over its edges"""
+    def __init__(self, network):
+        self.network = network
+        self._edges_df = None
+        self._assets_df = None
+        return
+
+    def _get_node_columns(self, nodes, number_of_entries):
+        #location, type and time of every entry of a list of nodes#
+        if len(nodes) == 0:
+            return [None] * number_of_entries, ["NULL"] * number_of_entries, np.full(number_of_entries, -1)
+        locations, node_types, times = zip(*[self.node_keys[node] for node in nodes])
+        return list(locations), list(node_types), np.asarray(times, dtype = np.int64)
+
+    @property
+    def edges_df(self):
+        """DataFrame of the entries of all block edges of the network"""
+        if self._edges_df is None:
+            self._edges_df = self._get_edges_df()
+        return self._edges_df
+
+    def _get_edges_df(self):
+        self.node_keys = {node: node_key for node_key, node in self.network.nodes_dict.items()}
+        columns = {column: [] for column in EDGE_COLUMNS}
+        for asset_number in range(len(self.network.assets)):
+            asset = self.network.assets[asset_number]
+            for component_name, component in get_components(asset):
+                for edge_number, edge in enumerate(getattr(component, "edges", [])):
+                    #edges of a single node, e.g. of the existing capacity, are not block edges#
+                    if not hasattr(edge, "source_nodes"):
+                        continue
+                    number_of_entries = max(len(edge.source_nodes), len(edge.target_nodes))
+                    if number_of_entries == 0:
+                        continue
+                    source_locations, source_types, source_times = self._get_node_columns(edge.source_nodes,
+                                                                                          number_of_entries)
+                    target_locations, target_types, target_times = self._get_node_columns(edge.target_nodes,
+                                                                                          number_of_entries)
+                    columns["asset_number"] += [np.full(number_of_entries, asset_number)]
+                    columns["asset_name"] += [[asset.asset_name] * number_of_entries]
+                    columns["component"] += [[component_name] * number_of_entries]
+                    columns["edge"] += [np.full(number_of_entries, edge_number)]
+                    columns["entry"] += [np.arange(number_of_entries)]
+                    columns["source_location"] += [source_locations]
+                    columns["source_type"] += [source_types]
+                    columns["source_time"] += [source_times]
+                    columns["target_location"] += [target_locations]
+                    columns["target_type"] += [target_types]
+                    columns["target_time"] += [target_times]
+                    columns["flow"] += [get_values(edge.flow, number_of_entries)]
+                    columns["converted_flow"] += [get_values(edge.extract_flow(), number_of_entries)]
+        if len(columns["flow"]) == 0:
+            return pd.DataFrame(columns = EDGE_COLUMNS)
+        edges_df = pd.DataFrame({column: np.concatenate([np.asarray(values, dtype = object)
+                                                         if isinstance(values, list) else values
+                                                         for values in values_list])
+                                 for column, values_list in columns.items()})
+        for column in ["asset_name", "component", "source_type", "target_type"]:
+            edges_df[column] = edges_df[column].astype("category")
+        for column in ["asset_number", "edge", "entry", "source_time", "target_time"]:
+            edges_df[column] = edges_df[column].astype(np.int64)
+        for column in ["flow", "converted_flow"]:
+            edges_df[column] = edges_df[column].astype(np.float64)
+        return edges_df
+
+    @property
+    def assets_df(self):
+        """DataFrame of the name, locations, size, cost and RE_type of every asset"""
+        if self._assets_df is None:
+            self._assets_df = self._get_assets_df()
+        return self._assets_df
+
+    def _get_assets_df(self):
+        system_structure_df = getattr(self.network, "system_structure_df", None)
+        assets_list = []
+        for asset_number in range(len(self.network.assets)):
+            asset = self.network.assets[asset_number]
+            cost = getattr(asset, "cost", None)
+            parameters_df = getattr(asset, "parameters_df", None)
+            assets_list += [{"asset_number": asset_number,
+                             "asset_name": asset.asset_name,
+                             "location_1": (system_structure_df.iloc[asset_number]["Location_1"]
+                                            if system_structure_df is not None else None),
+                             "location_2": (system_structure_df.iloc[asset_number]["Location_2"]
+                                            if system_structure_df is not None else None),
+                             "size": asset.asset_size(),
+                             "cost": cost.value if cost is not None else np.nan,
+                             "RE_type": (parameters_df.get("RE_type") if isinstance(parameters_df, pd.Series)
+                                         else None)}]
+        return pd.DataFrame(assets_list)
+
+    def get_node_flows_df(self, node_type = None, converted = True):
+        """DataFrame of the flows of every edge entry into its source and target nodes, of node_type
+        or of all node types, negative out of the node, with the asset, component, edge and entry
+        and the location, node_type and time of the node. Without converted the flows into the target
+        nodes are taken before conversion, with the sign of the converted flow, so that the losses
+        of e.g. storage and transport are not counted"""
+        edges_df = self.edges_df
+        id_columns = ["asset_number", "asset_name", "component", "edge", "entry"]
+        node_flows_list = []
+        for side, sign in [("source", -1), ("target", 1)]:
+            if node_type is None:
+                side_df = edges_df[edges_df[side + "_type"] != "NULL"]
+            else:
+                side_df = edges_df[edges_df[side + "_type"] == node_type]
+            if side == "source":
+                flows = side_df["flow"]
+            elif converted == True:
+                flows = side_df["converted_flow"]
+            else:
+                flows = pd.Series(np.copysign(side_df["flow"].to_numpy(), side_df["converted_flow"].to_numpy()),
+                                  index = side_df.index)
+            side_df = side_df[id_columns + [side + "_location", side + "_type", side + "_time"]]
+            side_df.columns = id_columns + ["location", "node_type", "time"]
+            side_df = side_df.assign(flow = sign * flows)
+            node_flows_list += [side_df]
+        node_flows_df = pd.concat(node_flows_list, ignore_index = True)
+        node_flows_df["node_type"] = node_flows_df["node_type"].astype(str)
+        return node_flows_df
+
+    def get_asset_flows_df(self, node_type):
+        """DataFrame of the flows of every asset into the nodes of node_type, one column per
+        (asset_number, asset_name, component, location) and one row per time"""
+        node_flows_df = self.get_node_flows_df(node_type)
+        return node_flows_df.pivot_table(index = "time", columns = ["asset_number", "asset_name", "component",
+                                                                   "location"],
+                                         values = "flow", aggfunc = "sum", observed = True, sort = False)
+
+    def get_node_balances_df(self, node_type):
+        """DataFrame of the total flow into every node of node_type by location and time, the
+        curtailment of the node, 0 at nodes whose flows balance"""
+        node_flows_df = self.get_node_flows_df(node_type)
+        return node_flows_df.groupby(["location", "time"], sort = False)["flow"].sum().reset_index()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:48:30 2026
+
+Columnar store of the results of case studies, as Parquet files partitioned by case
+study and scenario, store_folder/<table>/case_study=<name>/scenario=<name>/part-0.parquet.
+The tables are total_data, the rows of Results.get_total_data, flows, the hourly
+flows of Results.export_collab_flows in long format with one row per time step and
+technology, and curtailment, the hourly curtailment of Results.calculate_curtailment_*.
+Text columns are stored as categoricals and the hourly values as float32.
+
+read() reads a table with the filters pushed down to the Parquet reader, so that
+only the partitions of the case studies and scenarios asked for are opened and only
+the row groups that can match the other filters are read. Writing a scenario again
+replaces its files. The results of every scenario of run_case_study are written to
+the store and read back for the mitigation curves with, e.g.
+
+results_store = Results_Store_STEVFNs(os.path.join(data_folder, "Results_Store"))
+run_case_study(case_study_name, workers = 4, solver = cp.MOSEK, results_store = results_store)
+store_df = results_store.read_total_data(case_study = "MEX")
+mitigation_plots.dpacc_subplots(store_df, store_df, plot_filename, "MEX", countries)
+mexico_flows_df = results_store.read_flows(case_study = "MEX", filters = [("location", "==", "MEX")])
+
+Needs pyarrow.
+"""
+
+### Import Packages ###
+
+import os
+import re
+import glob
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+TABLES = ["total_data", "flows", "curtailment"]
+
+#flows are named asset_[location] or asset_[location_1-location_2]#
+TECHNOLOGY_NAME_PATTERN = re.compile(r"^(.*)_\[(.*)\]$")
+
+
+class Results_Store_STEVFNs:
+    """Parquet store of results, partitioned by case study and scenario"""
+    def __init__(self, store_folder):
+        if pa is None:
+            raise ImportError("Results_Store_STEVFNs needs pyarrow, install it with conda install pyarrow")
+        self.store_folder = store_folder
+        self.partitioning = ds.partitioning(pa.schema([("case_study", pa.string()), ("scenario", pa.string())]),
+                                            flavor = "hive")
+        return
+
+    def get_table_folder(self, table):
+        if table not in TABLES:
+            raise ValueError("Unknown table " + str(table) + ", the tables are " + str(TABLES))
+        return os.path.join(self.store_folder, table)
+
+    def get_partition_folder(self, table, case_study, scenario):
+        return os.path.join(self.get_table_folder(table), "case_study=" + str(case_study), "scenario=" + str(scenario))
+
+    @staticmethod
+    def _to_columnar(data_df, float_type = None):
+        #text columns as categoricals, float columns as float_type#
+        data_df = data_df.copy()
+        for column in data_df.columns:
+            if data_df[column].dtype == object or pd.api.types.is_string_dtype(data_df[column]):
+                data_df[column] = data_df[column].astype("category")
+            elif float_type is not None and pd.api.types.is_float_dtype(data_df[column]):
+                data_df[column] = data_df[column].astype(float_type)
+        return data_df
+
+    def _write(self, table, case_study, scenario, data_df):
+        partition_folder = self.get_partition_folder(table, case_study, scenario)
+        if not os.path.exists(partition_folder):
+            os.makedirs(partition_folder)
+        filename = os.path.join(partition_folder, "part-0.parquet")
+        #write to a temporary file and replace, so that readers never see a partial file#
+        temporary_filename = filename + r"." + str(os.getpid()) + r".tmp"
+        pq.write_table(pa.Table.from_pandas(data_df, preserve_index = False), temporary_filename)
+        os.replace(temporary_filename, filename)
+        return filename
+
+    def write_total_data(self, case_study, scenario, total_data_df):
+        return self._write("total_data", case_study, scenario, self._to_columnar(total_data_df))
+
+    @staticmethod
+    def get_long_flows_df(flows_df):
+        """Returns the wide flows_df of Results.export_collab_flows as one row per time step and
+        technology, with the asset and location of every technology"""
+        technology_names = list(flows_df.columns)
+        long_flows_df = flows_df.reset_index(drop = True).melt(ignore_index = False, var_name = "technology_name",
+                                                               value_name = "flow")
+        long_flows_df = long_flows_df.rename_axis("timestep").reset_index()
+        long_flows_df["technology_name"] = pd.Categorical(long_flows_df["technology_name"],
+                                                          categories = technology_names)
+        matches = [TECHNOLOGY_NAME_PATTERN.match(str(name)) for name in technology_names]
+        assets = {name: match.group(1) if match else str(name) for name, match in zip(technology_names, matches)}
+        locations = {name: match.group(2) if match else "" for name, match in zip(technology_names, matches)}
+        long_flows_df["asset"] = long_flows_df["technology_name"].map(assets).astype("category")
+        long_flows_df["location"] = long_flows_df["technology_name"].map(locations).astype("category")
+        long_flows_df["timestep"] = long_flows_df["timestep"].astype("int32")
+        long_flows_df["flow"] = long_flows_df["flow"].astype("float32")
+        return long_flows_df[["timestep", "technology_name", "asset", "location", "flow"]]
+
+    @staticmethod
+    def get_wide_flows_df(long_flows_df):
+        """Returns long flows as read from the store in the wide format of Results.export_collab_flows,
+        one column per technology, for flows of one scenario"""
+        technology_names = list(pd.unique(long_flows_df["technology_name"].astype(str)))
+        wide_flows_df = long_flows_df.pivot_table(index = "timestep", columns = "technology_name", values = "flow",
+                                                  observed = True, sort = False)
+        wide_flows_df.columns = wide_flows_df.columns.astype(str)
+        return wide_flows_df[technology_names].reset_index(drop = True).rename_axis(None, axis = 1)
+
+    def write_flows(self, case_study, scenario, flows_df):
+        return self._write("flows", case_study, scenario, self.get_long_flows_df(flows_df))
+
+    def write_curtailment(self, case_study, scenario, curtailment_df):
+        curtailment_df = curtailment_df.copy()
+        if "Hour" not in curtailment_df.columns:
+            curtailment_df.insert(0, "Hour", range(len(curtailment_df)))
+        curtailment_df["Hour"] = curtailment_df["Hour"].astype("int32")
+        return self._write("curtailment", case_study, scenario, self._to_columnar(curtailment_df, "float32"))
+
+    def write_scenario(self, case_study, scenario, total_data_df = None, flows_df = None, curtailment_df = None):
+        """Writes the results of a scenario that are not None"""
+        if total_data_df is not None:
+            self.write_total_data(case_study, scenario, total_data_df)
+        if flows_df is not None:
+            self.write_flows(case_study, scenario, flows_df)
+        if curtailment_df is not None:
+            self.write_curtailment(case_study, scenario, curtailment_df)
+        return
+
+    def get_partitions_df(self, table = "total_data"):
+        """DataFrame of the case_study and scenario of every partition of table"""
+        filenames = glob.glob(os.path.join(self.get_table_folder(table), "case_study=*", "scenario=*", "*.parquet"))
+        partitions = []
+        for filename in sorted(filenames):
+            scenario_folder = os.path.dirname(filename)
+            partitions += [{"case_study": os.path.basename(os.path.dirname(scenario_folder))[len("case_study="):],
+                            "scenario": os.path.basename(scenario_folder)[len("scenario="):]}]
+        return pd.DataFrame(partitions, columns = ["case_study", "scenario"])
+
+    def read(self, table, case_study = None, scenario = None, filters = None, columns = None):
+        """Reads table as a DataFrame with case_study and scenario columns. case_study and scenario
+        are a name or a list of names, filters a list of (column, operator, value) tuples as in
+        pyarrow.parquet.read_table, e.g. [("location", "==", "MEX"), ("timestep", "<", 24)],
+        and columns the columns to read, all by default"""
+        filters = list(filters) if filters is not None else []
+        for partition_column, names in [("case_study", case_study), ("scenario", scenario)]:
+            if names is None:
+                continue
+            if isinstance(names, (list, tuple, set)):
+                filters += [(partition_column, "in", [str(name) for name in names])]
+            else:
+                filters += [(partition_column, "==", str(names))]
+        table_folder = self.get_table_folder(table)
+        if not os.path.exists(table_folder):
+            return pd.DataFrame()
+        if columns is not None:
+            columns = list(columns) + [column for column in ["case_study", "scenario"] if column not in columns]
+        results_table = pq.read_table(table_folder, columns = columns, filters = filters if len(filters) > 0 else None,
+                                      partitioning = self.partitioning)
+        results_df = results_table.to_pandas()
+        for partition_column in ["case_study", "scenario"]:
+            if partition_column in results_df.columns:
+                results_df[partition_column] = results_df[partition_column].astype("category")
+        return results_df
+
+    def read_total_data(self, case_study = None, scenario = None, filters = None, columns = None):
+        return self.read("total_data", case_study, scenario, filters, columns)
+
+    def read_flows(self, case_study = None, scenario = None, filters = None, columns = None):
+        return self.read("flows", case_study, scenario, filters, columns)
+
+    def read_curtailment(self, case_study = None, scenario = None, filters = None, columns = None):
+        return self.read("curtailment", case_study, scenario, filters, columns)
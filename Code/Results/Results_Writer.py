@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:31:05 2026
+
+Incremental writer of the results of a case study. The results, rounded results and
+solver telemetry of every scenario are appended to results.csv, results_rounded.csv
+and solver_telemetry.csv of the results folder as soon as the scenario is solved, and
+the scenario is then recorded in manifest.jsonl, one JSON line per scenario with its
+status, value, times, the hash of its input files and the sizes of the appended files.
+A scenario is completed once its line is in the manifest, so a sweep that stops is
+resumed by skipping the completed scenarios, e.g.
+
+results_writer = Results_Writer_STEVFNs(results_folder)
+for scenario_folder in scenario_folders_list:
+    if results_writer.is_completed(scenario_folder):
+        continue
+    ...
+    results_writer.write_scenario(scenario_folder, results_df, results_rounded_df, telemetry)
+
+Rows appended after the last line of the manifest, by a sweep that stopped while
+writing a scenario, are removed when the writer is opened. Files of a results folder
+without a manifest, e.g. written before the writer was used, are renamed aside with a
+timestamp and a warning, so that they are neither removed nor appended to. Scenarios that were not
+solved are recorded with completed false and run again. Only one process writes to
+a results folder, the workers of Runner.run_case_study return their results to it.
+"""
+
+### Import Packages ###
+
+import os
+import json
+import hashlib
+import datetime
+import warnings
+import pandas as pd
+
+#files appended for every scenario#
+APPENDED_FILENAMES = {"results": "results.csv",
+                      "results_rounded": "results_rounded.csv",
+                      "telemetry": "solver_telemetry.csv"}
+
+SCENARIO_FILENAMES = ["Location_Parameters.csv", "Asset_Parameters.csv", "System_Parameters.csv"]
+
+
+class Results_Writer_STEVFNs:
+    """Appends the results of every scenario to the results folder and records them in a manifest"""
+    def __init__(self, results_folder, resume = True):
+        self.results_folder = results_folder
+        self.manifest_filename = os.path.join(results_folder, "manifest.jsonl")
+        if not os.path.exists(results_folder):
+            os.makedirs(results_folder)
+        if resume == True:
+            self._recover()
+        else:
+            self.clear()
+        return
+
+    def get_filename(self, name):
+        return os.path.join(self.results_folder, APPENDED_FILENAMES[name])
+
+    @staticmethod
+    def get_scenario_key(scenario_folder):
+        """Hash of the input files of the scenario"""
+        scenario_hash = hashlib.sha256()
+        for filename in SCENARIO_FILENAMES:
+            scenario_hash.update(filename.encode())
+            full_filename = os.path.join(scenario_folder, filename)
+            if os.path.exists(full_filename):
+                with open(full_filename, "rb") as scenario_file:
+                    scenario_hash.update(scenario_file.read())
+        return scenario_hash.hexdigest()[:32]
+
+    def clear(self):
+        """Removes the manifest and the appended files"""
+        for filename in [self.manifest_filename] + [self.get_filename(name) for name in APPENDED_FILENAMES]:
+            if os.path.exists(filename):
+                os.remove(filename)
+        self.manifest = []
+        return
+
+    def _recover(self):
+        #keep the complete lines of the manifest and truncate the files to their sizes at the last line#
+        self.manifest = []
+        manifest_size = 0
+        if os.path.exists(self.manifest_filename):
+            with open(self.manifest_filename, "rb") as manifest_file:
+                for line in manifest_file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        self.manifest += [json.loads(line)]
+                    except ValueError:
+                        break
+                    manifest_size += len(line)
+            if manifest_size < os.path.getsize(self.manifest_filename):
+                os.truncate(self.manifest_filename, manifest_size)
+        if len(self.manifest) == 0:
+            self._move_unrecorded_files()
+            return
+        file_sizes = self.manifest[-1]["file_sizes"]
+        for name in APPENDED_FILENAMES:
+            filename = self.get_filename(name)
+            if not os.path.exists(filename) or name not in file_sizes:
+                continue
+            if file_sizes[name] == 0:
+                os.remove(filename)
+            elif os.path.getsize(filename) > file_sizes[name]:
+                os.truncate(filename, file_sizes[name])
+        return
+
+    def _move_unrecorded_files(self):
+        #files without a manifest, e.g. of runs before the writer, are renamed aside rather than appended to#
+        suffix = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        for name in APPENDED_FILENAMES:
+            filename = self.get_filename(name)
+            if not os.path.exists(filename):
+                continue
+            root, extension = os.path.splitext(filename)
+            moved_filename = root + r"_" + suffix + extension
+            os.replace(filename, moved_filename)
+            warnings.warn(filename + " is not recorded in the manifest of " + self.results_folder +
+                          ", it was moved to " + moved_filename)
+        return
+
+    def get_manifest_df(self):
+        """DataFrame of the last manifest line of every scenario, in the order they were written"""
+        if len(self.manifest) == 0:
+            return pd.DataFrame()
+        manifest_df = pd.DataFrame([{key: value for key, value in entry.items() if key != "file_sizes"}
+                                    for entry in self.manifest])
+        return manifest_df.drop_duplicates("scenario_name", keep = "last").reset_index(drop = True)
+
+    def is_completed(self, scenario_folder):
+        """True if the scenario was solved and written. Raises ValueError if its input files changed
+        since, the results of the case study must then be written again with resume = False"""
+        scenario_name = os.path.basename(scenario_folder)
+        entries = [entry for entry in self.manifest if entry["scenario_name"] == scenario_name]
+        if len(entries) == 0 or entries[-1]["completed"] != True:
+            return False
+        if entries[-1]["scenario_key"] != self.get_scenario_key(scenario_folder):
+            raise ValueError("Input files of " + scenario_name + " changed since its results were written to " +
+                             self.results_folder + ", write the results again with resume = False")
+        return True
+
+    def _append_csv(self, name, data_df):
+        filename = self.get_filename(name)
+        if data_df is None or len(data_df.columns) == 0:
+            return
+        header = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        if header == False:
+            #rows are appended in the columns of the header#
+            data_df = data_df.reindex(columns = pd.read_csv(filename, nrows = 0).columns)
+        with open(filename, "a", newline = "") as data_file:
+            data_df.to_csv(data_file, index = False, header = header)
+            data_file.flush()
+            os.fsync(data_file.fileno())
+        return
+
+    def write_scenario(self, scenario_folder, results_df = None, results_rounded_df = None, telemetry = None,
+                       **scenario_summary):
+        """Appends the results, rounded results and telemetry, a list of attempts, of the scenario and
+        records it in the manifest with scenario_summary, e.g. status and value. The scenario is
+        completed if results_df is not None"""
+        scenario_name = os.path.basename(scenario_folder)
+        self._append_csv("results", results_df)
+        self._append_csv("results_rounded", results_rounded_df)
+        if telemetry is not None and len(telemetry) > 0:
+            self._append_csv("telemetry", pd.DataFrame(telemetry))
+        file_sizes = {name: os.path.getsize(self.get_filename(name)) if os.path.exists(self.get_filename(name)) else 0
+                      for name in APPENDED_FILENAMES}
+        entry = {"scenario_name": scenario_name}
+        entry.update(scenario_summary)
+        entry.update({"completed": results_df is not None,
+                      "results_rows": len(results_df) if results_df is not None else 0,
+                      "scenario_key": self.get_scenario_key(scenario_folder),
+                      "date": datetime.datetime.now().isoformat(timespec = "seconds"),
+                      "file_sizes": file_sizes})
+        with open(self.manifest_filename, "a") as manifest_file:
+            manifest_file.write(json.dumps(entry, default = str) + "\n")
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+        self.manifest += [json.loads(json.dumps(entry, default = str))]
+        return
+
+    def _read_csv(self, name):
+        filename = self.get_filename(name)
+        if not os.path.exists(filename):
+            return pd.DataFrame()
+        return pd.read_csv(filename)
+
+    def read_results(self):
+        return self._read_csv("results")
+
+    def read_results_rounded(self):
+        return self._read_csv("results_rounded")
+
+    def read_telemetry(self):
+        return self._read_csv("telemetry")
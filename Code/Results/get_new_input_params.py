@@ -9,12 +9,14 @@ Created on Tue Nov 26 20:03:33 2024
 import pandas as pd
 import numpy as np
 import os
+from ..Assets.Parameters_Repository import parameters_repository
 
 def update_existing_RE_capacity(my_network, tech_lim, tech_existing,
-                                assets_folder, iteration_year):
+                                assets_folder, iteration_year, write_csv = False):
     """
     Calculates the updated existing capacity for a given technology after an iteration.
-    Value should be input into Assets/tech_existing/parameters.csv
+    The value is set as an in-memory override of Assets/tech_existing/parameters.csv,
+    which is used by the next update of any network in this process
     
     Parameters
     ----------
@@ -29,11 +31,13 @@ def update_existing_RE_capacity(my_network, tech_lim, tech_existing,
     iteration_year : str
         String of the end year being modelled. i.e. if the period 2020-2030 is being modelled,
         iteration_year would be '2030'
+    write_csv : bool
+        Also write the updated parameters.csv to the asset folder, as for a new process
 
     Returns
     -------
-    CSV FILE
-        Updated paramters.csv file saved in the asset folder for next run
+    DATAFRAME
+        Updated parameters of tech_existing for next run
     """
     new_capacity = 0
 
@@ -46,9 +50,7 @@ def update_existing_RE_capacity(my_network, tech_lim, tech_existing,
     for asset in my_network.assets:
         if asset.asset_name == tech_existing:
             previous_existing = asset.asset_size()
-            # Need to find path to asset's parameters.csv to update there
-            asset_folder = os.path.join(assets_folder, tech_existing)
-            df = pd.read_csv(os.path.join(asset_folder, 'parameters.csv'))
+            df = parameters_repository.get_parameters_df(tech_existing)
             
             # Find row that has description column value equal to the iteration year
             # Need to figure out if I can change datatypes when reading the csv. 
@@ -56,9 +58,12 @@ def update_existing_RE_capacity(my_network, tech_lim, tech_existing,
             # I want to generalize so that every parameters.csv file can be identified the same
             id_row = df.index[df['description'] == iteration_year].tolist()
             # print("ID_ROW", id_row)
-            df.at[id_row[0], 'existing_capacity'] = previous_existing + new_capacity    
-            
-    return df.to_csv(os.path.join(asset_folder, 'parameters.csv'), index=False)
+            parameters_repository.set_parameter(tech_existing, id_row[0], 'existing_capacity',
+                                                previous_existing + new_capacity)
+    
+    if write_csv == True:
+        parameters_repository.save(tech_existing, os.path.join(assets_folder, tech_existing, 'parameters.csv'))
+    return parameters_repository.get_parameters_df(tech_existing)
         
 # def update_existing_RE_capacity(my_network, )
         
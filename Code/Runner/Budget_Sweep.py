@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:05:44 2026
+
+Sweeps of the CO2 budget of a case study, for mitigation curves. The network is
+updated once with the parameters of a scenario and only the maximum_budget of its
+CO2_Budget asset changes between solves, so no scenario folder is needed per budget.
+The budgets are solved in increasing order with warm_start, so that solvers that
+support it, such as HiGHS, start from the solution of the previous budget and the
+others reuse their workspace. With workers > 1 the sorted budgets are split into
+contiguous chunks that are solved on a pool of forked worker processes.
+
+The mitigation curves of a case study are solved and plotted with, e.g.
+
+sweep_df, budgets_df = run_budget_sweep(my_network, scenario_folders_list[0], np.linspace(0, 800, 9), workers = 2)
+mitigation_plots.dpacc_subplots(sweep_df, sweep_df, plot_filename, "MEX", countries)
+"""
+
+import time
+import multiprocessing
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+
+from .Runner import read_scenario
+from ..Results import Results
+
+#network used by _solve_worker_budgets in worker processes, set before forking#
+_worker_network = None
+_worker_options = dict()
+
+
+def get_budget_assets(my_network):
+    return [asset for asset in my_network.assets if asset.asset_name == "CO2_Budget"]
+
+
+def set_budget(my_network, budget):
+    for asset in get_budget_assets(my_network):
+        asset.conversion_fun_params["maximum_budget"].value = budget
+    return
+
+
+def solve_budgets(my_network, budgets, location_parameters_df, asset_parameters_df, solver = cp.CLARABEL,
+                  warm_start = True, **solver_options):
+    """Solves my_network for every budget in order and returns a list of dicts with the
+    maximum_budget, status, value, solve time and results dataframe of every budget. Budgets
+    whose solver fails have status solver_error and no value"""
+    budgets_results = []
+    for budget in budgets:
+        set_budget(my_network, budget)
+        solve_time = time.time()
+        status = None
+        try:
+            my_network.solve_problem(solver = solver, warm_start = warm_start, **solver_options)
+            status = my_network.problem.status
+        except cp.error.SolverError:
+            # Avoid breaking the sweep if a budget does not converge
+            status = "solver_error"
+        solved_time = time.time()
+        value = my_network.problem.value if status != "solver_error" else None
+        budget_results = {"maximum_budget": budget,
+                          "status": status,
+                          "value": value,
+                          "solve_time": solved_time - solve_time,
+                          "results": None}
+        # Budgets below the lowest feasible emissions have no results
+        if value is not None and value != float("inf"):
+            results_df = Results.get_total_data(my_network, location_parameters_df, asset_parameters_df)
+            results_df.insert(0, "maximum_budget", budget)
+            budget_results["results"] = results_df
+        budgets_results += [budget_results]
+    return budgets_results
+
+
+def _solve_worker_budgets(budgets):
+    return solve_budgets(_worker_network, budgets, **_worker_options)
+
+
+def run_budget_sweep(my_network, scenario_folder, budgets, workers = 1, solver = cp.CLARABEL, warm_start = True,
+                     **solver_options):
+    """Updates my_network with the scenario in scenario_folder and solves it for every
+    maximum_budget of the CO2_Budget in budgets, on workers processes. Returns (sweep_df, budgets_df),
+    sweep_df has the rows of Results.get_total_data of every feasible budget with its maximum_budget,
+    as used by the plots of mitigation_plots, and budgets_df the status, value and solve time of every budget"""
+    global _worker_network, _worker_options
+    location_parameters_df, asset_parameters_df, system_parameters_df = read_scenario(scenario_folder)
+    my_network.update(location_parameters_df, asset_parameters_df, system_parameters_df)
+    scenario_budgets = [asset.conversion_fun_params["maximum_budget"].value for asset in get_budget_assets(my_network)]
+    if len(scenario_budgets) == 0:
+        raise ValueError("The network has no CO2_Budget asset")
+    budgets = sorted(budgets)
+    options = dict(location_parameters_df = location_parameters_df, asset_parameters_df = asset_parameters_df,
+                   solver = solver, warm_start = warm_start, **solver_options)
+    workers = max(1, min(workers, len(budgets)))
+    try:
+        if workers == 1 or "fork" not in multiprocessing.get_all_start_methods():
+            budgets_results = solve_budgets(my_network, budgets, **options)
+        else:
+            #forked workers share the network copy-on-write, every worker warm-starts along its own chunk#
+            _worker_network = my_network
+            _worker_options = options
+            chunks = [[float(budget) for budget in chunk] for chunk in np.array_split(budgets, workers)]
+            try:
+                with multiprocessing.get_context("fork").Pool(workers) as pool:
+                    chunks_results = pool.map(_solve_worker_budgets, chunks, chunksize = 1)
+            finally:
+                _worker_network = None
+                _worker_options = dict()
+            budgets_results = [budget_results for chunk_results in chunks_results for budget_results in chunk_results]
+    finally:
+        for asset, budget in zip(get_budget_assets(my_network), scenario_budgets):
+            asset.conversion_fun_params["maximum_budget"].value = budget
+    results_list = [budget_results["results"] for budget_results in budgets_results
+                    if budget_results["results"] is not None]
+    sweep_df = pd.concat(results_list, ignore_index=True) if len(results_list) > 0 else pd.DataFrame()
+    budgets_df = pd.DataFrame([{key: value for key, value in budget_results.items() if key != "results"}
+                               for budget_results in budgets_results])
+    return sweep_df, budgets_df
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:05:41 2026
+
+Rolling horizon dispatch of a network with fixed capacities, e.g. the capacities of
+a planning solve. The horizon is solved in windows of window_length hours, each
+extended by overlap_length hours that are solved but not kept, so that storage is
+not emptied at the end of every window. One network of window_length + overlap_length
+time steps is built and compiled once and updated for every window, so that memory
+is bounded by the window instead of the horizon.
+
+The stored quantity of every storage asset and the CO2 budget consumed so far are
+carried over from one window to the next. Windows do not see the hours after them, so
+at the end of its kept hours every window must store at least storage_targets, the
+stored quantities of the planning solve from get_storage_targets, and the dispatch of
+the planning solve stays feasible for every window. Every window may use the remaining CO2
+budget pro rata to its hours, or to its share of co2_budget_shares, e.g. the hourly
+emissions of the planning solve from get_co2_emissions. Windows cannot use budget of
+later windows, so a window whose share of a binding budget is too small is reported as
+infeasible, its flows are nan and the next window starts from the stored quantities of
+storage_targets.
+The kept flows of all windows are stitched into result_network, a network of the assets over
+the full horizon whose edges hold the stitched flows, which can be passed to the functions of
+Results, e.g. Results.export_collab_flows.
+
+The hourly dispatch of the full year with the capacities of a solved scenario is solved
+one week at a time with, e.g.
+
+rolling_horizon = Rolling_Horizon_STEVFNs(network_structure_df, window_length = 168, overlap_length = 24)
+windows_df = rolling_horizon.solve(location_parameters_df, asset_parameters_df, system_parameters_df,
+                                   my_network.get_capacities(), get_initial_storages(my_network),
+                                   get_storage_targets(my_network), solver = cp.MOSEK)
+flows_df = Results.export_collab_flows(rolling_horizon.result_network, location_parameters_df)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+
+from ..Network.Network import Network_STEVFNs
+from ..Network.Time_Aggregation import Time_Aggregation_STEVFNs
+from ..Assets.Base_Assets import Multi_Asset, Storage_Asset_STEVFNs
+
+
+def get_co2_emissions(my_network):
+    """Returns the CO2 emissions at every simulated time step of a solved network, in the
+    units of the CO2 budget. Entry i of the emissions of an asset into the CO2_Budget node
+    is taken to be emitted at time step i"""
+    timesteps = my_network.system_structure_properties["simulated_timesteps"]
+    co2_emissions = np.zeros(timesteps)
+    for asset in my_network.assets:
+        if asset.asset_name != "CO2_Budget":
+            continue
+        co2_budget_node = asset.edges[0].target_nodes[0]
+        for input_block_edge in co2_budget_node.input_block_edges:
+            #the budget itself is an input of the node#
+            if input_block_edge not in asset.edges:
+                co2_emissions -= np.resize(input_block_edge.extract_flow().value, timesteps)
+    #emissions are scaled to a year by 8760/simulated_timesteps#
+    return co2_emissions * timesteps / 8760
+
+
+def get_components(my_network):
+    """Returns a dict of the assets of my_network and of its Multi_Assets, keyed by
+    (asset_number, component_name), component_name is None for assets that are not Multi_Assets"""
+    components = dict()
+    for counter1 in range(len(my_network.assets)):
+        asset = my_network.assets[counter1]
+        if isinstance(asset, Multi_Asset):
+            for component_name, component in asset.assets_dictionary.items():
+                components[(counter1, component_name)] = component
+        else:
+            components[(counter1, None)] = asset
+    return components
+
+
+def get_initial_storages(my_network):
+    """Returns the stored quantity of every storage asset at the start of the horizon of a solved
+    network, e.g. the planning solve of the capacities, as initial_storages of Rolling_Horizon_STEVFNs.solve.
+    The storage of the network is cyclic, so it is the quantity carried over from its last time step"""
+    return {key: component.get_carried_storage(-1) for key, component in get_components(my_network).items()
+            if isinstance(component, Storage_Asset_STEVFNs)}
+
+
+def get_storage_targets(my_network):
+    """Returns the stored quantity of every storage asset at every time step of a solved network,
+    e.g. the planning solve of the capacities over the horizon, as storage_targets of
+    Rolling_Horizon_STEVFNs.solve"""
+    return {key: component.get_storage_levels() for key, component in get_components(my_network).items()
+            if isinstance(component, Storage_Asset_STEVFNs)}
+
+
+class Rolling_Horizon_STEVFNs:
+    """Rolling horizon dispatch of the network of network_structure_df"""
+    def __init__(self, network_structure_df, window_length = 168, overlap_length = 24, horizon_length = 8760):
+        self.window_length = int(window_length)
+        self.overlap_length = int(overlap_length)
+        self.horizon_length = int(horizon_length)
+        self.number_of_timesteps = self.window_length + self.overlap_length
+        #one period moved over the horizon, storage starts at the stored quantity carried over#
+        self.time_window = Time_Aggregation_STEVFNs(self.number_of_timesteps, [0], [1], [0],
+                                                     link_storage = True, cyclic_storage = False)
+        self.network_structure_df = network_structure_df
+        self.network = Network_STEVFNs()
+        self.network.fixed_capacities = True
+        self.network.build(network_structure_df, time_aggregation = self.time_window)
+        self.components = get_components(self.network)
+        self._build_terminal_storages()
+        self.co2_budget_asset = None
+        for asset in self.network.assets:
+            if asset.asset_name == "CO2_Budget":
+                self.co2_budget_asset = asset
+        self.result_network = None
+        self.windows_df = None
+        return
+
+
+    def _build_terminal_storages(self):
+        #lower bounds on the stored quantity at every time step of the window, nonzero at the end of the kept hours#
+        self.terminal_storages = dict()
+        #losses of the stored quantity of the window start over the time steps of the window#
+        self.storage_losses = dict()
+        for key, component in self.components.items():
+            if not isinstance(component, Storage_Asset_STEVFNs):
+                continue
+            self.terminal_storages[key] = cp.Parameter(self.number_of_timesteps, nonneg = True)
+            self.storage_losses[key] = cp.Parameter(self.number_of_timesteps, nonneg = True)
+            #the network takes the constraints of its assets, those of Multi_Assets include their components#
+            self.network.assets[key[0]].constraints += [
+                component.flows + cp.multiply(self.storage_losses[key], component.period_storage[0]) >=
+                self.terminal_storages[key]]
+        self.network.update_problem()
+        return
+
+    def _update_terminal_storages(self, window_start, kept_length, storage_targets):
+        for key, terminal_storage in self.terminal_storages.items():
+            terminal_storage_value = np.zeros(self.number_of_timesteps)
+            if key in storage_targets:
+                terminal_storage_value[kept_length - 1] = max(storage_targets[key][window_start + kept_length - 1], 0)
+            terminal_storage.value = terminal_storage_value
+            self.storage_losses[key].value = (self.components[key]._get_conversion_factor()**
+                                              np.arange(self.number_of_timesteps))
+        return
+
+    def _get_series_names(self, component):
+        #variables and parameters with one or more time series of the window, one after the other#
+        series_names = []
+        for attribute_name, attribute in vars(component).items():
+            if (isinstance(attribute, (cp.Variable, cp.Parameter)) and attribute.ndim == 1 and
+                attribute.size % self.number_of_timesteps == 0):
+                series_names += [attribute_name]
+        return series_names
+
+    def _update_co2_budget(self, window_start, co2_budget_shares):
+        maximum_budget = self.co2_budget_asset.conversion_fun_params["maximum_budget"]
+        if self.co2_budget is None:
+            self.co2_budget = maximum_budget.value
+        remaining_budget = max(self.co2_budget - self.co2_emissions, 0)
+        remaining_shares = co2_budget_shares[window_start:].sum()
+        window_budget = 0
+        if remaining_shares > 0:
+            window_budget = remaining_budget * co2_budget_shares[self.time_window.hours].sum() / remaining_shares
+        #emissions of the window are scaled to a year by 8760/simulated_timesteps#
+        maximum_budget.value = window_budget * 8760 / self.number_of_timesteps
+        return
+
+    def solve(self, location_parameters_df, asset_parameters_df, system_parameters_df, capacities,
+              initial_storages, storage_targets, co2_budget_shares = None, solver = cp.CLARABEL, **solver_options):
+        """Solves the dispatch over the horizon with the capacities of get_capacities() of a
+        solved network. initial_storages is a dict of the stored quantity at the start of the
+        horizon, keyed as self.components, e.g. get_initial_storages() of the same solved network,
+        storage assets that are not in it start empty. storage_targets is a dict of the stored
+        quantity at every hour of the horizon, keyed as self.components, e.g. get_storage_targets()
+        of the same network solved over the horizon, every window stores at least the target at the
+        end of its kept hours, storage assets that are not in it have no target. co2_budget_shares
+        are hourly weights of the CO2 budget over the horizon, equal by default. Returns a DataFrame of the status,
+        value and times of every window and sets result_network. Raises SolverError if no window
+        was solved"""
+        if co2_budget_shares is None:
+            co2_budget_shares = np.ones(self.horizon_length)
+        co2_budget_shares = np.asarray(co2_budget_shares, dtype = np.float64)
+        for key, storage_target in storage_targets.items():
+            if len(storage_target) != self.horizon_length:
+                raise ValueError("storage_targets of " + str(key) + " has " + str(len(storage_target)) +
+                                 " time steps instead of one per hour of the horizon, " + str(self.horizon_length))
+        storages = {key: component for key, component in self.components.items()
+                    if isinstance(component, Storage_Asset_STEVFNs)}
+        carried_storages = {key: 0.0 for key in storages}
+        carried_storages.update(initial_storages)
+        series_names = {key: self._get_series_names(component) for key, component in self.components.items()}
+        series = {(key, series_name): [] for key in self.components for series_name in series_names[key]}
+        self.co2_budget = None
+        self.co2_emissions = 0.0
+        windows_list = []
+        for window_start in range(0, self.horizon_length, self.window_length):
+            kept_length = min(self.window_length, self.horizon_length - window_start)
+            update_time = time.time()
+            self.time_window.set_period_starts([window_start], self.horizon_length)
+            self.network.update(location_parameters_df, asset_parameters_df, system_parameters_df)
+            self.network.set_capacities(capacities)
+            for key, storage in storages.items():
+                storage.storage_linking_params["initial_storage"].value = carried_storages[key]
+            self._update_terminal_storages(window_start, kept_length, storage_targets)
+            if self.co2_budget_asset is not None:
+                self._update_co2_budget(window_start, co2_budget_shares)
+            solve_time = time.time()
+            status = None
+            try:
+                self.network.solve_problem(solver = solver, **solver_options)
+                status = self.network.problem.status
+            except cp.error.SolverError:
+                # Avoid breaking the horizon if a window does not converge
+                status = "solver_error"
+            solved_time = time.time()
+            value = self.network.problem.value if status != "solver_error" else None
+            window_results = {"window_start": window_start,
+                              "kept_length": kept_length,
+                              "status": status,
+                              "value": value,
+                              "co2_emissions": np.nan,
+                              "update_time": solve_time - update_time,
+                              "solve_time": solved_time - solve_time}
+            windows_list += [window_results]
+            solved = value is not None and np.isfinite(value)
+            for (key, series_name), series_list in series.items():
+                component = self.components[key]
+                if not solved:
+                    values = np.full(getattr(component, series_name).size, np.nan)
+                elif series_name == "flows" and key in storages:
+                    #storage flows are kept as the stored quantity rather than relative to the window start#
+                    values = component.get_storage_levels()
+                else:
+                    values = getattr(component, series_name).value
+                values = np.reshape(values, (-1, self.number_of_timesteps))[:, :kept_length]
+                series_list += [values]
+            if not solved:
+                for key, storage in storages.items():
+                    if key in storage_targets:
+                        carried_storages[key] = max(storage._get_conversion_factor() * 
+                                                    storage_targets[key][window_start + kept_length - 1], 0)
+                continue
+            for key, storage in storages.items():
+                carried_storages[key] = storage.get_carried_storage(kept_length - 1)
+            if self.co2_budget_asset is not None:
+                window_results["co2_emissions"] = get_co2_emissions(self.network)[:kept_length].sum()
+                self.co2_emissions += window_results["co2_emissions"]
+        self.windows_df = pd.DataFrame(windows_list)
+        if not np.isfinite(self.windows_df["value"].astype(np.float64)).any():
+            raise cp.error.SolverError("No window of the horizon was solved, the statuses are " +
+                                       str(self.windows_df["status"].value_counts().to_dict()) +
+                                       ", check initial_storages and the capacities")
+        self.result_network = self._build_result_network(series, location_parameters_df, asset_parameters_df,
+                                                         system_parameters_df)
+        return self.windows_df
+
+    def _build_result_network(self, series, location_parameters_df, asset_parameters_df, system_parameters_df):
+        #network of the assets over the horizon, whose time series are the stitched values of the windows#
+        result_network = Network_STEVFNs()
+        result_network.base_folder = self.network.base_folder
+        network_structure_df = self.network_structure_df.copy()
+        network_structure_df["Start_Time"] = 0
+        network_structure_df["End_Time"] = self.horizon_length
+        network_structure_df["Period"] = 1
+        result_network.generate_assets(network_structure_df)
+        result_network.system_structure_properties["simulated_timesteps"] = self.horizon_length
+        result_network.update(location_parameters_df, asset_parameters_df, system_parameters_df)
+        result_components = get_components(result_network)
+        for (key, series_name), series_list in series.items():
+            if not hasattr(result_components[key], series_name):
+                continue
+            values = np.concatenate(series_list, axis = 1).reshape(-1)
+            setattr(result_components[key], series_name, cp.Constant(values))
+        #variables that are not time series, e.g. the sizes of RE assets, are fixed by the capacities#
+        for key, component in self.components.items():
+            for attribute_name, attribute in vars(component).items():
+                result_attribute = getattr(result_components[key], attribute_name, None)
+                if (key, attribute_name) in series or not isinstance(attribute, cp.Variable):
+                    continue
+                if not isinstance(result_attribute, cp.Variable) or result_attribute.shape != attribute.shape:
+                    continue
+                values = attribute.value if attribute.value is not None else np.full(attribute.shape, np.nan)
+                setattr(result_components[key], attribute_name, cp.Constant(values))
+        #edges and costs of the assets are built from the stitched values, the problem is not built#
+        result_network.build_assets()
+        return result_network
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:40:12 2026
+
+Runs all scenarios of a case study. The network is built once and, with
+workers > 1, shared with a pool of forked worker processes that update and
+solve their scenarios independently. The results of every scenario are written
+as soon as it is solved, in the order of the scenario folders, and a run that
+stopped is resumed from the scenarios it did not complete. The scenario loop of
+main.py is run on a pool of worker processes with, e.g.
+
+from Code.Runner.Runner import run_case_study
+total_results, total_results_rounded, scenarios_df = run_case_study(case_study_name, workers = 4, solver = cp.MOSEK)
+"""
+
+import os
+import time
+import multiprocessing
+import pandas as pd
+import cvxpy as cp
+from cvxpy import settings
+
+from ..Network.Network import Network_STEVFNs
+from ..Network.Build_Cache import Build_Cache_STEVFNs
+from ..Results import Results
+from ..Results.Results_Writer import Results_Writer_STEVFNs
+from ..Results.Results_Extractor import Results_Extractor_STEVFNs
+
+#network used by run_scenario in worker processes, set before forking#
+_worker_network = None
+_worker_options = dict()
+
+
+def get_scenario_folders(case_study_folder):
+    scenario_folders_list = []
+    for folder in sorted(os.listdir(case_study_folder)):
+        full_path = os.path.join(case_study_folder, folder)
+        if os.path.isdir(full_path) and folder.startswith('scenario_'):
+            scenario_folders_list.append(full_path)
+    return scenario_folders_list
+
+
+def read_scenario(scenario_folder):
+    location_parameters_df = pd.read_csv(os.path.join(scenario_folder, "Location_Parameters.csv"))
+    asset_parameters_df = pd.read_csv(os.path.join(scenario_folder, "Asset_Parameters.csv"))
+    system_parameters_df = pd.read_csv(os.path.join(scenario_folder, "System_Parameters.csv"))
+    return location_parameters_df, asset_parameters_df, system_parameters_df
+
+
+def build_network(network_structure_df, build_cache_folder = None, solver = cp.CLARABEL, time_aggregation = None,
+                  epigraph_costs = False):
+    if build_cache_folder is None:
+        my_network = Network_STEVFNs()
+        my_network.epigraph_costs = epigraph_costs
+        my_network.build(network_structure_df, time_aggregation = time_aggregation)
+        return my_network
+    return Build_Cache_STEVFNs(build_cache_folder).load_or_build(network_structure_df, solver = solver,
+                                                                 time_aggregation = time_aggregation,
+                                                                 epigraph_costs = epigraph_costs)
+
+
+def run_scenario(my_network, scenario_folder, solver = cp.CLARABEL, results_folder = None, plot = False,
+                 component_workers = None, solver_configs = None, results_store = None, **solver_options):
+    """Updates my_network with the scenario, solves it and returns a dict with
+    the scenario_name, status, value, times, solver telemetry and results dataframes. The scenario
+    is solved with the chain of solver_configs, see Solver_Chain_STEVFNs, by default solver with
+    solver_options only, and has status solver_error if no solver solved it. With component_workers
+    the connected components of the network are solved separately on that many processes. With a
+    results_store, a Results_Store_STEVFNs, the results, flows and curtailment are written to its
+    partition of the case study and scenario"""
+    location_parameters_df, asset_parameters_df, system_parameters_df = read_scenario(scenario_folder)
+    scenario_name = os.path.basename(scenario_folder)
+    update_time = time.time()
+    my_network.update(location_parameters_df, asset_parameters_df, system_parameters_df)
+    my_network.scenario_name = scenario_name
+    solve_time = time.time()
+    telemetry_start = len(my_network.solver_telemetry)
+    solver_error = False
+    if component_workers is not None:
+        my_network.solve_components(solver = solver, workers = component_workers, **solver_options)
+    else:
+        if solver_configs is None:
+            solver_configs = [{"solver": solver, "options": solver_options}]
+        try:
+            my_network.solve_chain(solver_configs)
+        except cp.error.SolverError:
+            solver_error = True
+    solved_time = time.time()
+    telemetry = my_network.solver_telemetry[telemetry_start:]
+    #the attempt whose solution was kept, with solve_components there is no telemetry#
+    selected_attempt = next((attempt for attempt in telemetry if attempt["selected"] == True), dict())
+    scenario_results = {"scenario_name": scenario_name,
+                        "status": my_network.problem.status if solver_error == False else settings.SOLVER_ERROR,
+                        "value": my_network.problem.value if solver_error == False else None,
+                        "update_time": solve_time - update_time,
+                        "solve_time": solved_time - solve_time,
+                        "solver": selected_attempt.get("solver"),
+                        "attempts": len(telemetry),
+                        "iterations": selected_attempt.get("iterations"),
+                        "primal_residual": selected_attempt.get("primal_residual"),
+                        "dual_residual": selected_attempt.get("dual_residual"),
+                        "telemetry": telemetry,
+                        "results": None,
+                        "results_rounded": None}
+    # Avoid breaking the sweep if a scenario does not converge
+    if solver_error == True or my_network.problem.value is None or my_network.problem.value == float("inf"):
+        return scenario_results
+    with my_network.profiler.phase("results"):
+        #the flows of the network are extracted once for all results#
+        extractor = Results_Extractor_STEVFNs(my_network)
+        scenario_results["results"] = Results.get_total_data(my_network, location_parameters_df, asset_parameters_df,
+                                                             extractor = extractor)
+        scenario_results["results_rounded"] = Results.get_total_data_rounded(my_network, location_parameters_df,
+                                                                              asset_parameters_df, extractor = extractor)
+        if results_folder is not None or results_store is not None:
+            flows_df = Results.export_collab_flows(my_network, location_parameters_df, extractor = extractor)
+            curtailment = Results.calculate_curtailment_aut(my_network, extractor = extractor)
+        if results_folder is not None:
+            flows_df.to_csv(os.path.join(results_folder, f"flows_{scenario_name}.csv"), index=False, header=True)
+            curtailment.to_csv(os.path.join(results_folder, f"curtailment_{scenario_name}.csv"), index=False,
+                               header=True)
+        if results_store is not None:
+            case_study = os.path.basename(os.path.dirname(os.path.abspath(scenario_folder)))
+            results_store.write_scenario(case_study, scenario_name, total_data_df = scenario_results["results"],
+                                         flows_df = flows_df, curtailment_df = curtailment)
+    if results_folder is not None:
+        if plot == True:
+            from ..Plotting import DPhil_Plotting
+            asset_sizes_folder = os.path.join(results_folder, "asset_sizes")
+            if not os.path.exists(asset_sizes_folder):
+                os.makedirs(asset_sizes_folder)
+            DPhil_Plotting.plot_asset_sizes_stacked(my_network, location_parameters_df,
+                                                    save_path=os.path.join(asset_sizes_folder, f"{scenario_name}.png"))
+    return scenario_results
+
+
+def _initialise_worker(network_structure_df, build_cache_folder, options, time_aggregation, epigraph_costs):
+    #without fork, every worker builds the network, or loads it from the build cache#
+    global _worker_network, _worker_options
+    _worker_network = build_network(network_structure_df, build_cache_folder, options["solver"], time_aggregation,
+                                    epigraph_costs)
+    _worker_options = options
+    return
+
+
+def _run_worker_scenario(scenario_folder):
+    return run_scenario(_worker_network, scenario_folder, **_worker_options)
+
+
+def _concat_results(results_list):
+    results_list = [results_df for results_df in results_list if results_df is not None]
+    if len(results_list) == 0:
+        return pd.DataFrame()
+    return pd.concat(results_list, ignore_index=True)
+
+
+def _run_scenarios(my_network, scenario_folders_list, workers, options, network_structure_df, build_cache_folder,
+                   time_aggregation, epigraph_costs):
+    #yields the results of the scenarios in order, as soon as they are solved#
+    global _worker_network, _worker_options
+    if workers == 1:
+        for scenario_folder in scenario_folders_list:
+            yield run_scenario(my_network, scenario_folder, **options)
+    elif "fork" in multiprocessing.get_all_start_methods():
+        #forked workers share the built network copy-on-write#
+        _worker_network = my_network
+        _worker_options = options
+        try:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                yield from pool.imap(_run_worker_scenario, scenario_folders_list, chunksize = 1)
+        finally:
+            _worker_network = None
+            _worker_options = dict()
+    else:
+        with multiprocessing.Pool(workers, initializer = _initialise_worker,
+                                  initargs = (network_structure_df, build_cache_folder, options,
+                                              time_aggregation, epigraph_costs)) as pool:
+            yield from pool.imap(_run_worker_scenario, scenario_folders_list, chunksize = 1)
+    return
+
+
+def run_case_study(case_study, workers = 1, solver = cp.CLARABEL, data_folder = None, use_build_cache = True,
+                   save_results = True, plot = False, time_aggregation = None, component_workers = None,
+                   epigraph_costs = False, solver_configs = None, results_store = None, resume = True,
+                   **solver_options):
+    """Builds the network of case_study once, runs all of its scenarios on workers
+    processes and returns (total_results, total_results_rounded, scenarios_df).
+    With save_results the per-scenario flows and curtailment are written to the Results folder of
+    the case study, as in main.py, and the results of every scenario are appended to results.csv
+    as soon as it is solved, see Results_Writer_STEVFNs. With resume the scenarios completed by an
+    earlier run are skipped and their results are read from the Results folder, without resume the
+    results of the earlier runs are removed.
+    With a time_aggregation only its representative periods are simulated. With component_workers
+    the connected components of the network are solved separately, see Network.solve_components.
+    With epigraph_costs the network is solved as an LP when its quadratic costs are zero, e.g. with
+    solver = cp.HIGHS. With solver_configs every scenario is solved with the first solver of the chain
+    that succeeds, solver is then only used to compile the cached network. The attempts of all solvers
+    are saved to solver_telemetry.csv. With a results_store, a Results_Store_STEVFNs, the results of
+    every scenario are also written to the store, partitioned by case study and scenario"""
+    if data_folder is None:
+        data_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "Data")
+    case_study_folder = os.path.join(data_folder, "Case_Study", case_study)
+    results_folder = None
+    results_writer = None
+    if save_results == True:
+        results_folder = os.path.join(case_study_folder, "Results")
+        results_writer = Results_Writer_STEVFNs(results_folder, resume = resume)
+    build_cache_folder = os.path.join(case_study_folder, "Build_Cache") if use_build_cache == True else None
+    
+    network_structure_df = pd.read_csv(os.path.join(case_study_folder, "Network_Structure.csv"))
+    scenario_folders_list = get_scenario_folders(case_study_folder)
+    if results_writer is not None:
+        remaining_folders_list = [scenario_folder for scenario_folder in scenario_folders_list
+                                  if not results_writer.is_completed(scenario_folder)]
+    else:
+        remaining_folders_list = scenario_folders_list
+    options = dict(solver = solver, results_folder = results_folder, plot = plot,
+                   component_workers = component_workers, solver_configs = solver_configs,
+                   results_store = results_store, **solver_options)
+    
+    workers = max(1, min(workers, len(remaining_folders_list)))
+    if workers > 1 and component_workers is not None:
+        #worker processes cannot start pools of their own#
+        options["component_workers"] = 1
+    scenarios_results = []
+    if len(remaining_folders_list) > 0:
+        my_network = build_network(network_structure_df, build_cache_folder, solver, time_aggregation, epigraph_costs)
+        for scenario_folder, scenario_results in zip(remaining_folders_list,
+                                                     _run_scenarios(my_network, remaining_folders_list, workers,
+                                                                    options, network_structure_df, build_cache_folder,
+                                                                    time_aggregation, epigraph_costs)):
+            if results_writer is None:
+                scenarios_results += [scenario_results]
+                continue
+            scenario_summary = {key: value for key, value in scenario_results.items()
+                                if key not in ["scenario_name", "results", "results_rounded", "telemetry"]}
+            results_writer.write_scenario(scenario_folder, scenario_results["results"],
+                                          scenario_results["results_rounded"], scenario_results["telemetry"],
+                                          **scenario_summary)
+    
+    if results_writer is not None:
+        scenario_names = [os.path.basename(scenario_folder) for scenario_folder in scenario_folders_list]
+        scenarios_df = results_writer.get_manifest_df()
+        if len(scenarios_df) > 0:
+            scenarios_df = scenarios_df.set_index("scenario_name").reindex(scenario_names).reset_index()
+            scenarios_df = scenarios_df.drop(columns = ["completed", "results_rows", "scenario_key", "date"])
+        return results_writer.read_results(), results_writer.read_results_rounded(), scenarios_df
+    total_results = _concat_results([scenario_results["results"] for scenario_results in scenarios_results])
+    total_results_rounded = _concat_results([scenario_results["results_rounded"]
+                                             for scenario_results in scenarios_results])
+    scenarios_df = pd.DataFrame([{key: value for key, value in scenario_results.items()
+                                  if key not in ["results", "results_rounded", "telemetry"]}
+                                 for scenario_results in scenarios_results])
+    return total_results, total_results_rounded, scenarios_df
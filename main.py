@@ -15,11 +15,13 @@ import cvxpy as cp
 import matplotlib.pyplot as plt
 import numpy as np
 
-from Code.Network.Network import Network_STEVFNs
+from Code.Network.Build_Cache import Build_Cache_STEVFNs
 from Code.Plotting import DPhil_Plotting
 from Code.Plotting import mitigation_plots
 from Code.Results import Results
 from Code.Results import get_new_input_params
+from Code.Results.Results_Writer import Results_Writer_STEVFNs
+from Code.Results.Results_Extractor import Results_Extractor_STEVFNs
 
 #### Define Input Files ####
 case_study_name = "MEX"
@@ -55,25 +57,39 @@ rounded_results_filename = os.path.join(results_folder, "results_rounded.csv")
 results_filename = os.path.join(results_folder, "results.csv")
 # flows_filename = os.path.join(results_folder, "flows.csv")
 # curtailment_filename = os.path.join(results_folder, "curtailment.csv")
+# The results of every scenario are appended to results.csv, results_rounded.csv and solver_telemetry.csv
+# as soon as it is solved and recorded in manifest.jsonl. Scenarios completed by an earlier run are skipped,
+# with resume = False all scenarios are run again
+results_writer = Results_Writer_STEVFNs(results_folder, resume = True)
 
 ### Read Network Structure ###
 network_structure_df = pd.read_csv(network_structure_filename)
 
+### Solvers ###
+# Solvers are tried in order until one solves the scenario, solvers that are not installed or fail,
+# e.g. MOSEK without a licence, are skipped. Every attempt is recorded in my_network.telemetry_df
+solver_configs = [{"solver": cp.MOSEK, "options": {"verbose": False}},
+                  {"solver": cp.CLARABEL, "options": {"max_iter": 10000}},
+                  {"solver": cp.SCS, "options": {"max_iters": 100000}, "time_limit": 3600}]
+compile_solver = [config["solver"] for config in solver_configs if config["solver"] in cp.installed_solvers()][0]
+
 ### Build Network ###
 start_time = time.time()
-my_network = Network_STEVFNs()
-my_network.build(network_structure_df)
+# Built networks are cached per Network_Structure.csv and code version
+build_cache = Build_Cache_STEVFNs(os.path.join(case_study_folder, "Build_Cache"))
+my_network = build_cache.load_or_build(network_structure_df, solver = compile_solver)
 
 build_time = time.time()
 print("Time taken to build network = ", build_time - start_time, "s")
-# Define empty dataframes for results
-total_df = pd.DataFrame()
-total_df_1 = pd.DataFrame()
+
 
 for counter1 in range(len(scenario_folders_list)):
 # for counter1 in range(1):
     # Read Input Files ###
     scenario_folder = scenario_folders_list[counter1]
+    if results_writer.is_completed(scenario_folder):
+        print("Scenario: ", os.path.basename(scenario_folder), "completed in an earlier run")
+        continue
     # Get year value out of the scenario path to replace results later
     scenario_year = scenario_folder[-4:] # STRING of scenario year
     
@@ -96,7 +112,16 @@ for counter1 in range(len(scenario_folders_list)):
     
     ### Run Simulation ###
     solve_time = time.time()
-    my_network.problem.solve(solver = cp.MOSEK, verbose=False)
+    telemetry_start = len(my_network.solver_telemetry)
+    # Compiled problem is cached on the first scenario and reused for the others
+    try:
+        my_network.solve_chain(solver_configs)
+    except cp.error.SolverError as solver_error:
+        print(solver_error)
+        results_writer.write_scenario(scenario_folder, telemetry = my_network.solver_telemetry[telemetry_start:],
+                                      status = "solver_error")
+        continue
+    # my_network.solve_problem(solver = cp.MOSEK, verbose=False)
     # my_network.solve_problem() # Default solver is CLARABEL with max_iter=10000
     solved_time = time.time()
 
@@ -108,6 +133,8 @@ for counter1 in range(len(scenario_folders_list)):
     # Avoid breaking the optimisation if a scenario does not converge
     if my_network.problem.value == float("inf"):
         print("problem value inf")
+        results_writer.write_scenario(scenario_folder, telemetry = my_network.solver_telemetry[telemetry_start:],
+                                      status = my_network.problem.status)
         continue
     print("Total cost to satisfy all demand = ", my_network.problem.value, " Billion USD")
     print("Total emissions = ", my_network.assets[0].asset_size(), "MtCO2e")
@@ -117,19 +144,11 @@ for counter1 in range(len(scenario_folders_list)):
                                             location_parameters_df,
                                             save_path=os.path.join(results_folder, "asset_sizes", f"{scenario}.png"))
     
-    # Save results for asset flows and total data per scenario
-    results_df = Results.get_total_data(my_network, location_parameters_df, asset_parameters_df)
-    results_rounded_df = Results.get_total_data_rounded(my_network, location_parameters_df, asset_parameters_df)
-    
-    
-    
-    if counter1 == 0:
-        total_results = results_df
-        total_results_rounded = results_rounded_df
-    else:
-        # Concatenate next scenario's results into one dataframe
-        total_results = pd.concat([total_results, results_df], ignore_index=True)
-        total_results_rounded = pd.concat([total_results_rounded, results_rounded_df], ignore_index=True)
+    # Save results for asset flows and total data per scenario, the flows are extracted once for all results
+    extractor = Results_Extractor_STEVFNs(my_network)
+    results_df = Results.get_total_data(my_network, location_parameters_df, asset_parameters_df, extractor = extractor)
+    results_rounded_df = Results.get_total_data_rounded(my_network, location_parameters_df, asset_parameters_df,
+                                                        extractor = extractor)
     
     # This works for all PV existing in MEX case study, updates well. Will need to add a condition to meet
     # Location column AND description column do be able to differenciate with other case studies
@@ -138,25 +157,29 @@ for counter1 in range(len(scenario_folders_list)):
     # get_new_input_params.update_existing_RE_capacity(my_network, pv_lim, pv_existing,
     #                                 assets_folder, scenario_year)
         
-    # flows_df = Results.export_aut_flows(my_network)
-    flows_df = Results.export_collab_flows(my_network, location_parameters_df)
+    # flows_df = Results.export_aut_flows(my_network, extractor = extractor)
+    flows_df = Results.export_collab_flows(my_network, location_parameters_df, extractor = extractor)
     
-    curtailment = Results.calculate_curtailment_aut(my_network)
-    # curtailment = Results.calculate_curtailment_collab(my_network, location_parameters_df)
+    curtailment = Results.calculate_curtailment_aut(my_network, extractor = extractor)
+    # curtailment = Results.calculate_curtailment_collab(my_network, location_parameters_df, extractor = extractor)
     
     flows_filename = os.path.join(results_folder, f"flows_{my_network.scenario_name}.csv")
     curtailment_filename = os.path.join(results_folder, f"curtailment_{my_network.scenario_name}.csv")
     curtailment.to_csv(curtailment_filename, index=False, header=True)
     flows_df.to_csv(flows_filename, index=False, header=True)
+    # The scenario is completed once its results are appended, after its flows and curtailment are saved
+    results_writer.write_scenario(scenario_folder, results_df, results_rounded_df,
+                                  my_network.solver_telemetry[telemetry_start:],
+                                  status = my_network.problem.status, value = my_network.problem.value,
+                                  solve_time = solved_time - solve_time)
     
     
     
     
 
-# # Save total_data for all scenarios into a single csv file
-total_results.to_csv(results_filename, index=False, header=True)
-total_results_rounded.to_csv(rounded_results_filename, index=False, header=True)
-# Save flows into a separate file
+# # total_data of all scenarios, including the ones completed in earlier runs
+total_results = results_writer.read_results()
+total_results_rounded = results_writer.read_results_rounded()
 end_time = time.time()
 print("Time taken to build, update and solve:", end_time - start_time, "s")
 
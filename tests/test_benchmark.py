@@ -0,0 +1,15 @@
+from Code.Benchmark.Benchmark import run_case
+from Code.Network.Size_Estimator import Size_Estimator_STEVFNs
+
+
+def test_run_case(tmp_path):
+    #synthetic case studies only hold profiles, the assets read the parameters of the package#
+    record = run_case(1, 24, benchmark_folder = str(tmp_path))
+    assert record["status"] == "optimal"
+    assert record["results_time"] is not None
+
+
+def test_calibrate_assets():
+    size_estimator = Size_Estimator_STEVFNs()
+    assert size_estimator.calibrate_assets(["PP_CO2"]) == []
+    assert "PP_CO2" in size_estimator._assets_df.index
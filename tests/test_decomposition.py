@@ -0,0 +1,57 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from Code.Network.Network import Network_STEVFNs
+
+CASE_STUDY_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "Case_Study")
+MAXIMUM_BUDGET = 5500
+
+
+@pytest.fixture(scope = "module")
+def autarky_network():
+    network_structure_df = pd.read_csv(os.path.join(CASE_STUDY_FOLDER, "USA_WECC-CHL_Autarky", "Network_Structure.csv"))
+    network_structure_df["End_Time"] = 48
+    my_network = Network_STEVFNs()
+    my_network.build(network_structure_df)
+    scenario_folder = os.path.join(CASE_STUDY_FOLDER, "USA_WECC-CHL_Autarky", "scenario_1")
+    my_network.update(pd.read_csv(os.path.join(scenario_folder, "Location_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "Asset_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "System_Parameters.csv")))
+    #a budget below the emissions of the case study without limit, so that it binds#
+    my_network.assets[0].conversion_fun_params["maximum_budget"].value = MAXIMUM_BUDGET
+    my_network.solve_problem()
+    assert my_network.problem.status == "optimal"
+    return my_network, my_network.problem.value
+
+
+def test_autarky_network_stays_monolithic(autarky_network):
+    autarky_network, value = autarky_network
+    components_df = autarky_network.solve_components()
+    #the CO2_Budget node couples the locations#
+    assert len(components_df) == 1
+    assert autarky_network.problem.status == "optimal"
+    assert autarky_network.problem.value == pytest.approx(value, rel = 1e-6)
+
+
+@pytest.mark.parametrize("coupling_shares", [{1: 1.0, 2: 0.0}, {1: 0.95, 2: 0.05}])
+def test_autarky_network_splits_with_coupling_shares(autarky_network, coupling_shares):
+    autarky_network, value = autarky_network
+    components_df = autarky_network.solve_components(coupling_shares = coupling_shares)
+    decomposition = autarky_network.decomposition
+    assert len(components_df) == 2
+    assert decomposition.coupling_nodes_df["split"].all()
+    assert autarky_network.problem.status == "optimal_inaccurate"
+    #the split problem is a restriction of the full problem#
+    assert autarky_network.problem.value >= value * (1 - 1e-6)
+    node = [node for node_key, node in autarky_network.nodes_dict.items() if node_key[1] == "CO2_Budget"][0]
+    asset_flows = decomposition._get_node_asset_flows(node)
+    for component in decomposition.components:
+        location = autarky_network.system_structure_df["Location_1"].iloc[component[-1]]
+        emissions = -sum(np.sum(asset_flows[asset_number].value) for asset_number in component
+                         if asset_number in asset_flows and asset_number != 0)
+        assert emissions <= coupling_shares[location] * MAXIMUM_BUDGET * (1 + 1e-6) + 1e-6
+    if coupling_shares[2] == 0:
+        #the location without emissions gives its share up#
+        assert autarky_network.problem.value == pytest.approx(value, rel = 1e-6)
@@ -0,0 +1,51 @@
+import os
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+import pytest
+
+from Code.Network.Network import Network_STEVFNs
+
+CASE_STUDY_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "Case_Study")
+
+
+def build_network(case_study, vectorized_node_balances, end_time = 24, transport_time = 0):
+    network_structure_df = pd.read_csv(os.path.join(CASE_STUDY_FOLDER, case_study, "Network_Structure.csv"))
+    network_structure_df["End_Time"] = end_time
+    network_structure_df["Transport_Time"] = transport_time
+    my_network = Network_STEVFNs()
+    my_network.vectorized_node_balances = vectorized_node_balances
+    my_network.build(network_structure_df)
+    case_study_folder = os.path.join(CASE_STUDY_FOLDER, case_study)
+    scenario_folder = os.path.join(case_study_folder, sorted(folder for folder in os.listdir(case_study_folder)
+                                                              if folder.startswith("scenario_"))[-1])
+    my_network.update(pd.read_csv(os.path.join(scenario_folder, "Location_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "Asset_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "System_Parameters.csv")))
+    return my_network
+
+
+@pytest.mark.parametrize("case_study, transport_time", [("MEX", 0), ("USA_WECC-CHL_Collab", 1)])
+def test_node_group_balances_match_node_balances(case_study, transport_time):
+    my_network = build_network(case_study, True, transport_time = transport_time)
+    random_state = np.random.default_rng(0)
+    for variable in my_network.problem.variables():
+        variable.value = random_state.uniform(size = variable.shape)
+    group_balances = {node_key: np.asarray(node.net_output_flows.value, dtype = float)
+                      for node_key, node in my_network.nodes_dict.items()}
+    #the per node balances of the same network, with the same variable values#
+    my_network._build_nodes()
+    for node_key, node in my_network.nodes_dict.items():
+        node_balance = np.asarray(node.net_output_flows.value, dtype = float)
+        assert np.allclose(group_balances[node_key], node_balance, rtol = 1e-9, atol = 1e-9), node_key
+
+
+@pytest.mark.parametrize("case_study", ["MEX", "USA_WECC-CHL_Collab"])
+def test_node_group_solution_matches_node_solution(case_study):
+    values = []
+    for vectorized_node_balances in [True, False]:
+        my_network = build_network(case_study, vectorized_node_balances)
+        my_network.solve_problem(solver = cp.CLARABEL)
+        assert my_network.problem.status == "optimal"
+        values += [my_network.problem.value]
+    assert values[0] == pytest.approx(values[1], rel = 1e-6)
@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pandas as pd
+
+from Code.Network.Network import Network_STEVFNs
+from Code.Assets.Base_Assets import Multi_Asset, Storage_Asset_STEVFNs
+
+CASE_STUDY_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "Case_Study")
+
+
+def build_network(case_study, end_time, period, transport_time = 0):
+    network_structure_df = pd.read_csv(os.path.join(CASE_STUDY_FOLDER, case_study, "Network_Structure.csv"))
+    network_structure_df["End_Time"] = end_time
+    network_structure_df["Period"] = period
+    network_structure_df["Transport_Time"] = transport_time
+    my_network = Network_STEVFNs()
+    my_network.build(network_structure_df)
+    return my_network
+
+
+def get_components(my_network):
+    components = []
+    for asset in my_network.assets:
+        if isinstance(asset, Multi_Asset):
+            components += list(asset.assets_dictionary.values())
+        else:
+            components += [asset]
+    return components
+
+
+def test_shift_node_times_by_time_steps():
+    my_network = Network_STEVFNs()
+    assert list(my_network.shift_node_times(np.arange(0, 12, 2), 1)) == [2, 4, 6, 8, 10, 0]
+    assert list(my_network.shift_node_times(np.arange(0, 6), 2)) == [2, 3, 4, 5, 0, 1]
+
+
+def test_storage_with_period_targets_time_steps():
+    my_network = build_network("MEX", 12, 2)
+    storages = [component for component in get_components(my_network) if isinstance(component, Storage_Asset_STEVFNs)]
+    assert len(storages) > 0
+    for storage in storages:
+        assert list(storage.source_node_times) == [0, 2, 4, 6, 8, 10]
+        assert list(storage.target_node_times) == [2, 4, 6, 8, 10, 0]
+
+
+def test_transport_with_period_targets_time_steps():
+    my_network = build_network("USA_WECC-CHL_Collab", 12, 2, transport_time = 1)
+    transports = [asset for asset in my_network.assets if asset.asset_name == "EL_Transport"]
+    assert len(transports) > 0
+    for transport in transports:
+        #the transported flow arrives at a time step of the asset, not at a node that no other asset uses#
+        assert list(transport.target_node_times) == [2, 4, 6, 8, 10, 0]
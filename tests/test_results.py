@@ -0,0 +1,28 @@
+import os
+import numpy as np
+import pandas as pd
+
+from Code.Network.Network import Network_STEVFNs
+from Code.Results import Results
+
+CASE_STUDY_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "Case_Study")
+
+
+def test_aut_flows_keep_legacy_columns_in_place():
+    network_structure_df = pd.read_csv(os.path.join(CASE_STUDY_FOLDER, "MEX", "Network_Structure.csv"))
+    network_structure_df["End_Time"] = 24
+    my_network = Network_STEVFNs()
+    my_network.build(network_structure_df)
+    scenario_folder = os.path.join(CASE_STUDY_FOLDER, "MEX", "scenario_2050")
+    my_network.update(pd.read_csv(os.path.join(scenario_folder, "Location_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "Asset_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "System_Parameters.csv")))
+    my_network.solve_problem()
+    assert my_network.problem.status == "optimal"
+    flows_df = Results.export_aut_flows(my_network)
+    #the columns exported before, then RE_WIND_Existing and BESS_Existing#
+    assert list(flows_df.columns) == ["PV_total", "PV_total", "Wind_total", "BESS_Charging", "BESS_Discharging",
+                                      "PP_total", "PP_total", "Net_demand",
+                                      "Wind_total", "BESS_Charging", "BESS_Discharging"]
+    demand_asset = [asset for asset in my_network.assets if asset.asset_name == "EL_Demand"][0]
+    assert np.allclose(flows_df.iloc[:, 7].values, demand_asset.flows.value)
@@ -0,0 +1,79 @@
+import os
+import glob
+import pandas as pd
+import pytest
+
+from Code.Results.Results_Writer import Results_Writer_STEVFNs
+
+
+def make_scenario(folder, name, value = 1):
+    scenario_folder = os.path.join(folder, name)
+    os.makedirs(scenario_folder)
+    for filename in ["Location_Parameters.csv", "Asset_Parameters.csv", "System_Parameters.csv"]:
+        pd.DataFrame({"value": [value]}).to_csv(os.path.join(scenario_folder, filename), index = False)
+    return scenario_folder
+
+
+def results_df(value):
+    return pd.DataFrame({"technology_name": ["PV_[MEX]", "BESS_[MEX]"], "technology_cost": [value, 2 * value]})
+
+
+def test_existing_results_survive_construction(tmp_path):
+    results_folder = str(tmp_path / "Results")
+    os.makedirs(results_folder)
+    existing_df = results_df(7.0)
+    existing_df.to_csv(os.path.join(results_folder, "results.csv"), index = False)
+    with pytest.warns(UserWarning):
+        results_writer = Results_Writer_STEVFNs(results_folder, resume = True)
+    moved_filenames = glob.glob(os.path.join(results_folder, "results_*.csv"))
+    moved_filenames = [filename for filename in moved_filenames if "rounded" not in filename]
+    assert len(moved_filenames) == 1
+    pd.testing.assert_frame_equal(pd.read_csv(moved_filenames[0]), existing_df)
+    assert len(results_writer.read_results()) == 0
+
+
+def test_resume_skips_completed_scenarios(tmp_path):
+    results_folder = str(tmp_path / "Results")
+    scenario_1 = make_scenario(str(tmp_path), "scenario_1")
+    scenario_2 = make_scenario(str(tmp_path), "scenario_2")
+    results_writer = Results_Writer_STEVFNs(results_folder)
+    results_writer.write_scenario(scenario_1, results_df(1.0), results_df(1.0), status = "optimal")
+    results_writer.write_scenario(scenario_2, status = "infeasible")
+    results_writer = Results_Writer_STEVFNs(results_folder)
+    assert results_writer.is_completed(scenario_1)
+    assert not results_writer.is_completed(scenario_2)
+    assert len(results_writer.read_results()) == 2
+    assert list(results_writer.get_manifest_df()["status"]) == ["optimal", "infeasible"]
+
+
+def test_rows_after_manifest_are_truncated(tmp_path):
+    results_folder = str(tmp_path / "Results")
+    scenario_1 = make_scenario(str(tmp_path), "scenario_1")
+    results_writer = Results_Writer_STEVFNs(results_folder)
+    results_writer.write_scenario(scenario_1, results_df(1.0), results_df(1.0))
+    #a sweep that stopped after appending the rows of a scenario, before its manifest line#
+    with open(results_writer.get_filename("results"), "a") as results_file:
+        results_file.write("PV_[CHL],3.0\n")
+    with open(results_writer.manifest_filename, "a") as manifest_file:
+        manifest_file.write('{"scenario_name": "scenario_2", "comp')
+    results_writer = Results_Writer_STEVFNs(results_folder)
+    pd.testing.assert_frame_equal(results_writer.read_results(), results_df(1.0))
+    assert len(results_writer.manifest) == 1
+
+
+def test_changed_inputs_raise(tmp_path):
+    results_folder = str(tmp_path / "Results")
+    scenario_1 = make_scenario(str(tmp_path), "scenario_1")
+    Results_Writer_STEVFNs(results_folder).write_scenario(scenario_1, results_df(1.0), results_df(1.0))
+    pd.DataFrame({"value": [2]}).to_csv(os.path.join(scenario_1, "Asset_Parameters.csv"), index = False)
+    with pytest.raises(ValueError):
+        Results_Writer_STEVFNs(results_folder).is_completed(scenario_1)
+
+
+def test_no_resume_clears_results(tmp_path):
+    results_folder = str(tmp_path / "Results")
+    scenario_1 = make_scenario(str(tmp_path), "scenario_1")
+    Results_Writer_STEVFNs(results_folder).write_scenario(scenario_1, results_df(1.0), results_df(1.0))
+    results_writer = Results_Writer_STEVFNs(results_folder, resume = False)
+    assert not results_writer.is_completed(scenario_1)
+    assert len(results_writer.read_results()) == 0
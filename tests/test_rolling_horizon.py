@@ -0,0 +1,35 @@
+import os
+import pandas as pd
+
+from Code.Network.Network import Network_STEVFNs
+from Code.Results import Results
+from Code.Runner.Rolling_Horizon import Rolling_Horizon_STEVFNs, get_initial_storages, get_storage_targets
+
+CASE_STUDY_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "Case_Study")
+HORIZON_LENGTH = 8760
+
+
+def test_windows_at_planning_capacities_are_feasible():
+    network_structure_df = pd.read_csv(os.path.join(CASE_STUDY_FOLDER, "MEX", "Network_Structure.csv"))
+    scenario_folder = os.path.join(CASE_STUDY_FOLDER, "MEX", "scenario_2050")
+    parameters_dfs = [pd.read_csv(os.path.join(scenario_folder, "Location_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "Asset_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "System_Parameters.csv"))]
+    #planning solve of the full year, hour by hour#
+    planning_structure_df = network_structure_df.copy()
+    planning_structure_df["End_Time"] = HORIZON_LENGTH
+    planning_network = Network_STEVFNs()
+    planning_network.build(planning_structure_df)
+    planning_network.update(*parameters_dfs)
+    planning_network.solve_problem()
+    assert planning_network.problem.status == "optimal"
+    #without the terminal storage, windows that drained the storage at their end left later windows infeasible#
+    rolling_horizon = Rolling_Horizon_STEVFNs(network_structure_df, window_length = 168, overlap_length = 24,
+                                              horizon_length = HORIZON_LENGTH)
+    windows_df = rolling_horizon.solve(*parameters_dfs, planning_network.get_capacities(),
+                                       get_initial_storages(planning_network), get_storage_targets(planning_network))
+    assert len(windows_df) == 53
+    assert (windows_df["status"] == "optimal").all()
+    flows_df = Results.export_aut_flows(rolling_horizon.result_network)
+    assert len(flows_df) == HORIZON_LENGTH
+    assert not flows_df.isna().any().any()
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+import pytest
+
+from Code.Network.Network import Network_STEVFNs
+from Code.Network.Time_Aggregation import Time_Aggregation_STEVFNs
+from Code.Assets.Base_Assets import Multi_Asset, Storage_Asset_STEVFNs
+from Code.Assets.Profile_Store import sample_profile
+
+CASE_STUDY_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "Case_Study")
+NUMBER_OF_TIMESTEPS = 96
+
+
+def solve_network(time_aggregation = None, case_study = "MEX", scenario = "scenario_2050"):
+    network_structure_df = pd.read_csv(os.path.join(CASE_STUDY_FOLDER, case_study, "Network_Structure.csv"))
+    network_structure_df["End_Time"] = NUMBER_OF_TIMESTEPS
+    my_network = Network_STEVFNs()
+    my_network.build(network_structure_df, time_aggregation = time_aggregation)
+    scenario_folder = os.path.join(CASE_STUDY_FOLDER, case_study, scenario)
+    my_network.update(pd.read_csv(os.path.join(scenario_folder, "Location_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "Asset_Parameters.csv")),
+                      pd.read_csv(os.path.join(scenario_folder, "System_Parameters.csv")))
+    my_network.solve_problem()
+    return my_network
+
+
+def get_time_aggregation(period_length, link_storage):
+    #every period of the simulated horizon, the days sampled with set_size 24 and set_number 0,#
+    #is its own representative period, so the aggregation is exact#
+    hours = sample_profile(np.arange(8760), 24, 0, NUMBER_OF_TIMESTEPS)
+    number_of_periods = NUMBER_OF_TIMESTEPS // period_length
+    return Time_Aggregation_STEVFNs(period_length, hours[::period_length], np.ones(number_of_periods),
+                                    np.arange(number_of_periods), link_storage = link_storage)
+
+
+def get_components(my_network):
+    components = []
+    for asset in my_network.assets:
+        if isinstance(asset, Multi_Asset):
+            components += list(asset.assets_dictionary.values())
+        else:
+            components += [asset]
+    return components
+
+
+def set_solution(full_network, my_network):
+    """Sets the solution of my_network, with linked storage, on the variables of full_network"""
+    for full_component, component in zip(get_components(full_network), get_components(my_network)):
+        for name, variable in vars(component).items():
+            full_variable = getattr(full_component, name, None)
+            if not isinstance(variable, cp.Variable) or not isinstance(full_variable, cp.Variable):
+                continue
+            if full_variable.shape != variable.shape:
+                continue
+            full_variable.value = np.maximum(variable.value, 0) if full_variable.is_nonneg() else variable.value
+        if isinstance(component, Storage_Asset_STEVFNs):
+            full_component.flows.value = np.maximum(component.get_storage_levels(), 0)
+    return
+
+
+@pytest.fixture(scope = "module")
+def full_network():
+    return solve_network()
+
+
+@pytest.mark.parametrize("period_length", [12, 24])
+def test_linked_storage_matches_full_horizon(full_network, period_length):
+    my_network = solve_network(get_time_aggregation(period_length, True))
+    assert my_network.problem.status == "optimal"
+    assert my_network.problem.value == pytest.approx(full_network.problem.value, rel = 1e-6)
+    #the storage levels over the full horizon are a feasible solution of the full horizon network#
+    set_solution(full_network, my_network)
+    for constraint in full_network.problem.constraints:
+        assert np.max(constraint.violation()) < 1e-5
+    assert full_network.problem.objective.value == pytest.approx(my_network.problem.value, rel = 1e-6)
+
+
+def test_storage_without_linking_is_cyclic_within_periods(full_network):
+    #without a CO2 budget, storage must carry the solar generation of the day into the night#
+    assert full_network.problem.status == "optimal"
+    my_network = solve_network(get_time_aggregation(12, False))
+    assert my_network.problem.status == "infeasible"